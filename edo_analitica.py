@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Solución analítica de y' = f(t, y) (o de orden superior) con sympy, para comparar.
+
+- dsolve puede tardar mucho o no terminar, y no se puede interrumpir: resolver_analitica
+  es una función de módulo pensada para correr en otro proceso (EjecutorTareas con
+  proceso=True y un límite de tiempo).
+- Los resultados se guardan en disco (CacheSoluciones, JSON con sp.srepr) por ecuación
+  y condición inicial: repetir "Calcular Solución Analítica" no vuelve a llamar a dsolve,
+  tampoco en otra sesión. También se guarda que una ecuación no tiene solución.
+- La solución se compila una sola vez con lambdify (compilar_solucion) y se evalúa
+  sobre arreglos de t enteros, sin subs punto por punto.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+
+from edo_engine import nombres_derivadas
+
+ARCHIVO_SOLUCIONES = os.path.join(os.path.expanduser("~"), ".simulador_edo", "soluciones.json")
+TIEMPO_MAX_DSOLVE = 20.0
+
+
+def resolver_analitica(texto, variable, valores_iniciales, t0, control=None):
+    """srepr de la solución y(t) de y^(n) = texto con y(t0), y'(t0), ... = valores, o None.
+
+    El orden n es la cantidad de valores iniciales (n = 1: y' = f(t, y)). None significa
+    que dsolve no encontró solución (o no es única).
+    """
+    if control is not None:
+        control.progreso(None, "Resolviendo con dsolve...")
+    t = sp.Symbol("t")
+    valores = [float(sp.sympify(v)) for v in str(valores_iniciales).split(",") if v.strip()]
+    y = sp.Function(variable)
+    # y, dy, d2y, ... se reemplazan por y(t), y'(t), y''(t), ...
+    derivadas = nombres_derivadas(variable, len(valores))
+    sustitucion = {sp.Symbol(v): y(t).diff(t, k) for k, v in enumerate(derivadas)}
+    expr = sp.sympify(texto, locals={v: sp.Symbol(v) for v in ["t", *derivadas]})
+    ode = sp.Eq(y(t).diff(t, len(valores)), expr.subs(sustitucion))
+    ics = {(y(t).diff(t, k).subs(t, t0) if k else y(t0)): v for k, v in enumerate(valores)}
+    try:
+        solucion = sp.dsolve(ode, ics=ics)
+    except (NotImplementedError, ValueError, TypeError):
+        return None
+    if isinstance(solucion, list):
+        return None
+    return sp.srepr(solucion.rhs)
+
+
+@lru_cache(maxsize=32)
+def compilar_solucion(expr):
+    """y(t) exacta compilada para arreglos de t; NaN donde no es real o no está definida"""
+    t = sp.Symbol("t")
+    g = sp.lambdify(t, expr, ["scipy", "numpy"])
+
+    def puntual(ti):
+        try:
+            return complex(expr.subs(t, ti))
+        except (TypeError, ValueError):
+            return np.nan
+
+    def y(tt):
+        tt = np.asarray(tt, dtype=float)
+        with np.errstate(all="ignore"):
+            try:
+                valores = np.asarray(g(tt))
+            except Exception:
+                # Funciones que lambdify no sabe llevar a NumPy: se evalúa con sympy
+                valores = np.array([puntual(ti) for ti in tt.ravel()]).reshape(tt.shape)
+        if np.iscomplexobj(valores):
+            real = np.abs(valores.imag) <= 1e-12 * (1.0 + np.abs(valores.real))
+            valores = np.where(real, valores.real, np.nan)
+        return np.broadcast_to(valores.astype(float), tt.shape).copy()
+    return y
+
+
+class CacheSoluciones:
+    """Soluciones de dsolve en un JSON: clave de la ecuación -> srepr (o None si no tiene)"""
+
+    def __init__(self, ruta=ARCHIVO_SOLUCIONES):
+        self.ruta = ruta
+        self._datos = None
+
+    @staticmethod
+    def clave(texto, variable, valores_iniciales, t0):
+        valores = [float(sp.sympify(v)) for v in str(valores_iniciales).split(",") if v.strip()]
+        return json.dumps([texto.replace(" ", ""), variable, valores, float(t0)])
+
+    def _cargar(self):
+        if self._datos is None:
+            try:
+                with open(self.ruta, encoding="utf-8") as archivo:
+                    self._datos = json.load(archivo)
+            except (OSError, ValueError):
+                self._datos = {}
+        return self._datos
+
+    def __contains__(self, clave):
+        return clave in self._cargar()
+
+    def __getitem__(self, clave):
+        """Expresión sympy guardada, o None si la ecuación no tiene solución analítica"""
+        texto = self._cargar()[clave]
+        return None if texto is None else sp.sympify(texto)
+
+    def guardar(self, clave, srepr):
+        self._cargar()[clave] = srepr
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        # Escritura atómica: un cierre a mitad de camino no deja el archivo roto
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(self._datos, archivo, ensure_ascii=False, indent=1)
+        os.replace(temporal, self.ruta)
@@ -0,0 +1,735 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de Runge-Kutta explícitos definidos por tablas de Butcher.
+
+- Cada método es sólo datos: matriz A (estrictamente triangular inferior), pesos b y
+  nodos c. Agregar un método es agregar una entrada a METODOS_RK.
+- El lado derecho f(t, y) se compila una sola vez con lambdify (compilar_rhs); el bucle
+  de pasos no compara cadenas ni llama a sympy.
+- Los arreglos de salida (t, y y, si se piden, las etapas k) se reservan de antemano.
+- y puede ser un escalar o un vector (sistemas); la forma de la salida sigue a y0.
+  Un sistema y_i' = f_i(t, y) se compila en una sola función que devuelve un ndarray;
+  una ecuación de orden n se reduce a un sistema de primer orden con el estado
+  (y, dy, d2y, ..., d{n-1}y).
+- Paso adaptativo con pares embebidos (Dormand-Prince 5(4), Bogacki-Shampine 3(2)):
+  control PI del paso con rtol/atol, FSAL (la última etapa de un paso es la primera
+  del siguiente) y salida densa: la solución se interpola dentro de cada paso, así se
+  muestrea en cualquier t sin achicar el paso ni guardar cada paso interno.
+- El jacobiano ∂f/∂y se deriva simbólicamente y se compila una vez (compilar_jacobiano);
+  lo usan los métodos implícitos para problemas rígidos (edo_rigidos).
+- compilar_ensamble evalúa el sistema para m estados (y parámetros) a la vez, con Y de
+  forma (m, d); lo usa la integración de ensambles (edo_ensamble).
+- integrar_rk_fusionado avanza varios RK explícitos a la vez con la misma F de
+  ensamble: los estados de los métodos se apilan y cada etapa es una sola llamada.
+- Eventos g(t, y) = 0: al final de cada paso se compara el signo de cada g y, si
+  cambió, la raíz se busca con brentq sobre la salida densa del paso (la de DP45/BS23
+  o una cúbica de Hermite en los RK de paso fijo). Cada evento registra sus cruces,
+  sólo los cuenta o termina la integración, sin achicar el paso para no perderlos.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+from scipy.optimize import brentq
+
+PASOS_POR_AVISO = 256
+
+ESCALAR = "Escalar"
+SISTEMA = "Sistema"
+ORDEN_SUPERIOR = "Orden superior"
+TIPOS_PROBLEMA = (ESCALAR, SISTEMA, ORDEN_SUPERIOR)
+
+# Control del paso adaptativo
+SEGURIDAD = 0.9
+FACTOR_MIN = 0.2
+FACTOR_MAX = 5.0
+MAX_PASOS = 100_000
+
+# Eventos g(t, y) = 0: qué hacer en cada cruce
+REGISTRAR = "Registrar"
+CONTAR = "Contar"
+TERMINAR = "Terminar"
+ACCIONES_EVENTO = (REGISTRAR, CONTAR, TERMINAR)
+TOL_EVENTO = 1e-12        # en la fracción θ del paso donde se busca la raíz
+
+
+class TablaButcher:
+    """Tabla de Butcher de un método explícito: y_{n+1} = y_n + h·Σ b_i k_i,
+    k_i = f(t_n + c_i h, y_n + h·Σ_{j<i} a_ij k_j)"""
+
+    def __init__(self, nombre, A, b, c, orden):
+        self.nombre = nombre
+        self.A = np.array(A, dtype=float)
+        self.b = np.array(b, dtype=float)
+        self.c = np.array(c, dtype=float)
+        self.orden = orden
+        s = self.b.size
+        if self.A.shape != (s, s) or self.c.size != s:
+            raise ValueError(f"{nombre}: A, b y c no tienen el mismo número de etapas")
+        if np.any(np.triu(self.A) != 0):
+            raise ValueError(f"{nombre}: la matriz A debe ser estrictamente triangular inferior (método explícito)")
+        if not np.isclose(self.b.sum(), 1.0):
+            raise ValueError(f"{nombre}: los pesos b deben sumar 1")
+
+    @property
+    def etapas(self):
+        return self.b.size
+
+
+METODOS_RK = {
+    "Euler": TablaButcher("Euler", [[0]], [1], [0], 1),
+    "Heun": TablaButcher("Heun", [[0, 0], [1, 0]], [1/2, 1/2], [0, 1], 2),
+    "Midpoint": TablaButcher("Midpoint", [[0, 0], [1/2, 0]], [0, 1], [0, 1/2], 2),
+    "Ralston": TablaButcher("Ralston", [[0, 0], [2/3, 0]], [1/4, 3/4], [0, 2/3], 2),
+    "Kutta3": TablaButcher("Kutta3", [[0, 0, 0], [1/2, 0, 0], [-1, 2, 0]], [1/6, 2/3, 1/6], [0, 1/2, 1], 3),
+    "SSPRK3": TablaButcher("SSPRK3", [[0, 0, 0], [1, 0, 0], [1/4, 1/4, 0]], [1/6, 1/6, 2/3], [0, 1, 1/2], 3),
+    "RK4": TablaButcher("RK4", [[0, 0, 0, 0], [1/2, 0, 0, 0], [0, 1/2, 0, 0], [0, 0, 1, 0]],
+                        [1/6, 1/3, 1/3, 1/6], [0, 1/2, 1/2, 1], 4),
+    "RK38": TablaButcher("RK38", [[0, 0, 0, 0], [1/3, 0, 0, 0], [-1/3, 1, 0, 0], [1, -1, 1, 0]],
+                         [1/8, 3/8, 3/8, 1/8], [0, 1/3, 2/3, 1], 4),
+}
+# RK2 es el punto medio (como en la versión anterior del simulador)
+METODOS_RK["RK2"] = METODOS_RK["Midpoint"]
+
+
+class TablaEmbebida(TablaButcher):
+    """Par embebido: b da la solución de orden `orden` y b - e la de orden `orden_error`.
+
+    `fsal`: la última etapa se evalúa en (t+h, y_{n+1}) y se reutiliza como k1 del
+    paso siguiente. `P` da la salida densa: y(t + θh) = y + h·Σ_i k_i·(P[i] @ [θ, θ², ...]).
+    """
+
+    def __init__(self, nombre, A, b, c, orden, e, orden_error, P, fsal=True):
+        super().__init__(nombre, A, b, c, orden)
+        self.e = np.array(e, dtype=float)
+        self.orden_error = orden_error
+        self.P = np.array(P, dtype=float)
+        self.fsal = fsal
+        if self.e.size != self.etapas or self.P.shape[0] != self.etapas:
+            raise ValueError(f"{nombre}: e y P deben tener una fila por etapa")
+
+
+METODOS_ADAPTATIVOS = {
+    "DP45": TablaEmbebida(
+        "DP45",
+        [[0, 0, 0, 0, 0, 0, 0],
+         [1/5, 0, 0, 0, 0, 0, 0],
+         [3/40, 9/40, 0, 0, 0, 0, 0],
+         [44/45, -56/15, 32/9, 0, 0, 0, 0],
+         [19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0, 0],
+         [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0, 0],
+         [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0]],
+        [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0],
+        [0, 1/5, 3/10, 4/5, 8/9, 1, 1], 5,
+        [-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40], 4,
+        # Salida densa de orden 4 (Hairer, Nørsett y Wanner)
+        [[1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+         [0, 0, 0, 0],
+         [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+         [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+         [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+         [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+         [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]]),
+    "BS23": TablaEmbebida(
+        "BS23",
+        [[0, 0, 0, 0],
+         [1/2, 0, 0, 0],
+         [0, 3/4, 0, 0],
+         [2/9, 1/3, 4/9, 0]],
+        [2/9, 1/3, 4/9, 0],
+        [0, 1/2, 3/4, 1], 3,
+        [5/72, -1/12, -1/9, 1/8], 2,
+        # Hermite cúbico con las pendientes de los extremos
+        [[1, -4/3, 5/9],
+         [0, 1, -2/3],
+         [0, 4/3, -8/9],
+         [0, -1, 1]]),
+}
+
+
+@lru_cache(maxsize=32)
+def compilar_rhs(expr_str, variables="t y"):
+    """f(t, y) compilada una sola vez a partir del texto (NumPy vectorizado)"""
+    simbolos = sp.symbols(variables)
+    return sp.lambdify(simbolos, sp.sympify(expr_str), "numpy")
+
+
+def nombres_derivadas(nombre, orden):
+    """[y, dy, d2y, ..., d{n-1}y]: el estado de una ecuación de orden n"""
+    return [nombre] + [f"d{nombre}" if k == 1 else f"d{k}{nombre}" for k in range(1, orden)]
+
+
+def reducir_orden(expr_str, nombre, orden):
+    """y^(n) = F(t, y, dy, ..., d{n-1}y) como sistema de primer orden: (expresiones, variables)"""
+    if orden < 1:
+        raise ValueError("El orden de la ecuación debe ser al menos 1")
+    variables = nombres_derivadas(nombre, orden)
+    return variables[1:] + [expr_str], variables
+
+
+def _parsear_sistema(expresiones, variables, parametros=()):
+    if len(expresiones) != len(variables):
+        raise ValueError(f"Hay {len(expresiones)} ecuaciones para {len(variables)} variables")
+    return _parsear_expresiones(expresiones, variables, parametros)
+
+
+def _parsear_expresiones(expresiones, variables, parametros=()):
+    t = sp.Symbol("t")
+    simbolos = [sp.Symbol(v) for v in variables]
+    # Las variables del usuario son siempre símbolos (aunque se llamen como funciones de sympy, p. ej. beta)
+    locales = {str(v): v for v in (t, *simbolos, *map(sp.Symbol, parametros))}
+    exprs = [sp.sympify(e, locals=locales) for e in expresiones]
+    libres = set().union(*(e.free_symbols for e in exprs)) - set(locales.values())
+    if libres:
+        raise ValueError(f"Variables desconocidas en el sistema: {', '.join(sorted(map(str, libres)))}")
+    return t, simbolos, exprs
+
+
+@lru_cache(maxsize=32)
+def compilar_sistema(expresiones, variables):
+    """f(t, y) -> ndarray de forma (d,) para el sistema y_i' = expresiones[i].
+
+    Todas las componentes salen de una sola función compilada; `expresiones` y
+    `variables` son tuplas (para poder guardar la compilación).
+    """
+    t, simbolos, exprs = _parsear_sistema(expresiones, variables)
+    g = sp.lambdify((t, simbolos), exprs, "numpy")
+
+    def f(t, y):
+        return np.array(g(t, y), dtype=float)
+    return f
+
+
+@lru_cache(maxsize=32)
+def compilar_jacobiano(expresiones, variables):
+    """J(t, y) -> ndarray (d, d) con J[i, j] = ∂f_i/∂y_j, derivado con sympy una sola vez.
+
+    y se recibe siempre como vector (también para una ecuación escalar).
+    """
+    t, simbolos, exprs = _parsear_sistema(expresiones, variables)
+    g = sp.lambdify((t, simbolos), sp.Matrix(exprs).jacobian(simbolos), "numpy")
+
+    def jac(t, y):
+        return np.array(g(t, y), dtype=float)
+    return jac
+
+
+@lru_cache(maxsize=32)
+def compilar_ensamble(expresiones, variables, parametros=()):
+    """F(t, Y, P) -> (m, d): el sistema evaluado para todo un ensamble en una sola llamada.
+
+    Y tiene forma (m, d) (un estado por miembro) y P forma (m, p) (los valores de
+    `parametros` de cada miembro); t puede ser un número o un vector (m,).
+    """
+    t, simbolos, exprs = _parsear_sistema(expresiones, variables, parametros)
+    psimbolos = [sp.Symbol(p) for p in parametros]
+    g = sp.lambdify((t, simbolos, psimbolos), exprs, "numpy")
+
+    def F(t, Y, P=None):
+        salida = np.empty(Y.shape)
+        # Las componentes constantes (p. ej. "1") vuelven como número: se repiten
+        for i, componente in enumerate(g(t, Y.T, () if P is None else P.T)):
+            salida[:, i] = componente
+        return salida
+    return F
+
+
+@lru_cache(maxsize=32)
+def compilar_eventos(expresiones, variables):
+    """[g(t, y), ...]: una función escalar por expresión, con y como vector del estado"""
+    t, simbolos, exprs = _parsear_expresiones(expresiones, variables)
+    return [sp.lambdify((t, simbolos), expr, "numpy") for expr in exprs]
+
+
+def _leer_problema(tipo, texto, variables, valores_iniciales):
+    """(expresiones, nombres, valores) del sistema de primer orden que describe el usuario"""
+    nombres = variables.replace(",", " ").split()
+    valores = [float(sp.sympify(v)) for v in str(valores_iniciales).split(",") if v.strip()]
+    if not nombres or not valores:
+        raise ValueError("Faltan las variables o los valores iniciales")
+    if tipo == ESCALAR:
+        if len(nombres) != 1 or len(valores) != 1:
+            raise ValueError("Una ecuación escalar lleva una variable y un valor inicial")
+        return [texto.strip()], nombres, valores
+    expresiones = [e.strip() for e in texto.split(";") if e.strip()]
+    if tipo == ORDEN_SUPERIOR:
+        if len(nombres) != 1 or len(expresiones) != 1:
+            raise ValueError("Una ecuación de orden superior lleva una variable y una expresión")
+        expresiones, nombres = reducir_orden(expresiones[0], nombres[0], len(valores))
+    elif tipo != SISTEMA:
+        raise ValueError(f"Tipo de problema desconocido: {tipo}")
+    if len(valores) != len(nombres):
+        raise ValueError(f"Se esperan {len(nombres)} valores iniciales (uno por variable)")
+    return expresiones, nombres, valores
+
+
+def preparar_problema(tipo, texto, variables, valores_iniciales, jacobiano=False):
+    """Convierte lo que escribe el usuario en (f, y0, nombres).
+
+    - Escalar: texto = f(t, y), una variable y un valor inicial.
+    - Sistema: expresiones separadas por ';' (una por variable), en el orden de `variables`.
+    - Orden superior: texto = y^(n) en función de t, y, dy, d2y, ...; el orden es la
+      cantidad de valores iniciales (y(t0), y'(t0), ...).
+
+    Con jacobiano=True devuelve además J(t, y) (ver compilar_jacobiano).
+    """
+    expresiones, nombres, valores = _leer_problema(tipo, texto, variables, valores_iniciales)
+    if tipo == ESCALAR:
+        f = compilar_rhs(expresiones[0], f"t {nombres[0]}")
+        if not jacobiano:
+            return f, valores[0], nombres
+        return f, valores[0], nombres, compilar_jacobiano(tuple(expresiones), tuple(nombres))
+    f = compilar_sistema(tuple(expresiones), tuple(nombres))
+    if not jacobiano:
+        return f, np.array(valores), nombres
+    return f, np.array(valores), nombres, compilar_jacobiano(tuple(expresiones), tuple(nombres))
+
+
+def preparar_ensamble(tipo, texto, variables, valores_iniciales, parametros=""):
+    """Como preparar_problema, pero para integrar muchos miembros a la vez: (F, y0, nombres).
+
+    F(t, Y, P) es compilar_ensamble del sistema equivalente (también para una ecuación
+    escalar, que pasa a ser un sistema de una variable); y0 es el vector (d,) nominal.
+    `parametros` son los nombres (separados por espacios o comas) que varían por miembro.
+    """
+    expresiones, nombres, valores = _leer_problema(tipo, texto, variables, valores_iniciales)
+    parametros = tuple(parametros.replace(",", " ").split())
+    return compilar_ensamble(tuple(expresiones), tuple(nombres), parametros), np.array(valores), nombres
+
+
+def preparar_eventos(tipo, texto, variables, valores_iniciales, eventos, accion=REGISTRAR, direccion=0):
+    """Eventos g(t, y) = 0 (expresiones separadas por ';') del problema que describe el usuario.
+
+    Las expresiones usan t y las variables del estado (en orden superior y, dy, d2y, ...):
+    "y" detecta y = 0 y "dy" con direccion=-1 los máximos de y.
+    """
+    _, nombres, _ = _leer_problema(tipo, texto, variables, valores_iniciales)
+    expresiones = tuple(e.strip() for e in eventos.split(";") if e.strip())
+    return [Evento(g, accion, direccion, nombre)
+            for g, nombre in zip(compilar_eventos(expresiones, tuple(nombres)), expresiones)]
+
+
+def numero_pasos(t0, t_fin, h):
+    if h <= 0:
+        raise ValueError("El paso h debe ser positivo")
+    if t_fin <= t0:
+        raise ValueError("t_end debe ser mayor que t0")
+    return int((t_fin - t0) / h)
+
+
+class Evento:
+    """Cruce por cero de g(t, y) (y como vector del estado) que se vigila al integrar.
+
+    `direccion`: +1 sólo cruces de g < 0 a g > 0, -1 al revés, 0 ambos. `accion`:
+    REGISTRAR guarda t e y de cada cruce, CONTAR sólo cuántos hubo y TERMINAR además
+    detiene la integración en el primero.
+    """
+
+    def __init__(self, g, accion=REGISTRAR, direccion=0, nombre="g"):
+        if accion not in ACCIONES_EVENTO:
+            raise ValueError(f"Acción de evento desconocida: {accion}")
+        self.g = g
+        self.accion = accion
+        self.direccion = direccion
+        self.nombre = nombre
+
+
+class OcurrenciasEvento:
+    """Cruces de un Evento en una integración: cantidad y (salvo con CONTAR) t e y de cada uno"""
+
+    def __init__(self, evento, escalar):
+        self.evento = evento
+        self.cantidad = 0
+        self._escalar = escalar
+        self._t, self._y = [], []
+
+    def agregar(self, t, y):
+        self.cantidad += 1
+        if self.evento.accion != CONTAR:
+            self._t.append(t)
+            self._y.append(y[0] if self._escalar else np.array(y))
+
+    @property
+    def t(self):
+        return np.array(self._t)
+
+    @property
+    def y(self):
+        return np.array(self._y)
+
+
+def interpolante_hermite(f, t0, y0, f0, t1, y1, escalar=False):
+    """y(t0 + θ·(t1 - t0)) como vector: cúbica de Hermite con y y f en los extremos.
+
+    Es la salida densa de los RK de paso fijo. f(t1, y1) se evalúa recién al usar el
+    interpolante, es decir, sólo en los pasos donde algún evento cambió de signo.
+    """
+    h = t1 - t0
+    y0, f0, y1 = np.atleast_1d(y0), np.atleast_1d(f0), np.atleast_1d(y1)
+    f1 = []
+
+    def y(theta):
+        if not f1:
+            f1.append(np.atleast_1d(np.asarray(f(t1, y1[0] if escalar else y1), dtype=float)))
+        t2, t3 = theta * theta, theta * theta * theta
+        return ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + theta) * h * f0 + (3 * t2 - 2 * t3) * y1
+                + (t3 - t2) * h * f1[0])
+    return y
+
+
+class _DetectorEventos:
+    """Prueba de signo de cada g al final de cada paso y raíz (brentq) sobre el interpolante"""
+
+    def __init__(self, eventos, t0, y0, escalar):
+        self.eventos = list(eventos)
+        self.ocurrencias = [OcurrenciasEvento(e, escalar) for e in self.eventos]
+        y0 = np.atleast_1d(y0)
+        self.g = [float(e.g(t0, y0)) for e in self.eventos]
+
+    def revisar(self, t0, t1, y1, interpolante):
+        """Registra los cruces en (t0, t1]; (t, y, θ) del primer evento terminal o None"""
+        y1 = np.atleast_1d(y1)
+        nuevos = [float(e.g(t1, y1)) for e in self.eventos]
+        cruces = []
+        for i, (evento, ga, gb) in enumerate(zip(self.eventos, self.g, nuevos)):
+            # g(t0) = 0 ya se contó como final del paso anterior
+            if ga == 0 or ga * gb > 0 or not np.isfinite(gb):
+                continue
+            if evento.direccion and np.sign(gb - ga) != np.sign(evento.direccion):
+                continue
+            cruces.append((self._raiz(evento.g, t0, t1, interpolante, ga, gb), i))
+        self.g = nuevos
+        for theta, i in sorted(cruces):
+            te, ye = t0 + theta * (t1 - t0), interpolante(theta)
+            self.ocurrencias[i].agregar(te, ye)
+            if self.eventos[i].accion == TERMINAR:
+                return te, ye, theta
+        return None
+
+    @staticmethod
+    def _raiz(g, t0, t1, interpolante, ga, gb):
+        if gb == 0:
+            return 1.0
+        phi = lambda theta: float(g(t0 + theta * (t1 - t0), interpolante(theta)))
+        fa, fb = phi(0.0), phi(1.0)
+        # El interpolante coincide con los extremos salvo redondeo: si no encierra la raíz
+        # se toma el final del paso
+        if fa * fb > 0:
+            return 1.0
+        return brentq(phi, 0.0, 1.0, xtol=TOL_EVENTO)
+
+
+def _pasos_escalar(f, tabla, t, y, h, k, control, detector=None):
+    """Bucle para y escalar con floats de Python (más rápido que arreglos de tamaño 1).
+
+    Devuelve la cantidad de pasos dados (menos que t.size - 1 si un evento terminó).
+    """
+    s, n = tabla.etapas, t.size - 1
+    # Coeficientes ya multiplicados por h: el bucle sólo hace productos y sumas
+    hA = [tuple((h * tabla.A[i, :i]).tolist()) for i in range(s)]
+    hc = tuple((h * tabla.c).tolist())
+    hb = tuple((h * tabla.b).tolist())
+    tl = t.tolist()
+    K = [0.0] * s
+    yn = float(y[0])
+    for paso in range(n):
+        tn = tl[paso]
+        for i in range(s):
+            yi = yn
+            for j, a in enumerate(hA[i]):
+                yi += a * K[j]
+            K[i] = f(tn + hc[i], yi)
+        for i in range(s):
+            yn += hb[i] * K[i]
+        y[paso + 1] = yn
+        if k is not None:
+            k[paso] = K
+        if detector is not None:
+            # K[0] = f(t_n, y_n): todas las tablas explícitas tienen c_1 = 0
+            corte = detector.revisar(tn, tl[paso + 1], yn,
+                                   interpolante_hermite(f, tn, y[paso], K[0], tl[paso + 1], yn, escalar=True))
+            if corte is not None:
+                t[paso + 1], y[paso + 1] = corte[0], corte[1][0]
+                return paso + 1
+        if control is not None and paso % PASOS_POR_AVISO == 0:
+            control.progreso(paso / n, f"Paso {paso} de {n}")
+    return n
+
+
+def _pasos_vector(f, tabla, t, y, h, k, control, detector=None):
+    s, n = tabla.etapas, t.size - 1
+    hA = [h * tabla.A[i, :i] for i in range(s)]
+    hc = h * tabla.c
+    hb = h * tabla.b
+    K = np.empty((s, y.shape[1]))
+    for paso in range(n):
+        tn, yn = t[paso], y[paso]
+        for i in range(s):
+            K[i] = f(tn + hc[i], yn + hA[i] @ K[:i])
+        y[paso + 1] = yn + hb @ K
+        if k is not None:
+            k[paso] = K
+        if detector is not None:
+            corte = detector.revisar(tn, t[paso + 1], y[paso + 1],
+                                   interpolante_hermite(f, tn, yn, K[0].copy(), t[paso + 1], y[paso + 1].copy()))
+            if corte is not None:
+                t[paso + 1], y[paso + 1] = corte[0], corte[1]
+                return paso + 1
+        if control is not None and paso % PASOS_POR_AVISO == 0:
+            control.progreso(paso / n, f"Paso {paso} de {n}")
+    return n
+
+
+def integrar_rk(f, t0, y0, t_fin, h, metodo="RK4", etapas=False, eventos=None, control=None):
+    """Integra y' = f(t, y) con paso fijo h y el método `metodo` (nombre o TablaButcher).
+
+    Devuelve (t, y) o, con etapas=True, (t, y, k) donde k[n, i] es la pendiente k_(i+1)
+    del paso n. Con y0 escalar, y tiene forma (n+1,); con un vector, (n+1, d).
+    Con `eventos` (lista de Evento) se agrega al final la lista de OcurrenciasEvento;
+    si uno terminal ocurre, el último punto de t e y es el del evento.
+    """
+    tabla = METODOS_RK[metodo] if isinstance(metodo, str) else metodo
+    n = numero_pasos(t0, t_fin, h)
+    t = t0 + h * np.arange(n + 1)
+    escalar = np.ndim(y0) == 0
+    detector = _DetectorEventos(eventos, t0, y0, escalar) if eventos else None
+    if escalar:
+        y = np.empty(n + 1)
+        y[0] = y0
+        k = np.empty((n, tabla.etapas)) if etapas else None
+        pasos = _pasos_escalar(f, tabla, t, y, h, k, control, detector)
+    else:
+        y0 = np.asarray(y0, dtype=float)
+        y = np.empty((n + 1, y0.size))
+        y[0] = y0
+        k = np.empty((n, tabla.etapas, y0.size)) if etapas else None
+        pasos = _pasos_vector(f, tabla, t, y, h, k, control, detector)
+    if pasos < n:
+        t, y, k = t[:pasos + 1], y[:pasos + 1], None if k is None else k[:pasos]
+    salida = (t, y, k) if etapas else (t, y)
+    return salida if eventos is None else salida + (detector.ocurrencias if detector else [],)
+
+
+def integrar_rk_fusionado(F, t0, y0, t_fin, h, metodos, control=None):
+    """Varios RK explícitos a la vez sobre la misma grilla: (t, Y, evaluaciones).
+
+    Y[n, j] es y_n del método metodos[j], con forma (n+1, M, d). Los estados de todos
+    los métodos se apilan en un arreglo y cada etapa llama una sola vez a F(t, Y)
+    (compilar_ensamble) para todos los que la tienen. Métodos con la misma tabla (p. ej.
+    RK2 y Punto Medio) tienen los mismos estados y se calculan una sola vez.
+    `evaluaciones` cuenta filas evaluadas (una por método distinto y etapa).
+    """
+    tablas = [METODOS_RK[m] if isinstance(m, str) else m for m in metodos]
+    # Tablas distintas, ordenadas por etapas: los que tienen la etapa i son un prefijo
+    distintas = []
+    for tabla in sorted(tablas, key=lambda tabla: -tabla.etapas):
+        if not any(tabla.etapas == otra.etapas and np.array_equal(tabla.A, otra.A)
+                   and np.array_equal(tabla.b, otra.b) for otra in distintas):
+            distintas.append(tabla)
+    indice = [next(j for j, otra in enumerate(distintas) if otra.etapas == tabla.etapas
+                   and np.array_equal(tabla.A, otra.A) and np.array_equal(tabla.b, otra.b))
+              for tabla in tablas]
+
+    n = numero_pasos(t0, t_fin, h)
+    t = t0 + h * np.arange(n + 1)
+    y0 = np.atleast_1d(np.asarray(y0, dtype=float))
+    M, d = len(distintas), y0.size
+    s = distintas[0].etapas
+    # Tablas rellenadas con ceros hasta s etapas; hA[i] es (i, M, 1) para sumar sobre K[:i]
+    hA, hb, hc = np.zeros((s, s, M, 1)), np.zeros((s, M, 1)), np.zeros((s, M))
+    for j, tabla in enumerate(distintas):
+        e = tabla.etapas
+        hA[:e, :e, j, 0], hb[:e, j, 0], hc[:e, j] = h * tabla.A, h * tabla.b, h * tabla.c
+    con_etapa = [sum(tabla.etapas > i for tabla in distintas) for i in range(s)]
+
+    Y = np.empty((n + 1, M, d))
+    Y[0] = y0
+    K = np.zeros((s, M, d))
+    for paso in range(n):
+        tn, yn = t[paso], Y[paso]
+        for i, m in enumerate(con_etapa):
+            K[i, :m] = F(tn + hc[i, :m], yn[:m] + (hA[i, :i, :m] * K[:i, :m]).sum(axis=0))
+        Y[paso + 1] = yn + (hb * K).sum(axis=0)
+        if control is not None and paso % PASOS_POR_AVISO == 0:
+            control.progreso(paso / n, f"Paso {paso} de {n}")
+    return t, Y[:, indice], n * sum(con_etapa)
+
+
+class SolucionEDO:
+    """Resultado de integrar_adaptativo (y de los implícitos de edo_rigidos): pasos
+    aceptados, muestras pedidas y estadísticas.
+
+    Con denso=True la solución se puede evaluar en cualquier t de [t0, t_fin]: sol(t).
+    """
+
+    def __init__(self, t, y, t_eval, y_eval, evaluaciones, rechazados, escalar, denso=None,
+                 jacobianos=0, factorizaciones=0, eventos=None):
+        self.t = t
+        self.y = y
+        self.t_eval = t_eval
+        self.y_eval = y_eval
+        self.evaluaciones = evaluaciones
+        self.aceptados = t.size - 1
+        self.rechazados = rechazados
+        self.jacobianos = jacobianos
+        self.factorizaciones = factorizaciones
+        self.eventos = [] if eventos is None else eventos   # OcurrenciasEvento, una por Evento
+        self._escalar = escalar
+        self._denso = denso
+
+    def __call__(self, t):
+        if self._denso is None:
+            raise ValueError("La solución no guardó la salida densa (usar denso=True)")
+        bordes, Y, Q = self._denso
+        t = np.asarray(t, dtype=float)
+        # Paso que contiene cada t y posición θ dentro de él
+        i = np.clip(np.searchsorted(bordes, t, side="right") - 1, 0, len(Q) - 1)
+        h = bordes[i + 1] - bordes[i]
+        theta = (t - bordes[i]) / h
+        potencias = theta[..., None] ** np.arange(1, Q.shape[1] + 1)
+        y = Y[i] + h[..., None] * np.einsum("...p,...pd->...d", potencias, Q[i])
+        return y[..., 0] if self._escalar else y
+
+
+def _norma_error(error, y, y_nuevo, rtol, atol):
+    escala = atol + rtol * np.maximum(np.abs(y), np.abs(y_nuevo))
+    return float(np.sqrt(np.mean((error / escala) ** 2)))
+
+
+def paso_inicial(f, t0, y0, f0, orden, rtol, atol, sentido=1.0):
+    """Primer paso según Hairer-Nørsett-Wanner (II.4): usa dos evaluaciones de f.
+
+    Con un ensamble (y0 de forma (m, d)) devuelve un paso por miembro.
+    """
+    escala = atol + rtol * np.abs(y0)
+    d0 = np.sqrt(np.mean((y0 / escala) ** 2, axis=-1))
+    d1 = np.sqrt(np.mean((f0 / escala) ** 2, axis=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / d1)
+    f1 = np.asarray(f(t0 + sentido * h0, y0 + sentido * h0[..., None] * f0), dtype=float)
+    d2 = np.sqrt(np.mean(((f1 - f0) / escala) ** 2, axis=-1)) / h0
+    d = np.maximum(d1, d2)
+    with np.errstate(divide="ignore"):
+        h1 = np.where(d <= 1e-15, np.maximum(1e-6, h0 * 1e-3), (0.01 / d) ** (1.0 / (orden + 1)))
+    return np.minimum(100 * h0, h1)
+
+
+def integrar_adaptativo(f, t0, y0, t_fin, metodo="DP45", rtol=1e-6, atol=1e-9, h0=None, h_max=np.inf,
+                        t_eval=None, denso=False, eventos=None, max_pasos=MAX_PASOS, control=None):
+    """Integra y' = f(t, y) en [t0, t_fin] con paso adaptativo y un par embebido.
+
+    El paso se elige con un controlador PI sobre la norma RMS del error local relativo
+    a atol + rtol·|y|. `t_eval` (ordenado) se llena con la salida densa a medida que se
+    avanza. Los `eventos` se buscan sobre la salida densa de cada paso aceptado; uno
+    terminal corta la integración en el evento. Devuelve una SolucionEDO.
+    """
+    tabla = METODOS_ADAPTATIVOS[metodo] if isinstance(metodo, str) else metodo
+    if t_fin <= t0:
+        raise ValueError("t_end debe ser mayor que t0")
+    if rtol <= 0 or atol < 0:
+        raise ValueError("rtol debe ser positivo y atol no negativo")
+    escalar = np.ndim(y0) == 0
+    y = np.atleast_1d(np.asarray(y0, dtype=float)).copy()
+    d, s = y.size, tabla.etapas
+
+    t_eval = None if t_eval is None else np.asarray(t_eval, dtype=float)
+    y_eval = None if t_eval is None else np.full((t_eval.size, d), np.nan)
+    siguiente = 0
+    if t_eval is not None:
+        while siguiente < t_eval.size and t_eval[siguiente] <= t0:
+            if t_eval[siguiente] == t0:
+                y_eval[siguiente] = y
+            siguiente += 1
+
+    A, c, b, e = tabla.A, tabla.c, tabla.b, tabla.e
+    # Controlador PI (Gustafsson): exponentes sobre el error actual y el del paso anterior
+    k = min(tabla.orden, tabla.orden_error) + 1
+    alfa, beta = 0.7 / k, 0.4 / k
+
+    K = np.empty((s, d))
+    K[0] = f(t0, y)
+    evaluaciones = 1
+    if h0 is None:
+        h = float(paso_inicial(f, t0, y, K[0], tabla.orden, rtol, atol))
+        evaluaciones += 1
+    else:
+        h = h0
+    h = min(h, h_max, t_fin - t0)
+
+    ts, ys, Qs = [t0], [y.copy()], []
+    t = t0
+    error_previo = 1.0
+    rechazados = 0
+    rechazado = False
+    detector = _DetectorEventos(eventos, t0, y, escalar) if eventos else None
+    terminado = False
+    while t < t_fin and not terminado:
+        if len(ts) > max_pasos:
+            raise RuntimeError(f"Se superó el máximo de {max_pasos} pasos (¿problema rígido?)")
+        # Evita dejar un último paso diminuto
+        if t + 1.1 * h >= t_fin:
+            h = t_fin - t
+        if h <= 1e-14 * max(abs(t), 1.0):
+            raise RuntimeError(f"El paso se hizo demasiado chico en t = {t:.6g}")
+
+        for i in range(1, s):
+            K[i] = f(t + c[i] * h, y + h * (A[i, :i] @ K[:i]))
+        evaluaciones += s - 1
+        y_nuevo = y + h * (b @ K)
+        error = _norma_error(h * (e @ K), y, y_nuevo, rtol, atol)
+
+        if error <= 1.0:
+            t_nuevo = t + h
+            if tabla.fsal:
+                # FSAL: la última etapa ya es f(t_nuevo, y_nuevo)
+                f_nuevo = K[-1].copy()
+            else:
+                f_nuevo = np.asarray(f(t_nuevo, y_nuevo), dtype=float)
+                evaluaciones += 1
+            Q = K.T @ tabla.P   # (d, grado): coeficientes de la salida densa del paso
+            potencias_grado = np.arange(1, Q.shape[1] + 1)
+            if detector is not None:
+                corte = detector.revisar(t, t_nuevo, y_nuevo, lambda theta: y + h * (theta ** potencias_grado) @ Q.T)
+                if corte is not None:
+                    # El paso se acorta hasta el evento: la salida densa pasa a [t, t_evento]
+                    t_nuevo, y_nuevo, theta = corte
+                    Q = Q * theta ** np.arange(Q.shape[1])
+                    h = t_nuevo - t
+                    terminado = True
+            if t_eval is not None:
+                fin = siguiente
+                while fin < t_eval.size and t_eval[fin] <= t_nuevo:
+                    fin += 1
+                if fin > siguiente:
+                    theta = (t_eval[siguiente:fin] - t) / h
+                    potencias = theta[:, None] ** potencias_grado
+                    y_eval[siguiente:fin] = y + h * potencias @ Q.T
+                    siguiente = fin
+            if denso:
+                Qs.append(Q.T.copy())
+            t, y = t_nuevo, y_nuevo
+            ts.append(t)
+            ys.append(y.copy())
+            K[0] = f_nuevo
+            factor = SEGURIDAD * max(error, 1e-10) ** -alfa * error_previo ** beta
+            factor = min(FACTOR_MAX, max(FACTOR_MIN, factor))
+            if rechazado:
+                factor = min(factor, 1.0)
+            error_previo = max(error, 1e-4)
+            rechazado = False
+            if control is not None:
+                control.progreso((t - t0) / (t_fin - t0), f"t = {t:.4g} ({len(ts) - 1} pasos)")
+        else:
+            factor = max(FACTOR_MIN, SEGURIDAD * error ** (-1.0 / k))
+            rechazados += 1
+            rechazado = True
+        h = min(h * factor, h_max)
+
+    t_arr, y_arr = np.array(ts), np.array(ys)
+    denso_datos = (t_arr, y_arr, np.array(Qs)) if denso else None
+    if escalar:
+        y_arr = y_arr[:, 0]
+        y_eval = None if y_eval is None else y_eval[:, 0]
+    return SolucionEDO(t_arr, y_arr, t_eval, y_eval, evaluaciones, rechazados, escalar, denso_datos,
+                       eventos=None if detector is None else detector.ocurrencias)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Integración de ensambles: la misma y' = f(t, y) desde muchos y0 y valores de parámetros.
+
+- El estado es un arreglo (m, d): m miembros y d variables. F(t, Y, P) (compilada con
+  edo_engine.compilar_ensamble) se evalúa una sola vez por etapa para todo el ensamble.
+- Paso fijo: todos los miembros avanzan juntos con un RK explícito (METODOS_RK).
+- Paso adaptativo (DP45, BS23): cada miembro tiene su propio t y su propio h. En cada
+  iteración sólo se calculan los miembros que no llegaron a t_fin (máscara), y la
+  salida densa lleva a cada uno a la grilla común t_eval.
+- Por defecto sólo se guardan la media y los cuantiles en cada t; los miembros
+  completos (n_t, m, d) sólo con guardar=True. En el adaptativo cada fila de la grilla
+  se resume apenas todos los miembros la pasaron: en memoria quedan sólo las filas
+  entre el miembro más atrasado y el más adelantado.
+"""
+
+import numpy as np
+
+from edo_engine import (FACTOR_MAX, FACTOR_MIN, MAX_PASOS, METODOS_ADAPTATIVOS, METODOS_RK, PASOS_POR_AVISO,
+                        SEGURIDAD, numero_pasos, paso_inicial)
+
+NIVELES = (0.05, 0.5, 0.95)
+
+
+class ResultadoEnsamble:
+    """Resumen del ensamble en la grilla t: media (n_t, d), cuantiles (n_t, q, d) en los
+    `niveles` pedidos y, si se guardaron, los miembros (n_t, m, d)"""
+
+    def __init__(self, t, niveles, forma, guardar=False):
+        m, d = forma
+        self.t = t
+        self.niveles = tuple(niveles)
+        self.media = np.full((t.size, d), np.nan)
+        self.cuantiles = np.full((t.size, len(self.niveles), d), np.nan)
+        self.miembros = np.full((t.size, m, d), np.nan) if guardar else None
+        self.evaluaciones = 0   # llamadas a F (cada una para todos los miembros activos)
+        self.aceptados = 0      # pasos por miembro (arreglo (m,) en el adaptativo)
+        self.rechazados = 0
+
+    def registrar(self, i, Y):
+        self.media[i] = Y.mean(axis=0)
+        self.cuantiles[i] = np.quantile(Y, self.niveles, axis=0)
+        if self.miembros is not None:
+            self.miembros[i] = Y
+
+    def cuantil(self, nivel):
+        """Trayectoria (n_t, d) del cuantil `nivel` (uno de los niveles pedidos)"""
+        return self.cuantiles[:, self.niveles.index(nivel)]
+
+
+def integrar_ensamble_rk(F, t0, Y0, t_fin, h, metodo="RK4", P=None, niveles=NIVELES, guardar=False,
+                         control=None):
+    """Todos los miembros Y0 (m, d) con paso fijo h y el RK explícito `metodo`.
+
+    P (m, p) son los parámetros de cada miembro (o None). Devuelve un ResultadoEnsamble
+    en la grilla t0 + h·k.
+    """
+    tabla = METODOS_RK[metodo] if isinstance(metodo, str) else metodo
+    n = numero_pasos(t0, t_fin, h)
+    t = t0 + h * np.arange(n + 1)
+    Y = np.array(Y0, dtype=float)
+    resultado = ResultadoEnsamble(t, niveles, Y.shape, guardar)
+    resultado.registrar(0, Y)
+
+    s = tabla.etapas
+    hA = [h * tabla.A[i, :i] for i in range(s)]
+    hc = h * tabla.c
+    hb = h * tabla.b
+    K = np.empty((s,) + Y.shape)
+    for paso in range(n):
+        tn = t[paso]
+        for i in range(s):
+            K[i] = F(tn + hc[i], Y + np.tensordot(hA[i], K[:i], axes=1), P)
+        Y = Y + np.tensordot(hb, K, axes=1)
+        resultado.registrar(paso + 1, Y)
+        if control is not None and paso % PASOS_POR_AVISO == 0:
+            control.progreso(paso / n, f"Paso {paso} de {n}")
+    resultado.evaluaciones = n * s
+    resultado.aceptados = n
+    return resultado
+
+
+def integrar_ensamble_adaptativo(F, t0, Y0, t_fin, t_eval, metodo="DP45", rtol=1e-6, atol=1e-9, P=None,
+                                 niveles=NIVELES, guardar=False, max_pasos=MAX_PASOS, control=None):
+    """Todos los miembros Y0 (m, d) con paso adaptativo propio, resumidos en t_eval.
+
+    Es integrar_adaptativo vectorizado sobre los miembros: el control PI, FSAL y la
+    salida densa son los mismos, pero h, t y el error son arreglos (m,).
+    """
+    tabla = METODOS_ADAPTATIVOS[metodo] if isinstance(metodo, str) else metodo
+    if t_fin <= t0:
+        raise ValueError("t_end debe ser mayor que t0")
+    if rtol <= 0 or atol < 0:
+        raise ValueError("rtol debe ser positivo y atol no negativo")
+    t_eval = np.asarray(t_eval, dtype=float)
+    if t_eval.size == 0 or np.any(np.diff(t_eval) < 0) or t_eval[0] < t0 or t_eval[-1] > t_fin:
+        raise ValueError("t_eval debe estar ordenado y dentro de [t0, t_end]")
+    Y = np.array(Y0, dtype=float)
+    m, d = Y.shape
+    s = tabla.etapas
+    A, b, c, e = tabla.A, tabla.b, tabla.c, tabla.e
+    resultado = ResultadoEnsamble(t_eval, niveles, Y.shape, guardar)
+
+    k = min(tabla.orden, tabla.orden_error) + 1
+    alfa, beta = 0.7 / k, 0.4 / k
+
+    T = np.full(m, float(t0))
+    K = np.empty((s, m, d))
+    K[0] = F(T, Y, P)
+    H = np.minimum(paso_inicial(lambda t, y: F(t, y, P), T, Y, K[0], tabla.orden, rtol, atol), t_fin - t0)
+    evaluaciones = 2
+    error_previo = np.ones(m)
+    rechazado = np.zeros(m, dtype=bool)
+    aceptados = np.zeros(m, dtype=int)
+    rechazados = np.zeros(m, dtype=int)
+
+    siguiente = np.zeros(m, dtype=int)   # próxima fila de t_eval de cada miembro
+    filas = {}                           # filas de t_eval a medio llenar: índice -> (m, d)
+    resumidas = 0
+    iteraciones = 0
+    while True:
+        activos = np.flatnonzero(T < t_fin)
+        if activos.size == 0:
+            break
+        iteraciones += 1
+        if iteraciones > max_pasos:
+            raise RuntimeError(f"Se superó el máximo de {max_pasos} pasos (¿problema rígido?)")
+        Ta, Ya = T[activos], Y[activos]
+        Pa = None if P is None else P[activos]
+        # Evita dejar un último paso diminuto
+        ultimo = Ta + 1.1 * H[activos] >= t_fin
+        Ha = np.where(ultimo, t_fin - Ta, H[activos])
+        if np.any(Ha <= 1e-14 * np.maximum(np.abs(Ta), 1.0)):
+            raise RuntimeError(f"El paso se hizo demasiado chico en t = {Ta[np.argmin(Ha)]:.6g}")
+
+        Ka = K[:, activos]
+        for i in range(1, s):
+            Ka[i] = F(Ta + c[i] * Ha, Ya + Ha[:, None] * np.tensordot(A[i, :i], Ka[:i], axes=1), Pa)
+        evaluaciones += s - 1
+        Y_nuevo = Ya + Ha[:, None] * np.tensordot(b, Ka, axes=1)
+        escala = atol + rtol * np.maximum(np.abs(Ya), np.abs(Y_nuevo))
+        error = np.sqrt(np.mean((Ha[:, None] * np.tensordot(e, Ka, axes=1) / escala) ** 2, axis=1))
+        ok = error <= 1.0
+
+        # Miembros que aceptan el paso
+        aceptan = activos[ok]
+        Ta_ok, Ha_ok, Ya_ok = Ta[ok], Ha[ok], Ya[ok]
+        T_nuevo = np.where(ultimo[ok], t_fin, Ta_ok + Ha_ok)
+        Q = np.einsum("sad,sg->adg", Ka[:, ok], tabla.P)   # salida densa de cada miembro
+        potencias_grado = np.arange(1, Q.shape[2] + 1)
+        while True:
+            fila = siguiente[aceptan]
+            pendiente = np.flatnonzero((fila < t_eval.size) & (t_eval[np.minimum(fila, t_eval.size - 1)] <= T_nuevo))
+            if pendiente.size == 0:
+                break
+            fila = fila[pendiente]
+            theta = (t_eval[fila] - Ta_ok[pendiente]) / Ha_ok[pendiente]
+            Y_fila = Ya_ok[pendiente] + Ha_ok[pendiente, None] * np.einsum(
+                "adg,ag->ad", Q[pendiente], theta[:, None] ** potencias_grado)
+            for i in np.unique(fila):
+                en_fila = fila == i
+                filas.setdefault(i, np.empty((m, d)))[aceptan[pendiente[en_fila]]] = Y_fila[en_fila]
+            siguiente[aceptan[pendiente]] += 1
+
+        if tabla.fsal:
+            # FSAL: la última etapa ya es f(t_nuevo, y_nuevo)
+            K[0, aceptan] = Ka[-1, ok]
+        else:
+            K[0, aceptan] = F(T_nuevo, Y_nuevo[ok], None if Pa is None else Pa[ok])
+            evaluaciones += 1
+        T[aceptan] = T_nuevo
+        Y[aceptan] = Y_nuevo[ok]
+        aceptados[aceptan] += 1
+        rechazados[activos[~ok]] += 1
+
+        # Controlador PI por miembro; tras un rechazo el paso no crece
+        factor = np.where(ok, SEGURIDAD * np.maximum(error, 1e-10) ** -alfa * error_previo[activos] ** beta,
+                          SEGURIDAD * np.maximum(error, 1e-10) ** (-1.0 / k))
+        factor = np.clip(factor, FACTOR_MIN, np.where(ok & ~rechazado[activos], FACTOR_MAX, 1.0))
+        H[activos] = Ha * factor
+        error_previo[aceptan] = np.maximum(error[ok], 1e-4)
+        rechazado[activos] = ~ok
+
+        # Filas que ya pasaron todos los miembros: se resumen y se liberan
+        completas = siguiente.min()
+        while resumidas < completas:
+            resultado.registrar(resumidas, filas.pop(resumidas))
+            resumidas += 1
+        if control is not None and iteraciones % 16 == 0:
+            control.progreso((T.min() - t0) / (t_fin - t0), f"t = {T.min():.4g} ({activos.size} miembros activos)")
+
+    resultado.evaluaciones = evaluaciones
+    resultado.aceptados = aceptados
+    resultado.rechazados = rechazados
+    return resultado
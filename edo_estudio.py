@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Estudio de convergencia y de trabajo-precisión de los métodos para EDO.
+
+- Cada método se corre con una sucesión geométrica de pasos h, h/2, h/4, ... (los
+  adaptativos con tolerancias rtol, rtol/10, ...) y se mide el error en t_fin contra
+  la solución analítica (si la hay; sólo la primera componente) o contra una
+  referencia de DP45 con rtol = 1e-12 (todas las componentes).
+- El orden observado es la pendiente de log(error) contra log(h) por mínimos
+  cuadrados; en los adaptativos h es el paso medio (t_fin - t0) / pasos aceptados.
+  Los errores al nivel del redondeo no entran en el ajuste.
+- Trabajo-precisión: por cada corrida se guardan las evaluaciones de f y el tiempo de
+  reloj (el mínimo de algunas repeticiones si la corrida es corta), para elegir el
+  método más barato que alcanza una precisión.
+- Los métodos se reparten entre procesos (un método por TrabajoProceso, a lo sumo
+  `trabajadores` a la vez): estudiar_metodo es una función de módulo y el problema
+  viaja como texto, que cada proceso compila. Al cancelar se terminan los procesos
+  en curso, así que los núcleos quedan libres enseguida.
+"""
+
+import os
+import time
+
+import numpy as np
+import sympy as sp
+
+from edo_analitica import compilar_solucion
+from edo_engine import METODOS_ADAPTATIVOS, METODOS_RK, integrar_adaptativo, integrar_rk, preparar_problema
+from edo_rigidos import METODOS_IMPLICITOS, integrar_implicito
+from ejecutor_tareas import TrabajoProceso, esperar_trabajos
+
+PASOS_ESTUDIO = 6
+RAZON_PASOS = 2
+RTOL_ESTUDIO = 1e-3          # primera tolerancia de los adaptativos (atol = rtol/1000)
+RAZON_TOLERANCIAS = 10.0
+RTOL_REFERENCIA = 1e-12
+ATOL_REFERENCIA = 1e-14
+ERROR_REDONDEO = 1e-13       # errores menores no se usan para estimar el orden
+DIVERGENCIA = 1e6            # error relativo a 1 + |y| a partir del cual la corrida divergió
+REPETICIONES = 3
+TIEMPO_MEDICION = 0.2        # las corridas se repiten (hasta REPETICIONES) mientras no lo superen
+ESPERA_S = 0.2
+
+
+def orden_teorico(metodo):
+    for metodos in (METODOS_RK, METODOS_ADAPTATIVOS, METODOS_IMPLICITOS):
+        if metodo in metodos:
+            return metodos[metodo].orden
+    raise ValueError(f"Método desconocido: {metodo}")
+
+
+def orden_observado(h, errores):
+    """Pendiente de log(error) contra log(h); NaN si quedan menos de dos puntos útiles"""
+    h, errores = np.asarray(h, dtype=float), np.asarray(errores, dtype=float)
+    utiles = np.isfinite(errores) & (errores > ERROR_REDONDEO)
+    if np.count_nonzero(utiles) < 2:
+        return np.nan
+    return float(np.polyfit(np.log(h[utiles]), np.log(errores[utiles]), 1)[0])
+
+
+class EstudioMetodo:
+    """Corridas de un método: h (o paso medio), error en t_fin, evaluaciones de f y
+    tiempo de reloj (s) por corrida, con el orden teórico y el observado"""
+
+    def __init__(self, metodo, h, errores, evaluaciones, tiempos):
+        self.metodo = metodo
+        self.h = np.asarray(h, dtype=float)
+        self.errores = np.asarray(errores, dtype=float)
+        self.evaluaciones = np.asarray(evaluaciones, dtype=int)
+        self.tiempos = np.asarray(tiempos, dtype=float)
+        self.orden_teorico = orden_teorico(metodo)
+        self.orden = orden_observado(self.h, self.errores)
+
+    def mas_barato(self, tolerancia):
+        """Índice de la corrida con menos evaluaciones cuyo error es <= tolerancia (o None)"""
+        cumplen = np.flatnonzero(self.errores <= tolerancia)
+        return None if cumplen.size == 0 else int(cumplen[np.argmin(self.evaluaciones[cumplen])])
+
+
+def _correr(f, jac, metodo, t0, y0, t_fin, h, rtol):
+    """(t final, y final, evaluaciones de f, paso medio) de una corrida"""
+    if metodo in METODOS_ADAPTATIVOS:
+        sol = integrar_adaptativo(f, t0, y0, t_fin, metodo, rtol, rtol * 1e-3)
+        return sol.t[-1], sol.y[-1], sol.evaluaciones, (sol.t[-1] - t0) / sol.aceptados
+    if metodo in METODOS_IMPLICITOS:
+        sol = integrar_implicito(f, t0, y0, t_fin, h, metodo, jac=jac)
+        return sol.t[-1], sol.y[-1], sol.evaluaciones, h
+    t, y = integrar_rk(f, t0, y0, t_fin, h, metodo)
+    return t[-1], y[-1], (t.size - 1) * METODOS_RK[metodo].etapas, h
+
+
+def _medir(f, jac, metodo, t0, y0, t_fin, h, rtol):
+    mejor, total = np.inf, 0.0
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        salida = _correr(f, jac, metodo, t0, y0, t_fin, h, rtol)
+        duracion = time.perf_counter() - inicio
+        mejor, total = min(mejor, duracion), total + duracion
+        if total >= TIEMPO_MEDICION:
+            break
+    return salida, mejor
+
+
+def estudiar_metodo(problema, t0, t_fin, metodo, pasos, tolerancias, referencia, control=None):
+    """EstudioMetodo de `metodo` con los pasos (o las tolerancias, si es adaptativo).
+
+    `problema` es (tipo, texto, variables, valores iniciales, jacobiano simbólico) y
+    `referencia` el srepr de la solución analítica o una SolucionEDO con salida densa.
+    """
+    tipo, texto, variables, valores, simbolico = problema
+    f, y0, _, jac = preparar_problema(tipo, texto, variables, valores, jacobiano=True)
+    if isinstance(referencia, str):
+        exacta = compilar_solucion(sp.sympify(referencia))
+    else:
+        exacta = referencia
+    adaptativo = metodo in METODOS_ADAPTATIVOS
+    h, errores, evaluaciones, tiempos = [], [], [], []
+    for i, (paso, rtol) in enumerate(zip(pasos, tolerancias)):
+        try:
+            # Un método explícito en un problema rígido diverge: su error queda en NaN
+            with np.errstate(over="ignore", invalid="ignore"):
+                (t_final, y_final, n_eval, h_medio), duracion = _medir(f, jac if simbolico else None, metodo, t0,
+                                                                       y0, t_fin, paso, rtol)
+                y_ref = np.atleast_1d(exacta(t_final))
+                error = float(np.max(np.abs(np.atleast_1d(y_final)[:y_ref.size] - y_ref)))
+            if not error <= DIVERGENCIA * (1.0 + float(np.max(np.abs(y_ref)))):
+                error = np.nan
+        except (RuntimeError, FloatingPointError, OverflowError):
+            # Newton que no converge o demasiados pasos: la corrida no cuenta
+            n_eval, h_medio, duracion, error = 0, paso, np.nan, np.nan
+        h.append(h_medio)
+        errores.append(error)
+        evaluaciones.append(n_eval)
+        tiempos.append(duracion)
+        if control is not None:
+            control.progreso((i + 1) / len(pasos), f"{metodo}: {'rtol' if adaptativo else 'h'} = "
+                                                   f"{rtol if adaptativo else paso:.3g}")
+    return EstudioMetodo(metodo, h, errores, evaluaciones, tiempos)
+
+
+def estudiar_metodos(problema, t0, t_fin, h, metodos, exacta=None, cantidad=PASOS_ESTUDIO, rtol=RTOL_ESTUDIO,
+                     trabajadores=None, control=None):
+    """{método: EstudioMetodo} con h, h/2, ..., h/2^(cantidad-1) en paralelo entre procesos.
+
+    h se ajusta para que (t_fin - t0)/h sea entero; el error se mide en el último t de
+    cada corrida (t_fin salvo redondeo). `exacta` es el srepr de la solución analítica; sin ella se usa una
+    referencia de DP45 con tolerancias muy estrictas.
+    """
+    tipo, texto, variables, valores, _ = problema
+    if cantidad < 2:
+        raise ValueError("El estudio necesita al menos dos pasos")
+    if exacta is None:
+        if control is not None:
+            control.progreso(None, "Calculando la solución de referencia...")
+        f, y0, _ = preparar_problema(tipo, texto, variables, valores)
+        referencia = integrar_adaptativo(f, t0, y0, t_fin, "DP45", RTOL_REFERENCIA, ATOL_REFERENCIA, denso=True)
+    else:
+        referencia = exacta
+    n0 = max(int(np.ceil((t_fin - t0) / h - 1e-9)), 1)
+    pasos = (t_fin - t0) / (n0 * RAZON_PASOS ** np.arange(cantidad))
+    tolerancias = rtol / RAZON_TOLERANCIAS ** np.arange(cantidad)
+
+    trabajadores = trabajadores or os.cpu_count() or 1
+    cola = list(metodos)
+    en_curso = {}
+    resultados = {}
+    try:
+        while cola or en_curso:
+            while cola and len(en_curso) < trabajadores:
+                metodo = cola.pop(0)
+                trabajo = TrabajoProceso(estudiar_metodo, problema, t0, t_fin, metodo, pasos, tolerancias,
+                                         referencia)
+                en_curso[trabajo] = metodo
+            for trabajo in esperar_trabajos(list(en_curso), ESPERA_S):
+                resultados[en_curso.pop(trabajo)] = trabajo.result()
+            if control is not None:
+                control.progreso(len(resultados) / len(metodos),
+                                 f"{len(resultados)} de {len(metodos)} métodos")
+    finally:
+        # Cancelada (o con un error): los procesos que siguen se terminan
+        for trabajo in en_curso:
+            trabajo.cancel()
+    return {m: resultados[m] for m in metodos}
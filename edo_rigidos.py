@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Métodos implícitos de paso fijo para problemas rígidos (p. ej. y' = -1000·(y - cos t)).
+
+- Euler implícito, trapecio y BDF de orden 1 a 5 resuelven en cada paso
+  y_{n+1} = r_n + γ·f(t_{n+1}, y_{n+1}) (r_n: combinación de pasos anteriores) con
+  Newton simplificado: la matriz I - γ·J se factoriza (LU) y se reutiliza.
+- El jacobiano J = ∂f/∂y viene de derivar el lado derecho con sympy, compilado una
+  sola vez (edo_engine.compilar_jacobiano), o de diferencias finitas.
+- J y su LU se conservan entre pasos mientras Newton converja. Si converge lento, J se
+  renueva en el paso siguiente; si no converge, se renueva en el último iterado (no en
+  y_n, donde ya falló) y se repite el paso, y como último recurso se usa Newton
+  completo (J nuevo en cada iteración). Sólo cambiar γ (arranque de BDF) obliga a
+  refactorizar sin recalcular J.
+- Rosenbrock-W (ROS2 de Verwer): sin Newton, dos sistemas lineales por paso con la
+  misma LU. Es de orden 2 con cualquier aproximación de J, así que J se renueva sólo
+  cada PASOS_JACOBIANO_W pasos o si alguna componente de y cambió más que
+  ATOL_JACOBIANO_W + CAMBIO_JACOBIANO_W·(mayor |y| visto en esa componente) desde
+  que se calculó, de modo que los cruces por cero no cuentan (la estabilidad sí
+  depende de que J no esté muy lejos). Un paso que cambia así a y con un J viejo se
+  rehace con J nuevo; un resultado no finito es un error.
+- Los k-1 pasos iniciales de BDF de orden k se dan con Euler implícito extrapolado
+  (1, 2, ..., k subpasos y Aitken-Neville), que es de orden k y sigue siendo estable
+  en problemas rígidos.
+- Rosenbrock incluye ∂f/∂t (diferencia finita en t) porque en problemas forzados
+  como -1000·(y - cos t) ese término también es rígido.
+"""
+
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+
+from edo_engine import PASOS_POR_AVISO, SolucionEDO, numero_pasos
+
+BDF = "BDF"
+TRAPECIO = "Trapecio"
+ROSENBROCK = "Rosenbrock-W"
+
+# Newton simplificado
+MAX_ITER_NEWTON = 10
+MAX_ITER_NEWTON_COMPLETO = 20   # último recurso: J nuevo en cada iteración
+MAX_MITADES = 10
+ITER_LENTAS = 4           # con más iteraciones, J se renueva en el paso siguiente
+TOL_NEWTON = 1e-8         # norma RMS de la corrección, relativa a 1 + |y|
+PASOS_JACOBIANO_W = 10
+CAMBIO_JACOBIANO_W = 0.1      # rtol del cambio de y por componente
+ATOL_JACOBIANO_W = 1e-6       # atol del cambio de y (componentes que parten de 0)
+
+# BDF de orden k: y_{n+1} = Σ_j a_j·y_{n+1-j} + h·β·f(t_{n+1}, y_{n+1})
+COEFICIENTES_BDF = {
+    1: ([1], 1),
+    2: ([4/3, -1/3], 2/3),
+    3: ([18/11, -9/11, 2/11], 6/11),
+    4: ([48/25, -36/25, 16/25, -3/25], 12/25),
+    5: ([300/137, -300/137, 200/137, -75/137, 12/137], 60/137),
+}
+
+# ROS2 (Verwer, Spee, Blom y Hundsdorfer, 1999): L-estable
+GAMMA_ROS2 = 1 + 1 / np.sqrt(2)
+
+
+class MetodoImplicito:
+    """Método implícito de paso fijo: familia (BDF, trapecio o Rosenbrock-W) y orden"""
+
+    def __init__(self, nombre, familia, orden):
+        if familia == BDF and orden not in COEFICIENTES_BDF:
+            raise ValueError(f"{nombre}: BDF sólo de orden 1 a {max(COEFICIENTES_BDF)}")
+        self.nombre = nombre
+        self.familia = familia
+        self.orden = orden
+
+
+METODOS_IMPLICITOS = {
+    "Euler implícito": MetodoImplicito("Euler implícito", BDF, 1),
+    "Trapecio": MetodoImplicito("Trapecio", TRAPECIO, 2),
+    **{f"BDF{k}": MetodoImplicito(f"BDF{k}", BDF, k) for k in range(2, 6)},
+    "ROS2": MetodoImplicito("ROS2", ROSENBROCK, 2),
+}
+
+
+def jacobiano_numerico(f, t, y, fy):
+    """∂f/∂y por diferencias hacia adelante (una evaluación de f por columna)"""
+    J = np.empty((fy.size, y.size))
+    for j in range(y.size):
+        delta = np.sqrt(np.finfo(float).eps) * max(abs(y[j]), 1.0)
+        y_mas = y.copy()
+        y_mas[j] += delta
+        J[:, j] = (f(t, y_mas) - fy) / delta
+    return J
+
+
+class _SistemaLineal:
+    """f vectorial, J y la LU de I - γ·J que se reutilizan entre pasos, con sus contadores"""
+
+    def __init__(self, f, jac, escalar):
+        if escalar:
+            self.f = lambda t, y: np.atleast_1d(np.asarray(f(t, y[0]), dtype=float))
+        else:
+            self.f = lambda t, y: np.asarray(f(t, y), dtype=float)
+        self.jac = jac
+        self.J = None
+        self.lu = None
+        self.gamma = None
+        self.evaluaciones = 0
+        self.jacobianos = 0
+        self.factorizaciones = 0
+
+    def evaluar(self, t, y):
+        self.evaluaciones += 1
+        return self.f(t, y)
+
+    def actualizar_jacobiano(self, t, y, fy=None):
+        if self.jac is not None:
+            self.J = np.atleast_2d(np.asarray(self.jac(t, y), dtype=float))
+        else:
+            fy = self.evaluar(t, y) if fy is None else fy
+            self.J = jacobiano_numerico(self.f, t, y, fy)
+            self.evaluaciones += y.size
+        self.jacobianos += 1
+        self.lu = None
+
+    def factorizar(self, gamma):
+        if self.lu is None or gamma != self.gamma:
+            self.lu = lu_factor(np.eye(self.J.shape[0]) - gamma * self.J, check_finite=False)
+            self.gamma = gamma
+            self.factorizaciones += 1
+
+    def resolver(self, b):
+        return lu_solve(self.lu, b, check_finite=False)
+
+    def newton(self, t, r, gamma, y):
+        """Resuelve y = r + γ·f(t, y) desde la predicción y; (y, iteraciones) o (y, None)"""
+        self.factorizar(gamma)
+        norma_previa = None
+        for iteracion in range(1, MAX_ITER_NEWTON + 1):
+            dy = self.resolver(r + gamma * self.evaluar(t, y) - y)
+            y = y + dy
+            norma = float(np.sqrt(np.mean((dy / (1.0 + np.abs(y))) ** 2)))
+            if not np.isfinite(norma):
+                return y, None
+            if norma_previa is None:
+                if norma <= TOL_NEWTON:
+                    return y, iteracion
+            else:
+                # Convergencia lineal con razón θ: el error que queda es ~ θ/(1-θ)·|dy|
+                theta = norma / norma_previa
+                if theta >= 1.0:
+                    return y, None
+                if norma * theta / (1.0 - theta) <= TOL_NEWTON or norma <= TOL_NEWTON:
+                    return y, iteracion
+            norma_previa = norma
+        return y, None
+
+    def newton_completo(self, t, r, gamma, y):
+        """Newton con J y su LU recalculados en cada iterado y la corrección acortada a la
+        mitad mientras no reduzca el residuo y - r - γ·f(t, y) (converge donde el
+        simplificado no)"""
+        residuo = r + gamma * self.evaluar(t, y) - y
+        for iteracion in range(1, MAX_ITER_NEWTON_COMPLETO + 1):
+            self.actualizar_jacobiano(t, y)
+            self.factorizar(gamma)
+            dy = self.resolver(residuo)
+            norma_residuo = float(np.linalg.norm(residuo))
+            for _ in range(MAX_MITADES):
+                y_nuevo = y + dy
+                residuo_nuevo = r + gamma * self.evaluar(t, y_nuevo) - y_nuevo
+                if np.linalg.norm(residuo_nuevo) < norma_residuo:
+                    break
+                dy = dy / 2
+            y, residuo = y_nuevo, residuo_nuevo
+            norma = float(np.sqrt(np.mean((dy / (1.0 + np.abs(y))) ** 2)))
+            if not np.isfinite(norma):
+                return y, None
+            if norma <= TOL_NEWTON:
+                return y, iteracion
+        return y, None
+
+
+def _paso_newton(sistema, t1, r, gamma, prediccion):
+    """Un paso implícito con Newton simplificado. Si no converge, J se renueva en el
+    último iterado (o en la predicción, si el iterado no es finito) y se repite; si
+    tampoco converge, se prueba Newton completo antes de rendirse"""
+    y1, iteraciones = sistema.newton(t1, r, gamma, prediccion)
+    if iteraciones is None:
+        # J en y_n (o el mismo J que acaba de fallar) no sirve: se evalúa cerca de y_{n+1}
+        sistema.actualizar_jacobiano(t1, y1 if np.all(np.isfinite(y1)) else prediccion)
+        y1, iteraciones = sistema.newton(t1, r, gamma, prediccion)
+    if iteraciones is None:
+        y1, iteraciones = sistema.newton_completo(t1, r, gamma, prediccion)
+    if iteraciones is None:
+        raise RuntimeError(f"Newton no converge en t = {t1:.6g} (probar con un h menor)")
+    return y1, iteraciones
+
+
+def _euler_extrapolado(sistema, tn, yn, h, orden):
+    """Paso de orden `orden`: Euler implícito con 1, 2, ..., orden subpasos + Aitken-Neville"""
+    T = []
+    for j in range(1, orden + 1):
+        hj, y = h / j, yn
+        for i in range(j):
+            y, _ = _paso_newton(sistema, tn + (i + 1) * hj, y, hj, y)
+        # El error de Euler implícito tiene todas las potencias de h: se eliminan una a una
+        fila = [y]
+        for l in range(1, j):
+            fila.append(fila[l - 1] + (fila[l - 1] - T[-1][l - 1]) / (j / (j - l) - 1))
+        T.append(fila)
+    return T[-1][-1]
+
+
+def _pasos_newton(sistema, metodo, t, y, h, control):
+    n = t.size - 1
+    f_n = sistema.evaluar(t[0], y[0])
+    sistema.actualizar_jacobiano(t[0], y[0], f_n)
+    renovar = False
+    for paso in range(n):
+        tn, yn, t1 = t[paso], y[paso], t[paso + 1]
+        if metodo.familia == BDF and paso < metodo.orden - 1:
+            y[paso + 1] = _euler_extrapolado(sistema, tn, yn, h, metodo.orden)
+            continue
+        if metodo.familia == TRAPECIO:
+            gamma = h / 2
+            r = yn + gamma * f_n
+        else:
+            a, beta = COEFICIENTES_BDF[metodo.orden]
+            gamma = h * beta
+            r = sum(a_j * y[paso - j] for j, a_j in enumerate(a))
+        prediccion = 2 * yn - y[paso - 1] if paso else yn
+        if renovar:
+            sistema.actualizar_jacobiano(tn, yn)
+            renovar = False
+        y1, iteraciones = _paso_newton(sistema, t1, r, gamma, prediccion)
+        renovar = iteraciones > ITER_LENTAS
+        y[paso + 1] = y1
+        # f(t_{n+1}, y_{n+1}) que usa el trapecio, despejada de la ecuación implícita
+        f_n = (y1 - r) / gamma
+        if control is not None and paso % PASOS_POR_AVISO == 0:
+            control.progreso(paso / n, f"Paso {paso} de {n}")
+
+
+def _cambio(y, y_ref, y_max):
+    """Mayor cambio por componente, relativo a ATOL + CAMBIO·max(|y_ref|, y_max) (_JACOBIANO_W).
+
+    Por componente y no en norma: una componente chica (p. ej. de 0 a 4e-5) puede
+    tener entradas enormes en J. y_max (el mayor |y| visto en cada componente) evita
+    que un cruce por cero cuente como un cambio grande.
+    """
+    escala = ATOL_JACOBIANO_W + CAMBIO_JACOBIANO_W * np.maximum(np.abs(y_ref), y_max)
+    return float(np.max(np.abs(y - y_ref) / escala))
+
+
+def _pasos_rosenbrock(sistema, t, y, h, control):
+    n = t.size - 1
+    gamma = GAMMA_ROS2 * h
+    delta = np.sqrt(np.finfo(float).eps) * max(abs(t[0]), abs(t[-1]), 1.0)
+    ultimo, y_J = -PASOS_JACOBIANO_W, y[0]
+    y_max = np.abs(y[0])
+    for paso in range(n):
+        tn, yn = t[paso], y[paso]
+        f_n = sistema.evaluar(tn, yn)
+        y_max = np.maximum(y_max, np.abs(yn))
+        if paso - ultimo >= PASOS_JACOBIANO_W or _cambio(yn, y_J, y_max) > 1.0:
+            sistema.actualizar_jacobiano(tn, yn, f_n)
+            ultimo, y_J = paso, yn
+        while True:
+            sistema.factorizar(gamma)
+            # Término en ∂f/∂t del sistema aumentado con t' = 1
+            gamma_ft = gamma * (sistema.evaluar(tn + delta, yn) - f_n) / delta
+            k1 = sistema.resolver(f_n + gamma_ft)
+            k2 = sistema.resolver(sistema.evaluar(tn + h, yn + h * k1) - 2 * k1 - gamma_ft)
+            y1 = yn + h * (1.5 * k1 + 0.5 * k2)
+            # Un paso que mueve mucho a y con un J viejo puede ser inestable: se rehace
+            # con J en y_n
+            if ultimo == paso or (_cambio(y1, yn, y_max) <= 1.0 and np.all(np.isfinite(y1))):
+                break
+            sistema.actualizar_jacobiano(tn, yn, f_n)
+            ultimo, y_J = paso, yn
+        if not np.all(np.isfinite(y1)):
+            raise RuntimeError(f"ROS2 diverge en t = {t[paso + 1]:.6g} (probar con un h menor)")
+        y[paso + 1] = y1
+        if control is not None and paso % PASOS_POR_AVISO == 0:
+            control.progreso(paso / n, f"Paso {paso} de {n}")
+
+
+def integrar_implicito(f, t0, y0, t_fin, h, metodo="BDF2", jac=None, control=None):
+    """Integra y' = f(t, y) con paso fijo h y un método implícito (nombre o MetodoImplicito).
+
+    `jac(t, y)` da la matriz ∂f/∂y con y como vector (p. ej. edo_engine.compilar_jacobiano);
+    sin jac se aproxima por diferencias finitas. Devuelve una SolucionEDO con las
+    evaluaciones de f, los jacobianos calculados y las factorizaciones LU.
+    """
+    metodo = METODOS_IMPLICITOS[metodo] if isinstance(metodo, str) else metodo
+    n = numero_pasos(t0, t_fin, h)
+    t = t0 + h * np.arange(n + 1)
+    escalar = np.ndim(y0) == 0
+    y = np.empty((n + 1, np.size(y0)))
+    y[0] = y0
+    sistema = _SistemaLineal(f, jac, escalar)
+    if metodo.familia == ROSENBROCK:
+        _pasos_rosenbrock(sistema, t, y, h, control)
+    else:
+        _pasos_newton(sistema, metodo, t, y, h, control)
+    return SolucionEDO(t, y[:, 0] if escalar else y, None, None, sistema.evaluaciones, 0, escalar,
+                       jacobianos=sistema.jacobianos, factorizaciones=sistema.factorizaciones)
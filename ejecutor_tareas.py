@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecución de cálculos en segundo plano para los simuladores Tkinter.
+
+- Los cálculos corren en un hilo (o en un proceso) y la interfaz sigue respondiendo;
+  Tk sólo se toca desde el hilo principal, que sondea los resultados con root.after.
+- Progreso y cancelación cooperativa: la función recibe `control` (ControlTarea) y
+  llama a control.progreso(fraccion, texto) entre bloques de trabajo; si la tarea se
+  canceló, esa llamada (o control.verificar()) lanza TareaCancelada.
+- Cada nombre de tarea tiene una generación: lanzar una tarea nueva con el mismo nombre
+  cancela la anterior, y su resultado, si llega igual, se descarta.
+- En un proceso la función y sus argumentos deben poder serializarse (funciones de
+  módulo, no lambdas). Sirve para cálculos que no pueden verificar la cancelación
+  (p. ej. sp.integrate): cada tarea corre en un proceso propio (TrabajoProceso) y al
+  cancelarla se termina ese proceso, sin tocar las demás tareas en curso.
+- `limite` (segundos): si la tarea no terminó a tiempo se cancela y se informa un
+  TimeoutError por al_error (útil con procesos, que no pueden colgar la interfaz).
+"""
+
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, messagebox
+
+INTERVALO_SONDEO_MS = 50
+INTERVALO_PROGRESO_S = 0.05
+
+
+class TareaCancelada(BaseException):
+    """La tarea se canceló (o la reemplazó otra más nueva) antes de terminar.
+
+    Hereda de BaseException (como KeyboardInterrupt) para que los `except Exception`
+    del código de cálculo no la confundan con un error y la tarea se detenga.
+    """
+
+
+class ControlTarea:
+    """Lo que ve la función en segundo plano: avisos de progreso y pedido de cancelación"""
+
+    def __init__(self, nombre, generacion, cancelar, mensajes):
+        self.nombre = nombre
+        self.generacion = generacion
+        self._cancelar = cancelar   # threading.Event (hilos) o proxy de Manager (procesos)
+        self._mensajes = mensajes
+        self._ultimo = 0.0
+
+    @property
+    def cancelada(self):
+        return self._cancelar.is_set()
+
+    def verificar(self):
+        if self._cancelar.is_set():
+            raise TareaCancelada(self.nombre)
+
+    def progreso(self, fraccion=None, texto=""):
+        """Informa el avance (fracción en [0, 1] o None si es indeterminado) y verifica la cancelación"""
+        ahora = time.monotonic()
+        if ahora - self._ultimo >= INTERVALO_PROGRESO_S or (fraccion is not None and fraccion >= 1):
+            self._ultimo = ahora
+            self._mensajes.put((self.nombre, self.generacion, fraccion, texto))
+        self.verificar()
+
+
+def _ejecutar(funcion, control, args, kwargs):
+    control.verificar()
+    return funcion(*args, control=control, **kwargs)
+
+
+def _correr_en_proceso(conexion, funcion, args, kwargs):
+    try:
+        salida = (True, funcion(*args, **kwargs))
+    except BaseException as e:
+        salida = (False, e)
+    try:
+        conexion.send(salida)
+    except Exception as e:
+        # Resultado o excepción que no se puede serializar
+        conexion.send((False, RuntimeError(f"No se pudo enviar el resultado del proceso: {e}")))
+    finally:
+        conexion.close()
+
+
+class TrabajoProceso:
+    """funcion(*args, **kwargs) en un proceso propio (spawn), con done/result/cancel como un Future.
+
+    cancel() termina ese proceso y sólo ése: los demás trabajos siguen corriendo.
+    """
+
+    def __init__(self, funcion, *args, **kwargs):
+        contexto = multiprocessing.get_context("spawn")
+        self._conexion, hijo = contexto.Pipe(duplex=False)
+        self._proceso = contexto.Process(target=_correr_en_proceso, args=(hijo, funcion, args, kwargs))
+        self._proceso.start()
+        hijo.close()
+        self._salida = None
+
+    def done(self):
+        if self._salida is None and (self._conexion.poll() or not self._proceso.is_alive()):
+            try:
+                self._salida = self._conexion.recv()
+            except (EOFError, OSError):
+                self._salida = (False, RuntimeError(f"El proceso terminó sin resultado "
+                                                    f"(código {self._proceso.exitcode})"))
+            self._liberar()
+        return self._salida is not None
+
+    def result(self):
+        if not self.done():
+            raise RuntimeError("El trabajo todavía no terminó")
+        correcto, valor = self._salida
+        if correcto:
+            return valor
+        raise valor
+
+    def cancel(self):
+        if self._salida is None:
+            self._proceso.terminate()
+            self._salida = (False, TareaCancelada("trabajo cancelado"))
+            self._liberar()
+        return True
+
+    def _liberar(self):
+        self._proceso.join()
+        self._proceso.close()
+        self._conexion.close()
+
+
+def esperar_trabajos(trabajos, timeout=None):
+    """Los TrabajoProceso de `trabajos` que terminaron; si ninguno, espera hasta `timeout` s a alguno"""
+    pendientes = [t._conexion for t in trabajos if t._salida is None]
+    if len(pendientes) == len(trabajos) and pendientes:
+        multiprocessing.connection.wait(pendientes, timeout)
+    return [t for t in trabajos if t.done()]
+
+
+class EjecutorTareas:
+    """Lanza funciones en un pool de hilos o en procesos propios y entrega los resultados en el hilo de Tk"""
+
+    def __init__(self, root, trabajadores=2, intervalo_ms=INTERVALO_SONDEO_MS):
+        self.root = root
+        self.trabajadores = trabajadores
+        self.intervalo_ms = intervalo_ms
+        self._hilos = None
+        self._manager = None
+        self._mensajes = queue.Queue()
+        self._mensajes_procesos = None
+        self._tareas = {}
+        self._generaciones = {}
+        self._sondeando = False
+
+    # -------------------- Pools --------------------
+    def _enviar(self, proceso, funcion, control, args, kwargs):
+        # Un proceso por tarea: cancelarla termina su proceso sin romper las otras
+        if proceso:
+            return TrabajoProceso(_ejecutar, funcion, control, args, kwargs)
+        if self._hilos is None:
+            self._hilos = ThreadPoolExecutor(self.trabajadores, thread_name_prefix="tarea")
+        return self._hilos.submit(_ejecutar, funcion, control, args, kwargs)
+
+    def _canal_procesos(self):
+        # Bandera de cancelación y cola de progreso compartidas con los procesos
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+            self._mensajes_procesos = self._manager.Queue()
+        return self._manager.Event(), self._mensajes_procesos
+
+    # -------------------- Tareas --------------------
+    def lanzar(self, nombre, funcion, *args, proceso=False, al_terminar=None, al_error=None, al_progreso=None,
+               al_cancelar=None, barra=None, limite=None, **kwargs):
+        """Ejecuta funcion(*args, control=..., **kwargs) en segundo plano.
+
+        Los callbacks corren en el hilo de Tk: al_terminar(resultado), al_error(excepción),
+        al_progreso(fraccion, texto) y al_cancelar(). Con `barra` (BarraProgreso) el
+        progreso y el botón Cancelar se conectan solos. Con `limite` (segundos) la tarea
+        se cancela si tarda más y al_error recibe un TimeoutError.
+        """
+        self.cancelar(nombre)
+        generacion = self._generaciones.get(nombre, 0) + 1
+        self._generaciones[nombre] = generacion
+        if proceso:
+            evento, mensajes = self._canal_procesos()
+        else:
+            evento, mensajes = threading.Event(), self._mensajes
+        control = ControlTarea(nombre, generacion, evento, mensajes)
+
+        if barra is not None:
+            barra.iniciar()
+            al_progreso = self._encadenar(barra.actualizar, al_progreso)
+            al_terminar = self._encadenar(lambda _: barra.terminar(), al_terminar)
+            al_error = self._encadenar(lambda _: barra.terminar("Error"), al_error or self._mostrar_error)
+            al_cancelar = self._encadenar(lambda: barra.terminar("Cancelado"), al_cancelar)
+
+        self._tareas[nombre] = {'generacion': generacion, 'futuro': self._enviar(proceso, funcion, control, args, kwargs),
+                                'evento': evento, 'al_terminar': al_terminar,
+                                'al_error': al_error or self._mostrar_error, 'al_progreso': al_progreso,
+                                'al_cancelar': al_cancelar,
+                                'vence': None if limite is None else time.monotonic() + limite, 'limite': limite}
+        self._programar_sondeo()
+        return generacion
+
+    def _detener(self, nombre):
+        tarea = self._tareas.pop(nombre, None)
+        if tarea is not None:
+            tarea['evento'].set()
+            # En un hilo sólo se cancela si no empezó; un TrabajoProceso se termina
+            tarea['futuro'].cancel()
+        return tarea
+
+    def cancelar(self, nombre=None):
+        """Cancela la tarea `nombre` (o todas); su resultado ya no se entrega"""
+        for n in (list(self._tareas) if nombre is None else [nombre]):
+            tarea = self._detener(n)
+            if tarea is not None and tarea['al_cancelar'] is not None:
+                tarea['al_cancelar']()
+
+    def ocupado(self, nombre=None):
+        return bool(self._tareas) if nombre is None else nombre in self._tareas
+
+    def cerrar(self):
+        self.cancelar()
+        if self._hilos is not None:
+            self._hilos.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    # -------------------- Sondeo desde Tk --------------------
+    @staticmethod
+    def _encadenar(primero, segundo):
+        if segundo is None:
+            return primero
+
+        def ambos(*args):
+            primero(*args)
+            segundo(*args)
+        return ambos
+
+    @staticmethod
+    def _mostrar_error(error):
+        messagebox.showerror("Error", str(error))
+
+    def _programar_sondeo(self):
+        if not self._sondeando:
+            self._sondeando = True
+            self.root.after(self.intervalo_ms, self._sondear)
+
+    def _leer_progreso(self, mensajes):
+        while mensajes is not None:
+            try:
+                nombre, generacion, fraccion, texto = mensajes.get_nowait()
+            except queue.Empty:
+                return
+            tarea = self._tareas.get(nombre)
+            # Los avisos de generaciones anteriores son de tareas obsoletas
+            if tarea is not None and tarea['generacion'] == generacion and tarea['al_progreso'] is not None:
+                tarea['al_progreso'](fraccion, texto)
+
+    def _sondear(self):
+        self._sondeando = False
+        self._leer_progreso(self._mensajes)
+        self._leer_progreso(self._mensajes_procesos)
+        for nombre, tarea in list(self._tareas.items()):
+            futuro = tarea['futuro']
+            if not futuro.done():
+                if tarea['vence'] is not None and time.monotonic() > tarea['vence']:
+                    self._detener(nombre)
+                    tarea['al_error'](TimeoutError(f"Se superó el límite de {tarea['limite']:g} s"))
+                continue
+            del self._tareas[nombre]
+            try:
+                resultado = futuro.result()
+            except TareaCancelada:
+                continue
+            except Exception as e:
+                tarea['al_error'](e)
+                continue
+            if tarea['al_terminar'] is not None:
+                tarea['al_terminar'](resultado)
+        if self._tareas:
+            self._programar_sondeo()
+
+
+class BarraProgreso(ttk.Frame):
+    """Barra de progreso con texto y botón Cancelar para las tareas de un EjecutorTareas.
+
+    `nombre` puede ser una lista: Cancelar detiene todas esas tareas (p. ej. una cadena
+    de tareas que comparten la barra). Al destruirse la barra (se cerró su ventana) sus
+    tareas se cancelan: sus resultados ya no tienen dónde mostrarse.
+    """
+
+    def __init__(self, master, ejecutor, nombre, largo=200, **kw):
+        super().__init__(master, **kw)
+        nombres = [nombre] if isinstance(nombre, str) else list(nombre)
+        self._ejecutor, self._nombres, self._viva = ejecutor, nombres, True
+        self.barra = ttk.Progressbar(self, length=largo, maximum=1.0, mode="determinate")
+        self.barra.pack(side="left", padx=5)
+        self.etiqueta = ttk.Label(self, text="", width=30)
+        self.etiqueta.pack(side="left", padx=5)
+        self.boton = ttk.Button(self, text="Cancelar", command=lambda: [ejecutor.cancelar(n) for n in nombres],
+                                state="disabled")
+        self.boton.pack(side="left", padx=5)
+        self.bind("<Destroy>", self._al_destruir, add="+")
+
+    def _al_destruir(self, evento):
+        if evento.widget is self and self._viva:
+            self._viva = False
+            for n in self._nombres:
+                self._ejecutor.cancelar(n)
+
+    def iniciar(self, texto="Calculando..."):
+        if not self._viva:
+            return
+        self.barra.configure(mode="determinate", value=0.0)
+        self.etiqueta.configure(text=texto)
+        self.boton.configure(state="normal")
+
+    def actualizar(self, fraccion, texto=""):
+        if not self._viva:
+            return
+        if fraccion is None:
+            self.barra.configure(mode="indeterminate")
+            self.barra.step(0.02)
+        else:
+            self.barra.configure(mode="determinate", value=min(max(fraccion, 0.0), 1.0))
+        if texto:
+            self.etiqueta.configure(text=texto)
+
+    def terminar(self, texto=""):
+        if not self._viva:
+            return
+        self.barra.configure(mode="determinate", value=0.0)
+        self.etiqueta.configure(text=texto)
+        self.boton.configure(state="disabled")
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Gráficos que se actualizan sin reconstruirse, para los simuladores Tkinter.
+
+- Los artistas (líneas, puntos, rellenos, polígonos y el título) se crean una sola
+  vez por clave y después sólo cambian sus datos (set_data, set_offsets, set_verts).
+- Si sólo cambian los datos se hace blitting: se restaura el fondo guardado (ejes,
+  grilla, barras de colores) y se dibujan encima los artistas dinámicos y la leyenda.
+- Si cambia la estructura (límites, leyenda, escala de colores, artistas nuevos) se
+  dibuja todo una vez y se guarda el fondo nuevo. Un dibujo externo (zoom, cambio de
+  tamaño) invalida el fondo.
+- Fuera de nuestro propio dibujo los artistas no quedan "animated", así que la barra
+  de herramientas y savefig los siguen dibujando.
+"""
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+
+class GraficoIncremental:
+    """Artistas persistentes por clave sobre un Axes y su canvas"""
+
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.fig = ax.figure
+        self.canvas = canvas
+        self.artistas = {}
+        self.barras_color = {}
+        self._fondo = None
+        self._estructura = True
+        self._propio = False
+        self._leyenda = None
+        self._etiquetas = None
+        canvas.mpl_connect("draw_event", self._al_dibujar)
+
+    # -------------------- Artistas --------------------
+    def _registrar(self, clave, artista, estilo=None):
+        # El estilo se toma al crear el artista; después sólo puede cambiar la etiqueta
+        if clave not in self.artistas:
+            self.artistas[clave] = artista
+            self._estructura = True
+        elif estilo and 'label' in estilo:
+            artista.set_label(estilo['label'])
+        artista.set_visible(True)
+        return artista
+
+    def linea(self, clave, x, y, **estilo):
+        artista = self.artistas.get(clave)
+        if artista is None:
+            (artista,) = self.ax.plot(x, y, **estilo)
+        else:
+            artista.set_data(x, y)
+        return self._registrar(clave, artista, estilo)
+
+    def puntos(self, clave, x, y, z=None, c=None, **estilo):
+        """Dispersión (2D, o 3D con z); con `c` los colores siguen la escala del mapa"""
+        artista = self.artistas.get(clave)
+        if artista is None:
+            if z is None:
+                artista = self.ax.scatter(x, y, c=c, **estilo)
+            else:
+                artista = self.ax.scatter(x, y, z, c=c, **estilo)
+            return self._registrar(clave, artista)
+        if z is None:
+            artista.set_offsets(np.column_stack((x, y)))
+        else:
+            artista._offsets3d = (np.asarray(x), np.asarray(y), np.asarray(z))
+            self._estructura = True
+        if c is not None:
+            limites = artista.get_clim()
+            artista.set_array(np.asarray(c, dtype=float))
+            artista.autoscale()
+            # La barra de colores está en el fondo: si cambia la escala hay que redibujarla
+            self._estructura |= artista.get_clim() != limites
+        return self._registrar(clave, artista, estilo)
+
+    def relleno(self, clave, x, y1, y2=0.0, **estilo):
+        """Región entre y1 e y2 (como fill_between), como un único polígono"""
+        x = np.asarray(x, dtype=float)
+        y1 = np.broadcast_to(np.asarray(y1, dtype=float), x.shape)
+        y2 = np.broadcast_to(np.asarray(y2, dtype=float), x.shape)
+        vertices = np.concatenate((np.column_stack((x, y1)), np.column_stack((x[::-1], y2[::-1]))))
+        return self.poligonos(clave, [vertices], **estilo)
+
+    def poligonos(self, clave, vertices, **estilo):
+        """Colección de polígonos (rectángulos, trapecios) que se actualiza con set_verts"""
+        artista = self.artistas.get(clave)
+        if artista is None:
+            artista = PolyCollection(vertices, **estilo)
+            self.ax.add_collection(artista)
+        else:
+            artista.set_verts(vertices)
+        return self._registrar(clave, artista, estilo)
+
+    def titulo(self, texto):
+        if 'titulo' not in self.artistas:
+            self.artistas['titulo'] = self.ax.title
+        self.ax.set_title(texto)
+        self.ax.title.set_visible(True)
+
+    def colorbar(self, clave, **kw):
+        """Barra de colores del artista `clave`, creada una sola vez"""
+        if clave not in self.barras_color:
+            self.barras_color[clave] = self.fig.colorbar(self.artistas[clave], ax=self.ax, **kw)
+            self._estructura = True
+        return self.barras_color[clave]
+
+    def ocultar_todos(self):
+        """Oculta los artistas dinámicos; los que se vuelvan a dibujar reaparecen"""
+        for artista in self.artistas.values():
+            artista.set_visible(False)
+
+    def limpiar(self):
+        self.ocultar_todos()
+        self._estructura = True
+        self.actualizar()
+
+    # -------------------- Ejes y leyenda --------------------
+    def limites(self, xlim=None, ylim=None, zlim=None):
+        for lim, obtener, fijar in ((xlim, self.ax.get_xlim, self.ax.set_xlim),
+                                    (ylim, self.ax.get_ylim, self.ax.set_ylim),
+                                    (zlim, getattr(self.ax, "get_zlim", None), getattr(self.ax, "set_zlim", None))):
+            if lim is not None and tuple(obtener()) != tuple(lim):
+                fijar(*lim)
+                self._estructura = True
+
+    def ajustar_a(self, x, y, margen=0.05):
+        """Límites a la medida de los datos (para colecciones, que relim no considera)"""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if x.size == 0:
+            return
+        limites = []
+        for v in (x, y):
+            lo, hi = float(np.nanmin(v)), float(np.nanmax(v))
+            ancho = hi - lo if hi > lo else max(abs(hi), 1.0)
+            limites.append((lo - margen * ancho, hi + margen * ancho))
+        self.limites(*limites)
+
+    def etiquetas(self, x=None, y=None, z=None):
+        """Nombres de los ejes (forman parte del fondo)"""
+        for texto, obtener, fijar in ((x, self.ax.get_xlabel, self.ax.set_xlabel),
+                                      (y, self.ax.get_ylabel, self.ax.set_ylabel),
+                                      (z, getattr(self.ax, "get_zlabel", None), getattr(self.ax, "set_zlabel", None))):
+            if texto is not None and obtener() != texto:
+                fijar(texto)
+                self._estructura = True
+
+    def autoescalar(self):
+        """Ajusta los límites a las líneas visibles (relim no considera colecciones)"""
+        antes = (self.ax.get_xlim(), self.ax.get_ylim())
+        self.ax.set_autoscale_on(True)  # un zoom previo (set_xlim) lo desactiva
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        self._estructura |= (self.ax.get_xlim(), self.ax.get_ylim()) != antes
+
+    def leyenda(self, **kw):
+        """Leyenda de los artistas visibles con etiqueta; se rehace sólo si cambian"""
+        visibles = [a for a in self.artistas.values()
+                    if a is not self.ax.title and a.get_visible() and a.get_label() and not a.get_label().startswith("_")]
+        etiquetas = tuple(a.get_label() for a in visibles)
+        if etiquetas != self._etiquetas:
+            self._etiquetas = etiquetas
+            if self._leyenda is not None:
+                self._leyenda.remove()
+            self._leyenda = self.ax.legend(handles=visibles, **kw) if visibles else None
+            self._estructura = True
+
+    # -------------------- Dibujo --------------------
+    def actualizar(self):
+        """Blitting si sólo cambiaron los datos; dibujo completo si cambió la estructura"""
+        if self._estructura or self._fondo is None or self.ax.name == "3d":
+            self._dibujo_completo()
+        else:
+            self.canvas.restore_region(self._fondo)
+            self._dibujar_dinamicos()
+
+    def _dinamicos(self):
+        # Mismo orden que un dibujo completo (por zorder); la leyenda queda arriba
+        artistas = sorted(self.artistas.values(), key=lambda a: a.get_zorder())
+        return artistas + [self._leyenda] if self._leyenda is not None else artistas
+
+    def _dibujo_completo(self):
+        dinamicos = self._dinamicos()
+        self._propio = True
+        try:
+            for artista in dinamicos:
+                artista.set_animated(True)
+            self.canvas.draw()
+            self._fondo = self.canvas.copy_from_bbox(self.fig.bbox)
+        finally:
+            for artista in dinamicos:
+                artista.set_animated(False)
+            self._propio = False
+        self._estructura = False
+        self._dibujar_dinamicos()
+
+    def _dibujar_dinamicos(self):
+        for artista in self._dinamicos():
+            if artista.get_visible():
+                self.ax.draw_artist(artista)
+        self.canvas.blit(self.fig.bbox)
+
+    def _al_dibujar(self, evento):
+        # Un dibujo que no es nuestro (zoom, tamaño, barra de herramientas) invalida el fondo
+        if not self._propio:
+            self._fondo = None
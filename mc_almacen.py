@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén en disco de las muestras de una corrida Monte Carlo.
+
+- Cada bloque que pasa por el AcumuladorMC se guarda como un par de archivos .npy
+  (valores y puntos) en una carpeta; no hay que conocer N de antemano, por lo que
+  sirve también para N adaptativo y para tareas en varios procesos (cada tarea
+  escribe sus propios bloques con un prefijo que fija el orden).
+- La lectura es perezosa: los bloques se abren con np.load(mmap_mode="r") de a uno,
+  así que una corrida de 1e9 muestras se vuelve a analizar sin cargarla en memoria.
+- meta.json guarda la descripción de la corrida y el estado del estimador
+  (réplicas QMC, iteraciones VEGAS, subregiones MISER) para reabrirla sin recalcular f.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+
+from mc_engine import TAM_RESERVORIO, AcumuladorMC
+
+ARCHIVO_META = "meta.json"
+
+
+class AlmacenMuestras:
+    """Carpeta de bloques .npy (valores y puntos) con lectura mapeada en memoria"""
+
+    def __init__(self, ruta, prefijo="t00000_"):
+        self.ruta = ruta
+        self.prefijo = prefijo
+        self._contador = 0
+        os.makedirs(ruta, exist_ok=True)
+
+    # -------------------- Escritura --------------------
+    def escribir(self, valores, puntos=None):
+        """Guarda un bloque de valores y (opcional) los puntos (m, d) donde se evaluaron"""
+        base = os.path.join(self.ruta, f"{self.prefijo}{self._contador:06d}")
+        np.save(base + "_valores.npy", np.asarray(valores, dtype=float).ravel())
+        if puntos is not None:
+            np.save(base + "_puntos.npy", np.asarray(puntos, dtype=float).reshape(np.size(valores), -1))
+        self._contador += 1
+
+    def tarea(self, i):
+        """Almacén para la tarea i de una corrida en paralelo (se puede enviar a otro proceso)"""
+        return AlmacenMuestras(self.ruta, f"t{i:05d}_")
+
+    def vaciar(self):
+        """Borra los bloques y la meta de una corrida anterior en la misma carpeta"""
+        for archivo in glob.glob(os.path.join(self.ruta, "*.npy")) + [os.path.join(self.ruta, ARCHIVO_META)]:
+            if os.path.exists(archivo):
+                os.remove(archivo)
+        self._contador = 0
+
+    def guardar_meta(self, **info):
+        with open(os.path.join(self.ruta, ARCHIVO_META), "w", encoding="utf-8") as archivo:
+            json.dump(info, archivo, ensure_ascii=False, indent=2)
+
+    # -------------------- Lectura perezosa --------------------
+    @property
+    def meta(self):
+        ruta_meta = os.path.join(self.ruta, ARCHIVO_META)
+        if not os.path.exists(ruta_meta):
+            return {}
+        with open(ruta_meta, encoding="utf-8") as archivo:
+            return json.load(archivo)
+
+    def archivos(self):
+        """Bases de los bloques guardados, en orden de escritura (tarea, bloque)"""
+        return [a[:-len("_valores.npy")] for a in sorted(glob.glob(os.path.join(self.ruta, "*_valores.npy")))]
+
+    def iterar(self):
+        """Genera (puntos, valores) de cada bloque, mapeados en memoria (sólo lectura)"""
+        for base in self.archivos():
+            valores = np.load(base + "_valores.npy", mmap_mode="r")
+            puntos = np.load(base + "_puntos.npy", mmap_mode="r") if os.path.exists(base + "_puntos.npy") else None
+            yield puntos, valores
+
+    @property
+    def n(self):
+        return sum(valores.shape[0] for _, valores in self.iterar())
+
+    def reconstruir(self, bins=30, tam_reservorio=TAM_RESERVORIO, rng=None):
+        """AcumuladorMC equivalente al de la corrida, leyendo los bloques de a uno"""
+        acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng)
+        for puntos, valores in self.iterar():
+            acc.agregar(np.asarray(valores), None if puntos is None else np.asarray(puntos))
+        restaurar_estimador(acc, self.meta.get('estimador', {}))
+        return acc
+
+
+# ========================= Estado del estimador ========================= #
+
+def estado_estimador(acc):
+    """Lo que el acumulador sabe además de sus muestras, en tipos serializables a JSON"""
+    return {'tecnica': acc.tecnica,
+            'media': float(acc.media),
+            'evaluaciones': int(acc.evaluaciones),
+            'varianza_simple': None if acc.varianza_simple is None else float(acc.varianza_simple),
+            'medias_replicas': [float(m) for m in acc.medias_replicas],
+            'estimaciones': [[float(m), float(e), int(n)] for m, e, n in acc.estimaciones],
+            'regiones': [[np.asarray(lim).tolist(), int(n), float(m), float(v), float(p)]
+                         for lim, n, m, v, p in acc.regiones]}
+
+
+def restaurar_estimador(acc, estado):
+    if not estado:
+        return acc
+    acc.tecnica = estado['tecnica']
+    acc.evaluaciones = estado['evaluaciones']
+    acc.varianza_simple = estado['varianza_simple']
+    acc.medias_replicas = list(estado['medias_replicas'])
+    acc.estimaciones = [tuple(e) for e in estado['estimaciones']]
+    acc.regiones = [(np.asarray(lim), n, m, v, p) for lim, n, m, v, p in estado['regiones']]
+    # VEGAS y MISER no estiman con la media simple de las muestras guardadas
+    acc.media = estado['media']
+    return acc
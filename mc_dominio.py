@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Integración Monte Carlo en N dimensiones sobre dominios no rectangulares.
+
+- Límites por variable, en orden: los de una variable pueden depender de las
+  anteriores (p. ej. y ∈ [-sqrt(1-x**2), sqrt(1-x**2)]).
+- Restricción opcional (indicadora) como x**2 + y**2 <= 1; varias se separan con comas.
+- Los puntos del cubo unitario se mapean al dominio variable por variable; el peso de
+  cada punto es el jacobiano del mapeo por la indicadora, de modo que la integral es la
+  media de f·peso. Los puntos que no cumplen la restricción se rechazan (peso 0).
+- Se informa la tasa de aceptación y el tamaño efectivo de la muestra (Kish).
+"""
+
+import numpy as np
+import sympy as sp
+
+from mc_engine import (PSEUDOALEATORIO, TAM_BLOQUE, TAM_RESERVORIO, AcumuladorMC, evaluar_vectorizado,
+                       muestras_uniformes)
+
+
+def separar_nivel_superior(texto, separador=","):
+    """Divide `texto` por `separador` sin cortar dentro de paréntesis (p. ej. atan2(y, x))"""
+    partes, nivel, actual = [], 0, ""
+    for c in texto:
+        if c in "([":
+            nivel += 1
+        elif c in ")]":
+            nivel -= 1
+        if c == separador and nivel == 0:
+            partes.append(actual.strip())
+            actual = ""
+        else:
+            actual += c
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+class DominioMC:
+    """Dominio de integración: límites encadenados por variable y restricción opcional"""
+
+    def __init__(self, variables, limites, restriccion=None):
+        if isinstance(variables, str):
+            variables = variables.replace(",", " ").split()
+        self.variables = list(variables)
+        self.simbolos = sp.symbols(self.variables)
+        if len(limites) != len(self.variables):
+            raise ValueError("Se necesita un par de límites por variable")
+
+        self.limites = []
+        self._limites_num = []
+        for i, (inf, sup) in enumerate(limites):
+            previas = self.simbolos[:i]
+            par = []
+            for lim in (inf, sup):
+                expr = sp.sympify(lim)
+                libres = expr.free_symbols - set(previas)
+                if libres:
+                    nombres = ", ".join(sorted(str(s) for s in libres))
+                    raise ValueError(f"Los límites de {self.variables[i]} sólo pueden depender de las "
+                                     f"variables anteriores (aparece {nombres})")
+                par.append(expr)
+            self.limites.append(tuple(par))
+            self._limites_num.append(sp.lambdify(previas, par, "numpy"))
+
+        self.restriccion = None
+        self._restriccion_num = None
+        if restriccion is not None and str(restriccion).strip():
+            condiciones = [sp.sympify(c) for c in separar_nivel_superior(str(restriccion))]
+            self.restriccion = sp.And(*condiciones)
+            libres = self.restriccion.free_symbols - set(self.simbolos)
+            if libres:
+                raise ValueError(f"La restricción usa variables desconocidas: {', '.join(map(str, libres))}")
+            self._restriccion_num = sp.lambdify(self.simbolos, self.restriccion, "numpy")
+
+    @property
+    def dimension(self):
+        return len(self.variables)
+
+    @property
+    def es_caja(self):
+        """True si los límites son constantes y no hay restricción"""
+        return self.restriccion is None and all(not lim.free_symbols for par in self.limites for lim in par)
+
+    def mapear(self, u):
+        """Lleva puntos u (m, d) del cubo unitario al dominio: devuelve (puntos, pesos).
+
+        peso = prod_i (sup_i - inf_i) evaluado en las variables anteriores, o 0 si el
+        intervalo es vacío o el punto no cumple la restricción.
+        """
+        m, d = u.shape
+        puntos = np.empty((m, d))
+        pesos = np.ones(m)
+        with np.errstate(invalid="ignore"):
+            for i, limites_i in enumerate(self._limites_num):
+                inf, sup = (np.broadcast_to(np.asarray(v, dtype=float), (m,)) for v in limites_i(*puntos[:, :i].T))
+                ancho = sup - inf
+                pesos *= np.where(ancho > 0, ancho, 0.0)
+                puntos[:, i] = inf + u[:, i] * ancho
+            if self._restriccion_num is not None:
+                dentro = np.broadcast_to(np.asarray(self._restriccion_num(*puntos.T), dtype=bool), (m,))
+                pesos = np.where(dentro, pesos, 0.0)
+        return puntos, np.nan_to_num(pesos)
+
+    def describir(self):
+        """Texto legible de los límites y la restricción"""
+        texto = ", ".join(f"{v} ∈ [{inf}, {sup}]" for v, (inf, sup) in zip(self.variables, self.limites))
+        if self.restriccion is not None:
+            texto += f" con {self.restriccion}"
+        return texto
+
+
+def integrar_dominio(f, dominio, N, rng=None, muestreo=PSEUDOALEATORIO, replicas=1, aleatorizacion="Owen",
+                     tam_bloque=TAM_BLOQUE, tam_reservorio=TAM_RESERVORIO, bins=30, almacen=None):
+    """Integra f(x1, ..., xd) sobre `dominio` con N puntos mapeados desde el cubo unitario.
+
+    Devuelve (acumulador, resumen): la integral es acumulador.media y el resumen trae
+    la tasa de aceptación, el tamaño efectivo de la muestra y la medida del dominio.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    d = dominio.dimension
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng, almacen=almacen)
+    medida = AcumuladorMC(tam_reservorio=0, rng=rng)
+    sumas, conteos = {}, {}
+    aceptados = 0
+    suma_w = suma_w2 = 0.0
+    for r, u in muestras_uniformes([(0.0, 1.0)] * d, N, rng, muestreo, replicas, aleatorizacion, tam_bloque):
+        puntos, pesos = dominio.mapear(u)
+        validos = pesos > 0
+        valores = np.zeros(u.shape[0])
+        if validos.any():
+            valores[validos] = evaluar_vectorizado(f, puntos[validos]) * pesos[validos]
+        acc.agregar(valores, puntos)
+        medida.agregar(pesos)
+        sumas[r] = sumas.get(r, 0.0) + valores.sum()
+        conteos[r] = conteos.get(r, 0) + valores.size
+        aceptados += int(validos.sum())
+        suma_w += pesos.sum()
+        suma_w2 += (pesos ** 2).sum()
+    if len(sumas) > 1:
+        acc.medias_replicas = [sumas[r] / conteos[r] for r in sorted(sumas)]
+    acc.evaluaciones = aceptados
+    resumen = {'aceptacion': aceptados / acc.n,
+               'tamaño_efectivo': float(suma_w ** 2 / suma_w2) if suma_w2 > 0 else 0.0,
+               'medida': float(medida.media),
+               'error_medida': float(medida.error_estandar),
+               'N': acc.n}
+    return acc, resumen
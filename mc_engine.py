@@ -0,0 +1,1040 @@
+# -*- coding: utf-8 -*-
+"""
+Motor Monte Carlo en bloques (streaming) con memoria constante.
+
+- Las muestras se generan en bloques de tamaño fijo y cada bloque se pliega en
+  estadísticos acumulados (media, varianza, mín/máx) con la fusión de Welford/Chan.
+- Histograma de bins fijos que duplica su ancho cuando aparecen valores fuera de rango.
+- Reservorio acotado de muestras (algoritmo R) para tablas, gráficos y bootstrap.
+- Medias por lotes en orden de llegada: entre MAX_LOTES/2 y MAX_LOTES lotes, cuyo
+  tamaño se duplica (fusionando pares) a medida que crece N.
+- Trayectoria de convergencia (media y varianza acumuladas) exacta sobre todas las
+  muestras, guardada en puntos de control logarítmicos.
+- Muestreo pseudoaleatorio o cuasi-Monte Carlo (Sobol/Halton aleatorizados); con QMC el
+  error estándar se obtiene de réplicas aleatorizadas independientes.
+- Reducción de varianza: variables antitéticas, variable de control polinómica,
+  muestreo estratificado y muestreo por importancia, con el factor de reducción
+  respecto del estimador promedio simple.
+- VEGAS: grilla de importancia separable (constante a trozos por eje) que se adapta
+  en varias iteraciones; las estimaciones se combinan por varianza inversa y se
+  informa chi²/gl como control de consistencia.
+- Opcionalmente cada bloque se guarda en disco (ver mc_almacen.AlmacenMuestras).
+- MISER: muestreo estratificado recursivo que biseca la región por el eje que más
+  reduce la varianza y reparte las muestras según la varianza de cada subregión.
+- Ejecución en varios procesos con flujos independientes (SeedSequence.spawn y
+  generadores PCG64/Philox); el resultado sólo depende de la semilla maestra.
+- N adaptativo: se muestrea en lotes crecientes hasta alcanzar un semiancho objetivo
+  del intervalo de confianza t (Wilson para hit-or-miss), o hasta agotar el
+  presupuesto de muestras/tiempo; con varianza 0 el objetivo no se da por alcanzado.
+
+Así, N = 1e9 usa la misma memoria que N = 1e4.
+"""
+
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+from scipy import stats
+from scipy.stats import qmc
+
+from mc_estadistica import PUNTOS_POR_DECADA, estadisticas_prefijo, posiciones_log
+
+TAM_BLOQUE = 100_000
+TAM_RESERVORIO = 5000
+MAX_LOTES = 64
+
+PSEUDOALEATORIO = "Pseudoaleatorio"
+METODOS_MUESTREO = (PSEUDOALEATORIO, "Sobol", "Halton")
+ALEATORIZACIONES = ("Owen", "Desplazamiento")
+
+GENERADORES = ("PCG64", "Philox")
+TAM_TAREA = 1_000_000
+
+SIN_REDUCCION = "Ninguna"
+VEGAS = "VEGAS"
+MISER = "MISER"
+TECNICAS_REDUCCION = (SIN_REDUCCION, "Antitéticas", "Variable de control", "Estratificado", "Importancia", VEGAS,
+                      MISER)
+
+
+def bloques(N, tam_bloque=TAM_BLOQUE):
+    """Genera los tamaños de bloque que suman N"""
+    N = int(N)
+    if N <= 0:
+        raise ValueError("N debe ser un entero positivo")
+    completos, resto = divmod(N, tam_bloque)
+    for _ in range(completos):
+        yield tam_bloque
+    if resto:
+        yield resto
+
+
+# ========================= Acumulador de estadísticos ========================= #
+
+class AcumuladorMC:
+    """Estadísticos en línea de una secuencia de valores, con histograma y reservorio"""
+
+    def __init__(self, bins=30, tam_reservorio=TAM_RESERVORIO, rng=None, almacen=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # Almacén en disco opcional que recibe cada bloque agregado (mc_almacen)
+        self.almacen = almacen
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+        # Histograma de bins fijos (número par para poder fusionar de a pares)
+        self.bins = bins + (bins % 2)
+        self.conteos = np.zeros(self.bins, dtype=np.int64)
+        self.rango = None
+
+        # Reservorio de muestras: valores y (opcional) puntos donde se evaluaron
+        self.tam_reservorio = tam_reservorio
+        self.res_valores = np.empty(tam_reservorio)
+        self.res_puntos = None
+        self.n_reservorio = 0
+
+        # Medias de réplicas aleatorizadas independientes (QMC)
+        self.medias_replicas = []
+
+        # Medias por lotes: sumas de lotes completos de tam_lote muestras y el lote en curso
+        self.tam_lote = 1
+        self.sumas_lote = np.empty(0)
+        self.suma_pendiente = 0.0
+        self.n_pendiente = 0
+
+        # Trayectoria de convergencia en puntos de control logarítmicos
+        self.conv_n = np.empty(0, dtype=np.int64)
+        self.conv_media = np.empty(0)
+        self.conv_m2 = np.empty(0)
+
+        # Reducción de varianza: evaluaciones de f y varianza del estimador simple
+        self.tecnica = SIN_REDUCCION
+        self.evaluaciones = 0
+        self.varianza_simple = None
+
+        # Estimaciones independientes (media, error, n) combinadas por varianza inversa (VEGAS)
+        self.estimaciones = []
+
+        # Subregiones estratificadas (limites, n, media, varianza, fracción de volumen) (MISER)
+        self.regiones = []
+
+    # -------------------- Propiedades --------------------
+    @property
+    def varianza(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self):
+        return float(np.sqrt(self.varianza))
+
+    @property
+    def error_estandar(self):
+        if self.estimaciones:
+            return float(np.sqrt(1.0 / sum(1.0 / e ** 2 for _, e, _ in self.estimaciones)))
+        if self.regiones:
+            return float(np.sqrt(sum(p ** 2 * v / n for _, n, _, v, p in self.regiones)))
+        # Con réplicas QMC las muestras no son independientes: usar la dispersión entre réplicas
+        if len(self.medias_replicas) > 1:
+            return float(np.std(self.medias_replicas, ddof=1) / np.sqrt(len(self.medias_replicas)))
+        return self.desviacion / np.sqrt(self.n) if self.n > 0 else 0.0
+
+    @property
+    def grados_libertad(self):
+        """Grados de libertad del intervalo t asociado a error_estandar"""
+        if self.estimaciones:
+            return max(sum(n for _, _, n in self.estimaciones) - len(self.estimaciones), 1)
+        if self.regiones:
+            return max(sum(n for _, n, _, _, _ in self.regiones) - len(self.regiones), 1)
+        if len(self.medias_replicas) > 1:
+            return len(self.medias_replicas) - 1
+        return max(self.n - 1, 1)
+
+    @property
+    def chi2_gl(self):
+        """chi²/gl de las estimaciones respecto de su media ponderada (≈ 1 si son consistentes)"""
+        if len(self.estimaciones) < 2:
+            return None
+        chi2 = sum((m - self.media) ** 2 / e ** 2 for m, e, _ in self.estimaciones)
+        return chi2 / (len(self.estimaciones) - 1)
+
+    @property
+    def factor_reduccion(self):
+        """Varianza del estimador simple / varianza de éste, a igual número de evaluaciones de f"""
+        if self.varianza_simple is None or self.n < 2 or self.evaluaciones == 0:
+            return 1.0
+        varianza_por_evaluacion = self.error_estandar ** 2 * self.evaluaciones
+        return self.varianza_simple / varianza_por_evaluacion if varianza_por_evaluacion > 0 else np.inf
+
+    @property
+    def bordes(self):
+        if self.rango is None:
+            return None
+        return np.linspace(self.rango[0], self.rango[1], self.bins + 1)
+
+    @property
+    def convergencia(self):
+        """(n, media, varianza) acumuladas en los puntos de control"""
+        n, media, m2 = self.conv_n, self.conv_media, self.conv_m2
+        if self.n > 0 and (n.size == 0 or n[-1] != self.n):
+            n, media, m2 = np.append(n, self.n), np.append(media, self.media), np.append(m2, self.m2)
+        varianza = np.where(n > 1, m2 / np.maximum(n - 1, 1), 0.0)
+        return n, media, varianza
+
+    @property
+    def medias_lote(self):
+        return self.sumas_lote / self.tam_lote
+
+    @property
+    def reservorio(self):
+        """Devuelve (puntos, valores) de la muestra acotada"""
+        k = self.n_reservorio
+        puntos = self.res_puntos[:k] if self.res_puntos is not None else None
+        return puntos, self.res_valores[:k]
+
+    # -------------------- Actualización --------------------
+    def agregar(self, valores, puntos=None):
+        """Pliega un bloque de valores (y sus puntos de muestreo) en el acumulado"""
+        valores = np.asarray(valores, dtype=float).ravel()
+        m = valores.size
+        if m == 0:
+            return self
+        media_b = valores.mean()
+        m2_b = float(np.sum((valores - media_b) ** 2))
+        self._agregar_convergencia(valores)
+        self._fusionar_momentos(m, media_b, m2_b)
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self._agregar_histograma(valores)
+        self._agregar_reservorio(valores, puntos)
+        self._agregar_lotes(valores)
+        if self.almacen is not None:
+            self.almacen.escribir(valores, puntos)
+        return self
+
+    def fusionar(self, otro):
+        """Fusiona otro acumulador (fórmula de Chan) en éste"""
+        if otro.n == 0:
+            return self
+        n_previo = self.n
+        self._fusionar_convergencia(otro)
+        self._fusionar_momentos(otro.n, otro.media, otro.m2)
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        if otro.rango is not None:
+            self._expandir_rango(otro.rango[0], otro.rango[1])
+            # Reubicar los conteos del otro histograma por el centro de sus bins
+            centros = 0.5 * (otro.bordes[:-1] + otro.bordes[1:])
+            idx = np.clip(((centros - self.rango[0]) / (self.rango[1] - self.rango[0]) * self.bins).astype(int),
+                          0, self.bins - 1)
+            np.add.at(self.conteos, idx, otro.conteos)
+        self._fusionar_reservorio(otro, n_previo)
+        self._fusionar_lotes(otro)
+        self.medias_replicas.extend(otro.medias_replicas)
+        self.evaluaciones += otro.evaluaciones
+        return self
+
+    def combinar_estimaciones(self):
+        """Reemplaza la media por la combinación de varianza inversa de `estimaciones`"""
+        if self.estimaciones:
+            pesos = np.array([1.0 / e ** 2 for _, e, _ in self.estimaciones])
+            medias = np.array([m for m, _, _ in self.estimaciones])
+            self.media = float(np.dot(pesos, medias) / pesos.sum())
+        return self
+
+    def _fusionar_momentos(self, n_b, media_b, m2_b):
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    # -------------------- Convergencia --------------------
+    def _agregar_convergencia(self, valores):
+        # Prefijos del bloque que caen en la grilla logarítmica, fusionados con el estado previo
+        posiciones = posiciones_log(self.n, self.n + valores.size) - self.n
+        if posiciones.size == 0:
+            return
+        n, media, m2 = estadisticas_prefijo(valores, posiciones, self.n, self.media, self.m2)
+        self._extender_convergencia(n, media, m2)
+
+    def _fusionar_convergencia(self, otro):
+        if otro.conv_n.size == 0:
+            return
+        n0 = self.n
+        n = n0 + otro.conv_n
+        if n0 == 0:
+            media, m2 = otro.conv_media, otro.conv_m2
+        else:
+            delta = otro.conv_media - self.media
+            media = self.media + delta * otro.conv_n / n
+            m2 = self.m2 + otro.conv_m2 + delta ** 2 * n0 * otro.conv_n / n
+        self._extender_convergencia(n, media, m2)
+        # Las posiciones desplazadas ya no caen en la grilla: dejar un punto por celda logarítmica
+        celdas = np.floor(np.log10(self.conv_n) * PUNTOS_POR_DECADA)
+        ultimo = np.append(celdas[1:] != celdas[:-1], True)
+        self.conv_n, self.conv_media, self.conv_m2 = self.conv_n[ultimo], self.conv_media[ultimo], self.conv_m2[ultimo]
+
+    def _extender_convergencia(self, n, media, m2):
+        self.conv_n = np.concatenate((self.conv_n, n))
+        self.conv_media = np.concatenate((self.conv_media, media))
+        self.conv_m2 = np.concatenate((self.conv_m2, m2))
+
+    # -------------------- Histograma --------------------
+    def _expandir_rango(self, lo, hi):
+        if self.rango is None:
+            if hi <= lo:
+                ancho = max(abs(lo), 1.0) * 1e-6
+                lo, hi = lo - ancho, hi + ancho
+            self.rango = (lo, hi)
+            return
+        r0, r1 = self.rango
+        mitad = self.bins // 2
+        while lo < r0 or hi > r1:
+            # Duplicar el ancho de bin: fusionar pares y agregar mitad de bins vacíos
+            ancho = r1 - r0
+            fusion = self.conteos.reshape(-1, 2).sum(axis=1)
+            vacios = np.zeros(mitad, dtype=np.int64)
+            if lo < r0:
+                self.conteos = np.concatenate((vacios, fusion))
+                r0 -= ancho
+            else:
+                self.conteos = np.concatenate((fusion, vacios))
+                r1 += ancho
+        self.rango = (r0, r1)
+
+    def _agregar_histograma(self, valores):
+        self._expandir_rango(float(valores.min()), float(valores.max()))
+        conteos, _ = np.histogram(valores, bins=self.bins, range=self.rango)
+        self.conteos += conteos
+
+    def densidad(self):
+        """Histograma normalizado como densidad: (densidades, bordes)"""
+        bordes = self.bordes
+        total = self.conteos.sum()
+        if bordes is None or total == 0:
+            return np.zeros(self.bins), bordes
+        return self.conteos / (total * np.diff(bordes)), bordes
+
+    # -------------------- Medias por lotes --------------------
+    def _duplicar_lote(self):
+        # Un lote completo sin pareja vuelve al lote en curso (que sigue siendo más corto)
+        if self.sumas_lote.size % 2:
+            self.suma_pendiente += self.sumas_lote[-1]
+            self.n_pendiente += self.tam_lote
+            self.sumas_lote = self.sumas_lote[:-1]
+        self.sumas_lote = self.sumas_lote.reshape(-1, 2).sum(axis=1)
+        self.tam_lote *= 2
+
+    def _agregar_lotes(self, valores):
+        while self.sumas_lote.size + (self.n_pendiente + valores.size) // self.tam_lote > MAX_LOTES:
+            self._duplicar_lote()
+        falta = self.tam_lote - self.n_pendiente
+        if valores.size < falta:
+            self.suma_pendiente += valores.sum()
+            self.n_pendiente += valores.size
+            return
+        resto = valores[falta:]
+        k = resto.size // self.tam_lote
+        completos = resto[:k * self.tam_lote].reshape(k, self.tam_lote).sum(axis=1)
+        self.sumas_lote = np.concatenate((self.sumas_lote, [self.suma_pendiente + valores[:falta].sum()], completos))
+        self.suma_pendiente = float(resto[k * self.tam_lote:].sum())
+        self.n_pendiente = resto.size - k * self.tam_lote
+
+    def _fusionar_lotes(self, otro):
+        # Llevar ambos al mismo tamaño de lote; el lote en curso del otro se descarta
+        sumas_otro, tam_otro = otro.sumas_lote, otro.tam_lote
+        while self.tam_lote < tam_otro:
+            self._duplicar_lote()
+        while tam_otro < self.tam_lote:
+            sumas_otro = sumas_otro[:sumas_otro.size // 2 * 2].reshape(-1, 2).sum(axis=1)
+            tam_otro *= 2
+        self.sumas_lote = np.concatenate((self.sumas_lote, sumas_otro))
+        while self.sumas_lote.size > MAX_LOTES:
+            self._duplicar_lote()
+
+    # -------------------- Reservorio --------------------
+    def _asegurar_puntos(self, puntos):
+        if puntos is not None and self.res_puntos is None:
+            self.res_puntos = np.empty((self.tam_reservorio, puntos.shape[1]))
+
+    def _agregar_reservorio(self, valores, puntos):
+        k = self.tam_reservorio
+        if k == 0:
+            return
+        if puntos is not None:
+            puntos = np.asarray(puntos, dtype=float).reshape(valores.size, -1)
+            self._asegurar_puntos(puntos)
+        m = valores.size
+        n_previo = self.n - m
+
+        # Llenado inicial en orden
+        libres = min(max(k - n_previo, 0), m)
+        if libres:
+            self.res_valores[n_previo:n_previo + libres] = valores[:libres]
+            if puntos is not None:
+                self.res_puntos[n_previo:n_previo + libres] = puntos[:libres]
+            self.n_reservorio = n_previo + libres
+
+        # Algoritmo R vectorizado: el elemento i reemplaza un slot con prob. k/(i+1)
+        if libres < m:
+            indices = np.arange(n_previo + libres, n_previo + m)
+            slots = (self.rng.random(indices.size) * (indices + 1)).astype(np.int64)
+            acepta = slots < k
+            origen = libres + np.flatnonzero(acepta)
+            self.res_valores[slots[acepta]] = valores[origen]
+            if puntos is not None:
+                self.res_puntos[slots[acepta]] = puntos[origen]
+
+    def _fusionar_reservorio(self, otro, n_previo):
+        puntos_o, valores_o = otro.reservorio
+        if valores_o.size == 0:
+            return
+        if puntos_o is not None:
+            self._asegurar_puntos(puntos_o)
+        k = self.tam_reservorio
+        j = self.n_reservorio
+        if k - j >= valores_o.size:
+            # Todavía hay lugar: concatenar
+            self.res_valores[j:j + valores_o.size] = valores_o
+            if puntos_o is not None:
+                self.res_puntos[j:j + valores_o.size] = puntos_o
+            self.n_reservorio += valores_o.size
+            return
+        # Submuestra sin reemplazo: la cantidad tomada de cada lado es proporcional a su n
+        k_nuevo = min(k, j + valores_o.size)
+        c = int(self.rng.binomial(k_nuevo, otro.n / (n_previo + otro.n)))
+        c = min(max(c, k_nuevo - j), valores_o.size)
+        idx_otro = self.rng.permutation(valores_o.size)[:c]
+        idx_propio = self.rng.permutation(j)[:k_nuevo - c]
+        nuevos_v = np.concatenate((self.res_valores[idx_propio], valores_o[idx_otro]))
+        if self.res_puntos is not None and puntos_o is not None:
+            nuevos_p = np.concatenate((self.res_puntos[idx_propio], puntos_o[idx_otro]))
+            self.res_puntos[:k_nuevo] = nuevos_p
+        self.res_valores[:k_nuevo] = nuevos_v
+        self.n_reservorio = k_nuevo
+
+
+# ========================= Muestreo (pseudoaleatorio / QMC) ========================= #
+
+def generador_uniforme(muestreo, d, rng, aleatorizacion="Owen"):
+    """Devuelve una función m -> arreglo (m, d) de puntos en [0, 1)^d.
+
+    Para Sobol/Halton cada llamada continúa la misma secuencia; cada generador
+    creado es una aleatorización independiente (Owen o desplazamiento aleatorio).
+    """
+    if muestreo == PSEUDOALEATORIO:
+        return lambda m: rng.random((m, d))
+    if muestreo not in METODOS_MUESTREO:
+        raise ValueError(f"Muestreo desconocido: {muestreo}")
+    if aleatorizacion not in ALEATORIZACIONES:
+        raise ValueError(f"Aleatorización desconocida: {aleatorizacion}")
+
+    owen = aleatorizacion == "Owen"
+    clase = qmc.Sobol if muestreo == "Sobol" else qmc.Halton
+    motor = clase(d, scramble=owen, seed=rng)
+    desplazamiento = None if owen else rng.random(d)
+
+    def generar(m):
+        with warnings.catch_warnings():
+            # Sobol avisa cuando m no es potencia de 2; la secuencia sigue siendo válida
+            warnings.simplefilter("ignore", UserWarning)
+            u = motor.random(m)
+        if desplazamiento is not None:
+            u = (u + desplazamiento) % 1.0
+        return u
+    return generar
+
+
+def repartir(N, partes):
+    """Reparte N muestras en `partes` réplicas de tamaño casi igual"""
+    base, resto = divmod(int(N), partes)
+    return [base + (1 if i < resto else 0) for i in range(partes)]
+
+
+def muestras_uniformes(limites, N, rng, muestreo=PSEUDOALEATORIO, replicas=1, aleatorizacion="Owen",
+                       tam_bloque=TAM_BLOQUE):
+    """Genera bloques (replica, puntos) uniformes en la caja `limites`.
+
+    Con muestreo pseudoaleatorio se usa una sola réplica.
+    """
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    inferiores, ancho = limites[:, 0], limites[:, 1] - limites[:, 0]
+    replicas = 1 if muestreo == PSEUDOALEATORIO else max(int(replicas), 1)
+    if replicas > N:
+        raise ValueError("El número de réplicas no puede superar N")
+    for r, N_r in enumerate(repartir(N, replicas)):
+        generar = generador_uniforme(muestreo, limites.shape[0], rng, aleatorizacion)
+        for m in bloques(N_r, tam_bloque):
+            yield r, inferiores + generar(m) * ancho
+
+
+# ========================= Integración en bloques ========================= #
+
+def evaluar_vectorizado(f, puntos):
+    """Evalúa f(x1, ..., xd) sobre un bloque (m, d) y devuelve un arreglo (m,) sin NaN"""
+    m = puntos.shape[0]
+    valores = np.broadcast_to(np.asarray(f(*puntos.T), dtype=float), (m,))
+    return np.nan_to_num(valores)
+
+
+def integrar_mc(f, limites, N, rng=None, tam_bloque=TAM_BLOQUE, tam_reservorio=TAM_RESERVORIO, bins=30,
+                muestreo=PSEUDOALEATORIO, replicas=1, aleatorizacion="Owen", tecnica=SIN_REDUCCION, almacen=None,
+                **opciones):
+    """Método promedio sobre la caja `limites` = [(a, b), (c, d), ...] en bloques.
+
+    Devuelve (acumulador, volumen); la integral es volumen * acumulador.media.
+    `tecnica` elige una técnica de reducción de varianza (ver integrar_reduccion).
+    Con `almacen` cada bloque de muestras se guarda también en disco.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    volumen = float(np.prod(limites[:, 1] - limites[:, 0]))
+
+    if tecnica != SIN_REDUCCION:
+        if muestreo != PSEUDOALEATORIO:
+            raise ValueError("Las técnicas de reducción de varianza usan muestreo pseudoaleatorio")
+        acc = integrar_reduccion(f, limites, N, tecnica, rng, tam_bloque, tam_reservorio, bins, almacen=almacen,
+                                 **opciones)
+        return acc, volumen
+
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng, almacen=almacen)
+    sumas, conteos = {}, {}
+    for r, puntos in muestras_uniformes(limites, N, rng, muestreo, replicas, aleatorizacion, tam_bloque):
+        valores = evaluar_vectorizado(f, puntos)
+        acc.agregar(valores, puntos)
+        sumas[r] = sumas.get(r, 0.0) + valores.sum()
+        conteos[r] = conteos.get(r, 0) + valores.size
+    if len(sumas) > 1:
+        acc.medias_replicas = [sumas[r] / conteos[r] for r in sorted(sumas)]
+    acc.evaluaciones = acc.n
+    acc.varianza_simple = acc.varianza
+    return acc, volumen
+
+
+# ========================= Reducción de varianza ========================= #
+#
+# Cada técnica produce observaciones i.i.d. g cuya media es la media de f sobre la caja,
+# de modo que el AcumuladorMC da directamente el error estándar correcto:
+#   - Antitéticas: g = (f(x) + f(x')) / 2 con x' el punto reflejado.
+#   - Variable de control: g = f(x) - p(x) + E[p], p polinomio ajustado en una muestra piloto.
+#   - Estratificado: g = promedio de f con un punto por estrato (un "barrido" de la grilla).
+#   - Importancia (1D): g = f(x) / (p(x) (b - a)) con x ~ p, p constante a trozos.
+#   - VEGAS: como Importancia pero con p separable en d dimensiones y adaptada por
+#     iteraciones (ver integrar_vegas); la media se combina por varianza inversa.
+#   - MISER: g = f(x) V_i / (V n_i / M) en cada subregión i (ver integrar_miser); el
+#     error estándar sale de la suma estratificada sum (V_i / V)² var_i / n_i.
+# En paralelo se acumulan E_u[f] y E_u[f²] para estimar la varianza del estimador simple.
+
+def _ajustar_control(f, limites, rng, grado, n_piloto):
+    """Ajusta p(x) = c0 + sum_j sum_k c_jk x_j^k y devuelve (p, media exacta de p en la caja)"""
+    d = limites.shape[0]
+    inferiores, superiores = limites[:, 0], limites[:, 1]
+    potencias = np.arange(1, grado + 1)
+
+    def diseño(puntos):
+        columnas = (puntos[:, :, None] ** potencias).reshape(puntos.shape[0], d * grado)
+        return np.column_stack((np.ones(puntos.shape[0]), columnas))
+
+    piloto = rng.uniform(inferiores, superiores, size=(n_piloto, d))
+    coef, *_ = np.linalg.lstsq(diseño(piloto), evaluar_vectorizado(f, piloto), rcond=None)
+
+    # E[x^k] sobre [lo, hi] = (hi^(k+1) - lo^(k+1)) / ((k+1)(hi - lo))
+    k1 = potencias + 1
+    momentos = (superiores[:, None] ** k1 - inferiores[:, None] ** k1) / (k1 * (superiores - inferiores)[:, None])
+    media_p = coef[0] + float(np.dot(coef[1:], momentos.ravel()))
+    return (lambda puntos: diseño(puntos) @ coef), media_p
+
+
+def _densidad_tabulada(f, a, b, rng, densidad, n_piloto, bins=64, defensiva=0.05):
+    """Densidad constante a trozos en [a, b]: (bordes, probabilidades por bin).
+
+    Si `densidad` es None se ajusta a |f| con una muestra piloto. Se mezcla con la
+    uniforme (fracción `defensiva`) para que p > 0 en todo el intervalo.
+    """
+    if densidad is None:
+        # Unas 20 muestras piloto por bin; los bins vacíos toman la altura media
+        bins = int(np.clip(n_piloto // 20, 4, bins))
+        bordes = np.linspace(a, b, bins + 1)
+        piloto = rng.uniform(a, b, n_piloto)
+        abs_f = np.abs(evaluar_vectorizado(f, piloto[:, None]))
+        idx = np.minimum(((piloto - a) / (b - a) * bins).astype(int), bins - 1)
+        suma = np.bincount(idx, weights=abs_f, minlength=bins)
+        cuenta = np.bincount(idx, minlength=bins)
+        alturas = np.where(cuenta > 0, suma / np.maximum(cuenta, 1), abs_f.mean())
+    else:
+        bordes = np.linspace(a, b, bins + 1)
+        centros = 0.5 * (bordes[:-1] + bordes[1:])
+        alturas = np.clip(np.broadcast_to(np.asarray(densidad(centros), dtype=float), (bins,)), 0, None)
+    total = alturas.sum()
+    probs = alturas / total if total > 0 and np.isfinite(total) else np.full(bins, 1.0 / bins)
+    probs = (1 - defensiva) * probs + defensiva / bins
+    return bordes, probs / probs.sum()
+
+
+def integrar_reduccion(f, limites, N, tecnica, rng, tam_bloque=TAM_BLOQUE, tam_reservorio=TAM_RESERVORIO,
+                       bins=30, grado_control=2, estratos=64, densidad=None, iteraciones_vegas=10, bins_vegas=50,
+                       min_biseccion=256, almacen=None):
+    """Método promedio con reducción de varianza usando N evaluaciones de f (incluida la piloto).
+
+    El acumulador resultante tiene media = integral / volumen, y `factor_reduccion`
+    indica cuántas muestras simples equivale cada evaluación.
+    """
+    if tecnica not in TECNICAS_REDUCCION:
+        raise ValueError(f"Técnica desconocida: {tecnica}")
+    if tecnica == VEGAS:
+        return integrar_vegas(f, limites, N, rng, iteraciones_vegas, bins_vegas, tam_bloque=tam_bloque,
+                              tam_reservorio=tam_reservorio, bins=bins, almacen=almacen)
+    if tecnica == MISER:
+        return integrar_miser(f, limites, N, rng, min_biseccion, tam_bloque=tam_bloque,
+                              tam_reservorio=tam_reservorio, bins=bins, almacen=almacen)
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    d = limites.shape[0]
+    inferiores, ancho = limites[:, 0], limites[:, 1] - limites[:, 0]
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng, almacen=almacen)
+    acc.tecnica = tecnica
+    n_piloto = min(max(200, 20 * (grado_control * d + 1)), max(int(N) // 5, 1))
+    s1 = s2 = 0.0
+    n_simple = 0
+
+    if tecnica == "Antitéticas":
+        if N < 4:
+            raise ValueError("Se necesitan al menos 4 evaluaciones")
+        for m in bloques(int(N) // 2, max(tam_bloque // 2, 1)):
+            u = rng.random((m, d))
+            x1, x2 = inferiores + u * ancho, inferiores + (1 - u) * ancho
+            f1, f2 = evaluar_vectorizado(f, x1), evaluar_vectorizado(f, x2)
+            acc.agregar(0.5 * (f1 + f2), x1)
+            s1 += f1.sum() + f2.sum()
+            s2 += (f1 ** 2).sum() + (f2 ** 2).sum()
+            n_simple += 2 * m
+        acc.evaluaciones = n_simple
+
+    elif tecnica == "Variable de control":
+        p, media_p = _ajustar_control(f, limites, rng, grado_control, n_piloto)
+        if N - n_piloto < 2:
+            raise ValueError("N es muy chico para la muestra piloto")
+        for m in bloques(int(N) - n_piloto, tam_bloque):
+            x = inferiores + rng.random((m, d)) * ancho
+            fx = evaluar_vectorizado(f, x)
+            acc.agregar(fx - p(x) + media_p, x)
+            s1 += fx.sum()
+            s2 += (fx ** 2).sum()
+            n_simple += m
+        acc.evaluaciones = n_simple + n_piloto
+
+    elif tecnica == "Estratificado":
+        # Grilla de k^d estratos iguales, con al menos dos barridos para estimar la varianza
+        k = max(1, int(round(estratos ** (1.0 / d))))
+        while k > 1 and k ** d * 2 > N:
+            k -= 1
+        M = k ** d
+        origen = np.stack(np.meshgrid(*[np.arange(k)] * d, indexing="ij"), axis=-1).reshape(M, d)
+        barridos = int(N) // M
+        if barridos < 2:
+            raise ValueError("N es muy chico para estratificar")
+        for s in bloques(barridos, max(tam_bloque // M, 1)):
+            x = inferiores + (origen + rng.random((s, M, d))) / k * ancho
+            fx = evaluar_vectorizado(f, x.reshape(s * M, d)).reshape(s, M)
+            acc.agregar(fx.mean(axis=1), x[np.arange(s), rng.integers(0, M, s)])
+            s1 += fx.sum()
+            s2 += (fx ** 2).sum()
+            n_simple += s * M
+        acc.evaluaciones = n_simple
+
+    else:  # Importancia
+        if d != 1:
+            raise ValueError("El muestreo por importancia está disponible sólo en 1D")
+        a, b = limites[0]
+        bordes, probs = _densidad_tabulada(f, a, b, rng, densidad, n_piloto)
+        anchos_bin = np.diff(bordes)
+        acumulada = np.cumsum(probs)
+        acumulada[-1] = 1.0
+        if N - (n_piloto if densidad is None else 0) < 2:
+            raise ValueError("N es muy chico para la muestra piloto")
+        n_usadas = int(N) - (n_piloto if densidad is None else 0)
+        for m in bloques(n_usadas, tam_bloque):
+            idx = np.searchsorted(acumulada, rng.random(m), side="right")
+            idx = np.minimum(idx, probs.size - 1)
+            x = bordes[idx] + rng.random(m) * anchos_bin[idx]
+            fx = evaluar_vectorizado(f, x[:, None])
+            # peso = densidad uniforme / p(x)
+            w = anchos_bin[idx] / (probs[idx] * (b - a))
+            acc.agregar(fx * w, x[:, None])
+            s1 += (fx * w).sum()
+            s2 += (fx ** 2 * w).sum()
+            n_simple += m
+        acc.evaluaciones = int(N)
+
+    media_simple = s1 / n_simple
+    acc.varianza_simple = max(s2 / n_simple - media_simple ** 2, 0.0) * n_simple / max(n_simple - 1, 1)
+    return acc
+
+
+# ========================= VEGAS ========================= #
+#
+# En el cubo unitario cada eje j tiene una grilla de `bins_vegas` intervalos de anchos
+# Δ_ji; un punto se elige tomando un intervalo al azar (uniforme) y un punto uniforme en
+# él, así que la densidad es p(y) = prod_j 1 / (bins_vegas Δ_ji) y g = f(x) / p(y).
+# Tras cada iteración los bordes se mueven para que cada intervalo reciba la misma
+# porción de sum(g²) (suavizada y comprimida con el exponente alpha de Lepage).
+
+def _refinar_grilla(bordes, d, alpha=1.5):
+    """Nuevos bordes (d_ejes, k+1) a partir de la suma de g² por intervalo de cada eje"""
+    nuevos = bordes.copy()
+    k = d.shape[1]
+    for j in range(d.shape[0]):
+        dj = d[j]
+        if k > 1:
+            # Suavizado con los intervalos vecinos
+            dj = np.concatenate(([7 * dj[0] + dj[1]],
+                                 dj[:-2] + 6 * dj[1:-1] + dj[2:],
+                                 [dj[-2] + 7 * dj[-1]])) / 8
+        total = dj.sum()
+        if not np.isfinite(total) or total <= 0:
+            continue
+        r = dj / total
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            w = np.where((r > 0) & (r < 1), ((1 - r) / -np.log(r)) ** alpha, np.where(r >= 1, 1.0, 0.0))
+        acumulada = np.concatenate(([0.0], np.cumsum(w)))
+        if acumulada[-1] <= 0:
+            continue
+        objetivos = np.arange(1, k) * acumulada[-1] / k
+        nuevos[j, 1:-1] = np.interp(objetivos, acumulada, bordes[j])
+    return nuevos
+
+
+def integrar_vegas(f, limites, N, rng, iteraciones=10, bins_vegas=50, descartar=None, alpha=1.5,
+                   tam_bloque=TAM_BLOQUE, tam_reservorio=TAM_RESERVORIO, bins=30, almacen=None):
+    """VEGAS en la caja `limites` con N evaluaciones de f repartidas en `iteraciones`.
+
+    Las primeras `descartar` iteraciones (por defecto un tercio) sólo adaptan la grilla;
+    las restantes se combinan por varianza inversa en `acc.estimaciones` y `acc.chi2_gl`
+    mide su consistencia. Devuelve el acumulador (media = integral / volumen).
+    """
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    d = limites.shape[0]
+    inferiores, ancho = limites[:, 0], limites[:, 1] - limites[:, 0]
+    iteraciones = max(int(iteraciones), 2)
+    descartar = iteraciones // 3 if descartar is None else min(int(descartar), iteraciones - 1)
+    if int(N) // iteraciones < 2:
+        raise ValueError("N es muy chico para las iteraciones de VEGAS")
+
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng, almacen=almacen)
+    acc.tecnica = VEGAS
+    bordes = np.tile(np.linspace(0.0, 1.0, bins_vegas + 1), (d, 1))
+    ejes = np.arange(d)
+    s1 = s2 = 0.0
+    n_simple = 0
+
+    for it, n_it in enumerate(repartir(int(N), iteraciones)):
+        anchos = np.diff(bordes, axis=1)
+        d_grilla = np.zeros((d, bins_vegas))
+        suma = suma2 = 0.0
+        for m in bloques(n_it, tam_bloque):
+            u = rng.random((m, d)) * bins_vegas
+            idx = np.minimum(u.astype(np.int64), bins_vegas - 1)
+            delta = anchos[ejes, idx]
+            y = bordes[ejes, idx] + (u - idx) * delta
+            jacobiano = np.prod(bins_vegas * delta, axis=1)
+            x = inferiores + y * ancho
+            fx = evaluar_vectorizado(f, x)
+            g = fx * jacobiano
+            for j in range(d):
+                d_grilla[j] += np.bincount(idx[:, j], weights=g ** 2, minlength=bins_vegas)
+            suma += g.sum()
+            suma2 += (g ** 2).sum()
+            if it >= descartar:
+                acc.agregar(g, x)
+                s1 += g.sum()
+                s2 += (fx ** 2 * jacobiano).sum()
+                n_simple += m
+
+        if it >= descartar:
+            media_it = suma / n_it
+            varianza_it = max(suma2 / n_it - media_it ** 2, 0.0) * n_it / (n_it - 1)
+            # Un error nulo (f constante en la grilla) haría infinito el peso
+            error_it = max(np.sqrt(varianza_it / n_it), 1e-150)
+            acc.estimaciones.append((media_it, error_it, n_it))
+        bordes = _refinar_grilla(bordes, d_grilla, alpha)
+
+    acc.combinar_estimaciones()
+    acc.evaluaciones = int(N)
+    media_simple = s1 / n_simple
+    acc.varianza_simple = max(s2 / n_simple - media_simple ** 2, 0.0) * n_simple / max(n_simple - 1, 1)
+    return acc
+
+
+# ========================= MISER ========================= #
+#
+# Fase 1 (recursiva, con una pila): en cada región con n >= min_biseccion se toma una
+# muestra piloto, se prueba un corte cerca del punto medio de cada eje y se elige el eje
+# que minimiza V_izq σ_izq + V_der σ_der; las n restantes se reparten en proporción a
+# V σ de cada mitad (asignación óptima de Neyman). Las regiones más chicas son hojas.
+# Fase 2: todas las hojas se muestrean juntas, en bloques vectorizados.
+
+def _dividir_miser(f, limites, n, rng, fraccion_piloto, min_puntos, dither):
+    """Biseca una región: devuelve ((limites_izq, n_izq), (limites_der, n_der))"""
+    d = limites.shape[0]
+    lo, ancho = limites[:, 0], limites[:, 1] - limites[:, 0]
+    n_piloto = max(int(n * fraccion_piloto), min_puntos)
+    x = lo + rng.random((n_piloto, d)) * ancho
+    fx = evaluar_vectorizado(f, x)
+
+    # Corte cerca del punto medio; el desplazamiento aleatorio evita simetrías del integrando
+    fraccion = 0.5 + rng.uniform(-dither, dither, d)
+    izquierda = x < lo + fraccion * ancho
+    cuenta_izq = izquierda.sum(axis=0)
+    cuenta_der = n_piloto - cuenta_izq
+    suma_izq, suma2_izq = fx @ izquierda, (fx ** 2) @ izquierda
+    suma_der, suma2_der = fx.sum() - suma_izq, (fx ** 2).sum() - suma2_izq
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_izq = np.sqrt(np.maximum(suma2_izq / cuenta_izq - (suma_izq / cuenta_izq) ** 2, 0.0))
+        sigma_der = np.sqrt(np.maximum(suma2_der / cuenta_der - (suma_der / cuenta_der) ** 2, 0.0))
+    validos = (cuenta_izq >= 2) & (cuenta_der >= 2)
+    puntaje = np.where(validos, fraccion * sigma_izq + (1 - fraccion) * sigma_der, np.inf)
+    j = int(np.argmin(puntaje)) if validos.any() else int(np.argmax(ancho))
+
+    # Asignación de Neyman: n ∝ V σ (por volumen si ambas mitades son constantes)
+    peso_izq = fraccion[j] * sigma_izq[j] if validos[j] else 0.0
+    peso_der = (1 - fraccion[j]) * sigma_der[j] if validos[j] else 0.0
+    if not peso_izq + peso_der > 0:
+        peso_izq, peso_der = fraccion[j], 1 - fraccion[j]
+    n_resto = n - n_piloto
+    n_izq = min_puntos + int((n_resto - 2 * min_puntos) * peso_izq / (peso_izq + peso_der))
+
+    corte = lo[j] + fraccion[j] * ancho[j]
+    lim_izq, lim_der = limites.copy(), limites.copy()
+    lim_izq[j, 1] = corte
+    lim_der[j, 0] = corte
+    return (lim_izq, n_izq), (lim_der, n_resto - n_izq)
+
+
+def integrar_miser(f, limites, N, rng, min_biseccion=256, fraccion_piloto=0.1, min_puntos=None, dither=0.05,
+                   tam_bloque=TAM_BLOQUE, tam_reservorio=TAM_RESERVORIO, bins=30, almacen=None):
+    """MISER en la caja `limites` con N evaluaciones de f (incluidas las pilotos).
+
+    `acc.regiones` guarda las hojas (limites, n, media, varianza, fracción de volumen),
+    es decir la asignación de muestras. Devuelve el acumulador (media = integral / volumen).
+    """
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    d = limites.shape[0]
+    min_puntos = max(2, min_biseccion // 8) if min_puntos is None else max(int(min_puntos), 2)
+    min_biseccion = max(int(min_biseccion), 4 * min_puntos)
+    if N < 2 * min_puntos:
+        raise ValueError("N es muy chico para MISER")
+
+    # Fase 1: árbol de bisecciones y asignación de muestras
+    hojas = []
+    pila = [(limites, int(N))]
+    while pila:
+        region, n = pila.pop()
+        if n < min_biseccion:
+            hojas.append((region, n))
+        else:
+            pila.extend(_dividir_miser(f, region, n, rng, fraccion_piloto, min_puntos, dither))
+
+    # Fase 2: muestreo de todas las hojas en bloques
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng, almacen=almacen)
+    acc.tecnica = MISER
+    lim_hojas = np.array([h[0] for h in hojas])
+    n_hojas = np.array([h[1] for h in hojas], dtype=np.int64)
+    lo, ancho = lim_hojas[:, :, 0], lim_hojas[:, :, 1] - lim_hojas[:, :, 0]
+    fraccion = np.prod(ancho, axis=1) / np.prod(limites[:, 1] - limites[:, 0])
+    M = int(n_hojas.sum())
+    escala = fraccion * M / n_hojas
+    suma, suma2 = np.zeros(len(hojas)), np.zeros(len(hojas))
+
+    # Grupos de hojas consecutivas con unas tam_bloque muestras en total
+    fin_grupo = np.searchsorted(np.cumsum(n_hojas), np.arange(tam_bloque, M, tam_bloque), side="left") + 1
+    for grupo in np.split(np.arange(len(hojas)), np.unique(fin_grupo[fin_grupo < len(hojas)])):
+        ids = np.repeat(grupo, n_hojas[grupo])
+        x = lo[ids] + rng.random((ids.size, d)) * ancho[ids]
+        fx = evaluar_vectorizado(f, x)
+        suma += np.bincount(ids, weights=fx, minlength=len(hojas))
+        suma2 += np.bincount(ids, weights=fx ** 2, minlength=len(hojas))
+        acc.agregar(fx * escala[ids], x)
+
+    medias = suma / n_hojas
+    varianzas = np.maximum(suma2 / n_hojas - medias ** 2, 0.0) * n_hojas / (n_hojas - 1)
+    acc.regiones = [(lim_hojas[i], int(n_hojas[i]), float(medias[i]), float(varianzas[i]), float(fraccion[i]))
+                    for i in range(len(hojas))]
+    acc.media = float(np.dot(fraccion, medias))
+    acc.evaluaciones = int(N)
+    media_simple = acc.media
+    media2_simple = float(np.dot(fraccion, suma2 / n_hojas))
+    acc.varianza_simple = max(media2_simple - media_simple ** 2, 0.0) * M / max(M - 1, 1)
+    return acc
+
+
+# ========================= Ejecución en paralelo ========================= #
+
+def crear_generador(semilla, tipo="PCG64"):
+    """Generator de NumPy con el bit generator `tipo` a partir de una semilla o SeedSequence"""
+    if tipo not in GENERADORES:
+        raise ValueError(f"Generador desconocido: {tipo}")
+    return np.random.Generator(getattr(np.random, tipo)(semilla))
+
+
+@lru_cache(maxsize=32)
+def _compilar(expr_str, variables):
+    simbolos = sp.symbols(variables)
+    return sp.lambdify(simbolos, sp.sympify(expr_str), "numpy")
+
+
+def _tarea_integral(args):
+    """Integra un tramo de N con su propio flujo aleatorio (se ejecuta en un proceso hijo)"""
+    expr_str, variables, limites, n, semilla, generador, muestreo, aleatorizacion, tam_reservorio, bins, almacen = args
+    rng = crear_generador(semilla, generador)
+    f = _compilar(expr_str, variables)
+    acc, _ = integrar_mc(f, limites, n, rng, tam_reservorio=tam_reservorio, bins=bins,
+                         muestreo=muestreo, aleatorizacion=aleatorizacion, almacen=almacen)
+    # El almacén ya escribió los bloques; no viaja de vuelta al proceso principal
+    acc.almacen = None
+    if muestreo != PSEUDOALEATORIO:
+        # Cada tarea QMC es una réplica aleatorizada independiente
+        acc.medias_replicas = [acc.media]
+    return acc
+
+
+def integrar_mc_paralelo(expr_str, variables, limites, N, semilla=0, trabajadores=1, generador="PCG64",
+                         tam_tarea=TAM_TAREA, muestreo=PSEUDOALEATORIO, replicas=1, aleatorizacion="Owen",
+                         tam_reservorio=TAM_RESERVORIO, bins=30, almacen=None, control=None):
+    """Método promedio repartido en tareas con flujos SeedSequence.spawn independientes.
+
+    La partición en tareas depende sólo de N (o de las réplicas QMC), nunca del número
+    de trabajadores, y los acumuladores se fusionan en orden de tarea: con la misma
+    semilla maestra el resultado es idéntico para 1 o más procesos.
+    `expr_str` y `variables` (p. ej. "x y") se compilan dentro de cada proceso.
+    Con `almacen`, cada tarea escribe sus bloques con su propio prefijo (almacen.tarea(i)).
+    Con `control` (ver ejecutor_tareas) se informa el avance por tarea; si se cancela,
+    las tareas que no empezaron ya no se ejecutan.
+    """
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    volumen = float(np.prod(limites[:, 1] - limites[:, 0]))
+    if muestreo == PSEUDOALEATORIO:
+        tamaños = list(bloques(N, tam_tarea))
+    else:
+        replicas = max(int(replicas), 1)
+        if replicas > N:
+            raise ValueError("El número de réplicas no puede superar N")
+        tamaños = repartir(N, replicas)
+
+    hijos = np.random.SeedSequence(semilla).spawn(len(tamaños) + 1)
+    tareas = [(expr_str, variables, limites, n, hijos[i], generador, muestreo, aleatorizacion, tam_reservorio, bins,
+               None if almacen is None else almacen.tarea(i))
+              for i, n in enumerate(tamaños)]
+
+    trabajadores = max(1, min(int(trabajadores), len(tareas)))
+    if trabajadores == 1:
+        parciales = _avisar(map(_tarea_integral, tareas), len(tareas), control)
+        return _fusionar_parciales(parciales, hijos[-1], generador, tam_reservorio, bins), volumen
+    # "spawn" evita heredar el estado de Tk del proceso principal
+    ejecutor = ProcessPoolExecutor(trabajadores, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        parciales = _avisar(ejecutor.map(_tarea_integral, tareas), len(tareas), control)
+        return _fusionar_parciales(parciales, hijos[-1], generador, tam_reservorio, bins), volumen
+    finally:
+        # Al cancelar no se espera a las tareas pendientes: se descartan
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+def _avisar(parciales, total, control):
+    for i, parcial in enumerate(parciales, 1):
+        if control is not None:
+            control.progreso(i / total, f"{i} de {total} tareas")
+        yield parcial
+
+
+def _fusionar_parciales(parciales, semilla, generador, tam_reservorio, bins):
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=crear_generador(semilla, generador))
+    for parcial in parciales:
+        acc.fusionar(parcial)
+    if len(acc.medias_replicas) < 2:
+        acc.medias_replicas = []
+    acc.varianza_simple = acc.varianza
+    return acc
+
+
+# ========================= N adaptativo ========================= #
+
+def _semiancho_wilson(p, n, confianza):
+    """Semiancho del intervalo de Wilson de una proporción p observada en n ensayos"""
+    z = stats.norm.ppf(0.5 + confianza / 2)
+    return z / (1 + z ** 2 / n) * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2))
+
+
+def muestreo_adaptativo(paso, escala, semiancho_objetivo, relativo=False, confianza=0.95, N_max=10**8,
+                        tiempo_max=None, lote_inicial=1000, proporcion=False):
+    """Llama a paso(m) con lotes crecientes hasta que el IC t alcanza el semiancho objetivo.
+
+    paso(m) muestrea m puntos y devuelve el AcumuladorMC que controla la parada; la
+    estimación es escala * acumulador.media. Si `relativo`, el objetivo es una fracción
+    de |estimación|. Con `proporcion` (hit-or-miss) se usa el intervalo de Wilson, que no
+    se anula aunque todavía no haya éxitos. El objetivo nunca se da por alcanzado con
+    n < 2, semiancho nulo (varianza 0) o, en modo relativo, estimación nula: se sigue
+    muestreando hasta agotar el presupuesto. Devuelve un resumen con el N usado, el
+    tiempo y el motivo de parada.
+    """
+    if semiancho_objetivo <= 0:
+        raise ValueError("El semiancho objetivo debe ser positivo")
+    if not 0 < confianza < 1:
+        raise ValueError("La confianza debe estar entre 0 y 1")
+    inicio = time.perf_counter()
+    n = 0
+    min_lote = max(int(lote_inicial), 2)
+    lote = min_lote
+    while True:
+        acc = paso(min(lote, N_max - n))
+        n = acc.n
+        if proporcion:
+            semiancho = float(_semiancho_wilson(acc.media, n, confianza) * abs(escala)) if n > 0 else np.inf
+        else:
+            t_val = stats.t.ppf(0.5 + confianza / 2, acc.grados_libertad)
+            semiancho = float(t_val * acc.error_estandar * abs(escala))
+        objetivo = float(semiancho_objetivo * abs(acc.media * escala) if relativo else semiancho_objetivo)
+        transcurrido = time.perf_counter() - inicio
+        # Sin dispersión observada (o con estimación nula en modo relativo) el IC no informa nada
+        alcanzado = n >= 2 and 0 < semiancho <= objetivo
+
+        if alcanzado:
+            motivo = "Objetivo alcanzado"
+        elif n >= N_max:
+            motivo = "Presupuesto de muestras agotado"
+        elif tiempo_max is not None and transcurrido >= tiempo_max:
+            motivo = "Presupuesto de tiempo agotado"
+        else:
+            # El semiancho cae como 1/sqrt(n): estimar las muestras faltantes, a lo sumo duplicando n
+            necesarias = n * (semiancho / objetivo) ** 2 if semiancho > 0 and objetivo > 0 else 2 * n
+            lote = int(np.clip(1.1 * necesarias - n, min_lote, max(n, min_lote)))
+            continue
+        return {'N_usado': n, 'tiempo': transcurrido, 'semiancho': semiancho, 'objetivo': objetivo,
+                'confianza': confianza, 'alcanzado': alcanzado, 'motivo': motivo}
+
+
+def integrar_adaptativo(f, limites, semiancho_objetivo, relativo=False, confianza=0.95, N_max=10**8,
+                        tiempo_max=None, rng=None, lote_inicial=1000, tam_reservorio=TAM_RESERVORIO, bins=30,
+                        almacen=None):
+    """Método promedio con N adaptativo: devuelve (acumulador, volumen, resumen)"""
+    rng = rng if rng is not None else np.random.default_rng()
+    limites = np.asarray(limites, dtype=float).reshape(-1, 2)
+    inferiores, superiores = limites[:, 0], limites[:, 1]
+    volumen = float(np.prod(superiores - inferiores))
+    acc = AcumuladorMC(bins=bins, tam_reservorio=tam_reservorio, rng=rng, almacen=almacen)
+
+    def paso(m):
+        for m_bloque in bloques(m):
+            puntos = rng.uniform(inferiores, superiores, size=(m_bloque, limites.shape[0]))
+            acc.agregar(evaluar_vectorizado(f, puntos), puntos)
+        return acc
+
+    resumen = muestreo_adaptativo(paso, volumen, semiancho_objetivo, relativo, confianza, N_max,
+                                  tiempo_max, lote_inicial)
+    acc.evaluaciones = acc.n
+    acc.varianza_simple = acc.varianza
+    return acc, volumen, resumen
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Estadísticas acumuladas (por prefijo) en una pasada vectorizada O(N).
+
+- Media y varianza de todos los prefijos x[:k] con sumas acumuladas desplazadas
+  (restar un valor de referencia evita la cancelación de sum(x²) - sum(x)²/k).
+- Fusión con un estado previo (n, media, M2) para calcularlas bloque a bloque.
+- Puntos de control espaciados logarítmicamente: una curva de convergencia con
+  N = 1e8 guarda sólo unos miles de puntos.
+- Intervalos que no suponen normalidad ni independencia: bootstrap percentil/BCa
+  vectorizado (sobre una submuestra reescalada cuando N es grande) y error de
+  medias por lotes para muestras correlacionadas.
+"""
+
+import numpy as np
+from scipy import stats
+
+PUNTOS_POR_DECADA = 250
+
+
+def posiciones_log(desde, hasta, puntos_por_decada=PUNTOS_POR_DECADA):
+    """Posiciones enteras k con desde < k <= hasta sobre la grilla 10^(j/puntos_por_decada).
+
+    La grilla es fija: bloques consecutivos producen los mismos puntos que una sola pasada.
+    """
+    if hasta <= desde:
+        return np.empty(0, dtype=np.int64)
+    j_min = int(np.floor(np.log10(max(desde, 1)) * puntos_por_decada)) - 1
+    j_max = int(np.ceil(np.log10(hasta) * puntos_por_decada)) + 1
+    grilla = np.unique(np.round(10.0 ** (np.arange(max(j_min, 0), j_max + 1) / puntos_por_decada)).astype(np.int64))
+    return grilla[(grilla > desde) & (grilla <= hasta)]
+
+
+def estadisticas_prefijo(valores, posiciones=None, n0=0, media0=0.0, m2_0=0.0):
+    """Devuelve (n, media, M2) de los prefijos de `valores` en cada posición (1..len).
+
+    Si se da un estado previo (n0, media0, m2_0), los prefijos se fusionan con él
+    (fórmula de Chan), de modo que n = n0 + k. Sin `posiciones` se usan todos los prefijos.
+    """
+    valores = np.asarray(valores, dtype=float).ravel()
+    m = valores.size
+    k = np.arange(1, m + 1) if posiciones is None else np.asarray(posiciones, dtype=np.int64)
+    if k.size == 0 or m == 0:
+        vacio = np.empty(0)
+        return np.empty(0, dtype=np.int64), vacio, vacio
+
+    # Sólo hace falta acumular hasta la última posición pedida
+    prefijo = valores[:int(k.max())]
+    referencia = prefijo.mean()
+    desplazados = prefijo - referencia
+    s1 = np.cumsum(desplazados)[k - 1]
+    s2 = np.cumsum(desplazados ** 2)[k - 1]
+    media_k = referencia + s1 / k
+    m2_k = np.maximum(s2 - s1 ** 2 / k, 0.0)
+
+    if n0 == 0:
+        return k, media_k, m2_k
+    n = n0 + k
+    delta = media_k - media0
+    media = media0 + delta * k / n
+    m2 = m2_0 + m2_k + delta ** 2 * n0 * k / n
+    return n, media, m2
+
+
+def estadisticas_acumuladas(valores, posiciones=None):
+    """Media y varianza muestral (ddof=1) de los prefijos: (n, media, varianza)"""
+    n, media, m2 = estadisticas_prefijo(valores, posiciones)
+    varianza = np.where(n > 1, m2 / np.maximum(n - 1, 1), 0.0)
+    return n, media, varianza
+
+
+def bandas_confianza(n, media, varianza, confianza=0.95):
+    """Intervalo t de la media para cada prefijo: (inferior, superior)"""
+    n = np.asarray(n)
+    t_val = stats.t.ppf(0.5 + confianza / 2, np.maximum(n - 1, 1))
+    semiancho = np.where(n > 1, t_val * np.sqrt(varianza / np.maximum(n, 1)), 0.0)
+    return media - semiancho, media + semiancho
+
+
+# ========================= Bootstrap y medias por lotes ========================= #
+
+REPLICAS_BOOTSTRAP = 2000
+MAX_MUESTRA_BOOTSTRAP = 5000
+ELEMENTOS_POR_TROZO = 2_000_000
+METODOS_BOOTSTRAP = ("percentil", "BCa")
+
+
+def medias_bootstrap(valores, replicas=REPLICAS_BOOTSTRAP, rng=None, elementos_por_trozo=ELEMENTOS_POR_TROZO):
+    """Medias de `replicas` remuestras con reemplazo de `valores`.
+
+    Los índices se sortean por trozos de a lo sumo `elementos_por_trozo` elementos:
+    no hay un bucle de Python por réplica y la memoria queda acotada.
+    """
+    valores = np.asarray(valores, dtype=float).ravel()
+    rng = rng if rng is not None else np.random.default_rng(0)
+    m = valores.size
+    por_trozo = max(1, elementos_por_trozo // max(m, 1))
+    medias = np.empty(replicas)
+    for inicio in range(0, replicas, por_trozo):
+        fin = min(inicio + por_trozo, replicas)
+        medias[inicio:fin] = valores[rng.integers(0, m, size=(fin - inicio, m))].mean(axis=1)
+    return medias
+
+
+def _aceleracion_jackknife(valores):
+    """Aceleración del BCa para la media, con las m medias jackknife en forma cerrada"""
+    m = valores.size
+    jack = (valores.sum() - valores) / (m - 1)
+    d = jack.mean() - jack
+    denominador = 6.0 * np.sum(d ** 2) ** 1.5
+    return float(np.sum(d ** 3) / denominador) if denominador > 0 else 0.0
+
+
+def intervalo_bootstrap(valores, confianza=0.95, metodo="BCa", n_total=None, centro=None, desviacion_total=None,
+                        replicas=REPLICAS_BOOTSTRAP, max_muestra=MAX_MUESTRA_BOOTSTRAP, rng=None):
+    """Intervalo bootstrap (percentil o BCa) de la media: (inferior, superior, error).
+
+    Si `valores` es una submuestra uniforme de n_total > m valores (o se submuestrea
+    por superar `max_muestra`), las desviaciones de las réplicas respecto de la media
+    de la submuestra se reescalan por sqrt(m / n_total) y se centran en `centro` (la
+    media de todas las muestras). Con `desviacion_total` (la de las N muestras) el
+    reescalado corrige además la dispersión de la submuestra, que con colas pesadas
+    puede diferir mucho; la submuestra aporta sólo la forma. El sesgo z0 y la
+    aceleración del BCa decrecen como 1/sqrt(n) y se reescalan por sqrt(m / n_total).
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    valores = np.asarray(valores, dtype=float).ravel()
+    if valores.size > max_muestra:
+        valores = valores[rng.choice(valores.size, max_muestra, replace=False)]
+    m = valores.size
+    if m < 2:
+        c = float(valores.mean()) if m else np.nan
+        return c, c, 0.0
+    n_total = max(n_total or m, m)
+    media_m = float(valores.mean())
+    centro = media_m if centro is None else centro
+    forma = np.sqrt(m / n_total)
+    escala = forma
+    desviacion_m = valores.std(ddof=1)
+    if desviacion_total is not None and desviacion_m > 0:
+        escala *= desviacion_total / desviacion_m
+
+    medias = medias_bootstrap(valores, replicas, rng)
+    replicas_escaladas = centro + (medias - media_m) * escala
+    alfa = (1 - confianza) / 2
+    cuantiles = np.array([alfa, 1 - alfa])
+    if metodo == "BCa":
+        fraccion = np.mean(medias < media_m) + 0.5 * np.mean(medias == media_m)
+        z0 = stats.norm.ppf(np.clip(fraccion, 1.0 / replicas, 1 - 1.0 / replicas)) * forma
+        a = _aceleracion_jackknife(valores) * forma
+        z = stats.norm.ppf(cuantiles)
+        cuantiles = stats.norm.cdf(z0 + (z0 + z) / (1 - a * (z0 + z)))
+    inferior, superior = np.quantile(replicas_escaladas, cuantiles)
+    return float(inferior), float(superior), float(np.std(replicas_escaladas, ddof=1))
+
+
+def intervalo_lotes(medias_lote, centro=None, confianza=0.95):
+    """Intervalo t con el error de medias por lotes: (inferior, superior, error, lotes).
+
+    Con lotes suficientemente largos sus medias son casi independientes aunque las
+    muestras estén correlacionadas (cadenas MCMC, secuencias QMC).
+    """
+    medias_lote = np.asarray(medias_lote, dtype=float)
+    k = medias_lote.size
+    if k < 2:
+        return np.nan, np.nan, np.nan, k
+    centro = float(medias_lote.mean()) if centro is None else centro
+    error = float(np.std(medias_lote, ddof=1) / np.sqrt(k))
+    semiancho = stats.t.ppf(0.5 + confianza / 2, k - 1) * error
+    return centro - semiancho, centro + semiancho, error, k
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Reducción de puntos para dibujar: el costo de un gráfico no depende de N.
+
+- Dispersión: muestra visual acotada y estratificada sobre una grilla de celdas
+  (reparto por turnos), así las regiones poco pobladas siguen viéndose.
+- Líneas: decimación LTTB (Largest-Triangle-Three-Buckets), que conserva la forma,
+  o mín/máx por cubeta, que conserva los picos.
+Las estadísticas se calculan siempre con todas las muestras; esto sólo afecta al dibujo.
+"""
+
+import numpy as np
+
+MAX_PUNTOS_DISPERSION = 2000
+MAX_PUNTOS_LINEA = 1000
+
+
+def muestra_visual(puntos, max_puntos=MAX_PUNTOS_DISPERSION, rng=None, celdas=400):
+    """Índices de a lo sumo `max_puntos` puntos (m, d), estratificados en una grilla.
+
+    Se usan hasta 3 coordenadas con unas `celdas` celdas en total; cada celda aporta
+    un punto por turno hasta completar el cupo.
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    m = puntos.shape[0]
+    if m <= max_puntos:
+        return np.arange(m)
+    rng = rng if rng is not None else np.random.default_rng(0)
+    coords = puntos.reshape(m, -1)[:, :3]
+    k = coords.shape[1]
+    por_eje = max(1, int(round(celdas ** (1.0 / k))))
+
+    lo, hi = np.nanmin(coords, axis=0), np.nanmax(coords, axis=0)
+    escala = np.where(hi > lo, hi - lo, 1.0)
+    idx_eje = np.clip(((coords - lo) / escala * por_eje).astype(np.int64), 0, por_eje - 1)
+    celda = np.ravel_multi_index(idx_eje.T, (por_eje,) * k)
+
+    # Orden aleatorio dentro de cada celda y turno = posición del punto en su celda
+    orden = np.lexsort((rng.random(m), celda))
+    celda_ord = celda[orden]
+    inicio = np.r_[0, np.flatnonzero(np.diff(celda_ord)) + 1]
+    turno = np.arange(m) - np.repeat(inicio, np.diff(np.r_[inicio, m]))
+    elegidos = orden[np.lexsort((rng.random(m), turno))[:max_puntos]]
+    return np.sort(elegidos)
+
+
+def lttb(x, y, n_salida=MAX_PUNTOS_LINEA):
+    """Índices elegidos por Largest-Triangle-Three-Buckets (incluye el primero y el último)"""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    m = x.size
+    if n_salida >= m or n_salida < 3:
+        return np.arange(m)
+    bordes = np.linspace(1, m - 1, n_salida - 1).astype(np.int64)
+    elegidos = np.empty(n_salida, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, m - 1
+    a = 0
+    for i in range(n_salida - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        # Promedio de la cubeta siguiente (o el último punto)
+        sig_ini, sig_fin = fin, (bordes[i + 2] if i + 2 < len(bordes) else m)
+        cx, cy = x[sig_ini:sig_fin].mean(), y[sig_ini:sig_fin].mean()
+        area = np.abs((x[a] - cx) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (cy - y[a]))
+        a = ini + int(np.argmax(area))
+        elegidos[i + 1] = a
+    return elegidos
+
+
+def minmax(y, n_cubetas=MAX_PUNTOS_LINEA // 2):
+    """Índices del mínimo y el máximo de cada cubeta (más el primero y el último), ordenados"""
+    y = np.asarray(y, dtype=float)
+    m = y.size
+    if 2 * n_cubetas + 2 >= m:
+        return np.arange(m)
+    bordes = np.linspace(0, m, n_cubetas + 1).astype(np.int64)
+    tam = int(np.max(np.diff(bordes)))
+    # Cubetas de igual tamaño: se rellena repitiendo el último índice de cada una
+    posiciones = np.minimum(bordes[:-1, None] + np.arange(tam), bordes[1:, None] - 1)
+    valores = y[posiciones]
+    filas = np.arange(n_cubetas)
+    indices = np.concatenate(([0, m - 1], posiciones[filas, np.argmin(valores, axis=1)],
+                              posiciones[filas, np.argmax(valores, axis=1)]))
+    return np.unique(indices)
+
+
+def decimar_linea(x, y, max_puntos=MAX_PUNTOS_LINEA, metodo="lttb"):
+    """Índices para dibujar la curva (x, y) con a lo sumo ~max_puntos puntos.
+
+    Los mismos índices sirven para series asociadas (bandas de confianza, etc.).
+    """
+    if metodo == "minmax":
+        return minmax(y, max_puntos // 2)
+    return lttb(x, y, max_puntos)
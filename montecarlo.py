@@ -1,13 +1,46 @@
 # -*- coding: utf-8 -*-
+import os
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import numpy as np
 import sympy as sp
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
 from numpy.polynomial.legendre import leggauss
 from scipy import stats
 from mpl_toolkits.mplot3d import Axes3D  # necesario para gráficos 3D (incluso si no se usa explícitamente)
+from mc_engine import (ALEATORIZACIONES, GENERADORES, METODOS_MUESTREO, PSEUDOALEATORIO, SIN_REDUCCION,
+                       TECNICAS_REDUCCION, AcumuladorMC, crear_generador, evaluar_vectorizado, integrar_adaptativo,
+                       integrar_mc, integrar_mc_paralelo, muestras_uniformes, muestreo_adaptativo)
+from ejecutor_tareas import BarraProgreso, EjecutorTareas
+from grafico_incremental import GraficoIncremental
+from mc_almacen import AlmacenMuestras, estado_estimador
+from mc_dominio import DominioMC, integrar_dominio, separar_nivel_superior
+from mc_estadistica import bandas_confianza, intervalo_bootstrap, intervalo_lotes
+from mc_graficos import decimar_linea, muestra_visual
+from tabla_virtual import TablaVirtual
+
+INTERVALOS = ("t (normal)", "Bootstrap percentil", "Bootstrap BCa", "Medias por lotes")
+
+
+def _con_control(f, control, total):
+    """f que, antes de evaluar cada bloque, informa el avance y verifica la cancelación"""
+    if control is None:
+        return f
+    evaluados = 0
+
+    def g(*xs):
+        nonlocal evaluados
+        control.progreso(min(evaluados / total, 1.0), f"{evaluados:,} evaluaciones de f")
+        valores = f(*xs)
+        evaluados += np.size(xs[0]) if xs else 1
+        return valores
+    return g
+
 
 class MonteCarloSimulator:
     def __init__(self, root):
@@ -53,22 +86,96 @@ class MonteCarloSimulator:
         ttk.Button(frame_inputs, text="Análisis Estadístico", command=self.ventana_estadistica).grid(row=0, column=14, padx=5)
         ttk.Button(frame_inputs, text="Integrales Dobles", command=self.ventana_integrales_dobles).grid(row=0, column=15, padx=5)
         ttk.Button(frame_inputs, text="Integrales Triples", command=self.ventana_integrales_triples).grid(row=0, column=16, padx=5)
-        ttk.Button(frame_inputs, text="Ayuda", command=self.mostrar_ayuda).grid(row=0, column=17, padx=5)
+        ttk.Button(frame_inputs, text="Integral N-D", command=self.ventana_integral_nd).grid(row=0, column=17, padx=5)
+        ttk.Button(frame_inputs, text="Ayuda", command=self.mostrar_ayuda).grid(row=0, column=18, padx=5)
+
+        # Muestreo pseudoaleatorio o cuasi-Monte Carlo
+        self.opciones_muestreo = self._selector_muestreo(frame_inputs, row=1, column=0)
+
+        # Reducción de varianza para el método promedio e integrales múltiples
+        ttk.Label(frame_inputs, text="Reducción de varianza:").grid(row=2, column=0)
+        self.tecnica_var = tk.StringVar(value=SIN_REDUCCION)
+        ttk.Combobox(frame_inputs, textvariable=self.tecnica_var, values=TECNICAS_REDUCCION, width=18,
+                     state="readonly").grid(row=2, column=1)
+        ttk.Label(frame_inputs, text="Estratos:").grid(row=2, column=2)
+        self.entry_estratos = ttk.Entry(frame_inputs, width=5)
+        self.entry_estratos.insert(0, "64")
+        self.entry_estratos.grid(row=2, column=3)
+        ttk.Label(frame_inputs, text="Grado control:").grid(row=2, column=4)
+        self.entry_grado_control = ttk.Entry(frame_inputs, width=5)
+        self.entry_grado_control.insert(0, "2")
+        self.entry_grado_control.grid(row=2, column=5)
+        ttk.Label(frame_inputs, text="Densidad p(x) (vacía = ajustada):").grid(row=2, column=6, columnspan=3)
+        self.entry_densidad = ttk.Entry(frame_inputs, width=20)
+        self.entry_densidad.grid(row=2, column=9, columnspan=3)
+        ttk.Label(frame_inputs, text="Iter. VEGAS:").grid(row=2, column=12)
+        self.entry_iter_vegas = ttk.Entry(frame_inputs, width=5)
+        self.entry_iter_vegas.insert(0, "10")
+        self.entry_iter_vegas.grid(row=2, column=13)
+        ttk.Label(frame_inputs, text="Bins VEGAS:").grid(row=2, column=14)
+        self.entry_bins_vegas = ttk.Entry(frame_inputs, width=5)
+        self.entry_bins_vegas.insert(0, "50")
+        self.entry_bins_vegas.grid(row=2, column=15)
+        ttk.Label(frame_inputs, text="Mín. bisección MISER:").grid(row=2, column=16)
+        self.entry_min_biseccion = ttk.Entry(frame_inputs, width=6)
+        self.entry_min_biseccion.insert(0, "256")
+        self.entry_min_biseccion.grid(row=2, column=17)
+
+        # Semilla maestra, procesos y generador (flujos independientes con SeedSequence)
+        ttk.Label(frame_inputs, text="Semilla:").grid(row=3, column=0)
+        self.entry_semilla = ttk.Entry(frame_inputs, width=8)
+        self.entry_semilla.insert(0, "0")
+        self.entry_semilla.grid(row=3, column=1)
+        ttk.Label(frame_inputs, text="Procesos:").grid(row=3, column=2)
+        self.entry_procesos = ttk.Entry(frame_inputs, width=5)
+        self.entry_procesos.insert(0, "1")
+        self.entry_procesos.grid(row=3, column=3)
+        ttk.Label(frame_inputs, text="Generador:").grid(row=3, column=4)
+        self.generador_var = tk.StringVar(value=GENERADORES[0])
+        ttk.Combobox(frame_inputs, textvariable=self.generador_var, values=GENERADORES, width=8,
+                     state="readonly").grid(row=3, column=5)
+
+        # N adaptativo: muestrear hasta alcanzar el semiancho objetivo del IC
+        self.adaptativo_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame_inputs, text="N adaptativo", variable=self.adaptativo_var).grid(row=4, column=0)
+        ttk.Label(frame_inputs, text="Semiancho IC:").grid(row=4, column=1)
+        self.entry_semiancho = ttk.Entry(frame_inputs, width=8)
+        self.entry_semiancho.insert(0, "0.001")
+        self.entry_semiancho.grid(row=4, column=2)
+        self.tipo_semiancho_var = tk.StringVar(value="Absoluto")
+        ttk.Combobox(frame_inputs, textvariable=self.tipo_semiancho_var, values=["Absoluto", "Relativo"], width=9,
+                     state="readonly").grid(row=4, column=3)
+        ttk.Label(frame_inputs, text="Confianza %:").grid(row=4, column=4)
+        self.entry_confianza = ttk.Entry(frame_inputs, width=5)
+        self.entry_confianza.insert(0, "95")
+        self.entry_confianza.grid(row=4, column=5)
+        ttk.Label(frame_inputs, text="N máx:").grid(row=4, column=6)
+        self.entry_N_max = ttk.Entry(frame_inputs, width=10)
+        self.entry_N_max.insert(0, "10000000")
+        self.entry_N_max.grid(row=4, column=7, columnspan=2)
+        ttk.Label(frame_inputs, text="Tiempo máx (s):").grid(row=4, column=9)
+        self.entry_tiempo_max = ttk.Entry(frame_inputs, width=5)
+        self.entry_tiempo_max.insert(0, "30")
+        self.entry_tiempo_max.grid(row=4, column=10)
+
+        # Almacén en disco: las muestras de las integrales múltiples se guardan por bloques
+        self.guardar_muestras_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame_inputs, text="Guardar muestras en disco",
+                        variable=self.guardar_muestras_var).grid(row=5, column=0, columnspan=2)
+        ttk.Label(frame_inputs, text="Carpeta:").grid(row=5, column=2)
+        self.entry_almacen = ttk.Entry(frame_inputs, width=25)
+        self.entry_almacen.insert(0, "muestras_mc")
+        self.entry_almacen.grid(row=5, column=3, columnspan=4)
+        ttk.Button(frame_inputs, text="Abrir corrida guardada",
+                   command=self.abrir_corrida_guardada).grid(row=5, column=7, columnspan=2, padx=5)
 
         # -------------------- Tabla --------------------
         frame_table = ttk.LabelFrame(root, text="Muestras Monte Carlo")
         frame_table.pack(side="left", fill="y", padx=5, pady=5)
 
         cols = ("x", "y", "f(x)", "Éxito")
-        self.tree = ttk.Treeview(frame_table, columns=cols, show="headings", height=30)
-        for c in cols:
-            self.tree.heading(c, text=c)
-            self.tree.column(c, width=80, anchor="center")
-        self.tree.pack(side="left", fill="y")
-
-        scroll = ttk.Scrollbar(frame_table, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scroll.set)
-        scroll.pack(side="right", fill="y")
+        self.tabla = TablaVirtual(frame_table, cols, alto=30, ancho_columna=80)
+        self.tabla.pack(side="left", fill="y")
 
         # -------------------- Gráfico --------------------
         frame_plot = ttk.LabelFrame(root, text="Gráfico")
@@ -77,18 +184,30 @@ class MonteCarloSimulator:
         self.fig, self.ax = plt.subplots(figsize=(7, 5))
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame_plot)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        # Ejes fijos; curva, área, puntos y título se actualizan en cada simulación
+        self.ax.axhline(0, color="black", linewidth=0.8)
+        self.ax.set_xlabel("x")
+        self.ax.set_ylabel("y=f(x)")
+        self.ax.grid(True)
+        self.grafico = GraficoIncremental(self.ax, self.canvas)
 
         # -------------------- Resultados --------------------
         self.label_result = ttk.Label(root, text="Resultados: ")
         self.label_result.pack(fill="x", padx=5, pady=5)
 
+        # Cálculo en segundo plano con progreso y cancelación
+        self.ejecutor = EjecutorTareas(root)
+        self.barra_progreso = BarraProgreso(root, self.ejecutor, ["simular", "promedio"])
+        self.barra_progreso.pack(fill="x", padx=5, pady=2)
+
         # datos para ventanas dependientes
-        self.fxs_samples = None
+        self.mc_stats = None
         self.volume = None
         self.convergencia_data = None
         # datos para integrales múltiples
         self.double_integral_data = None
         self.triple_integral_data = None
+        self.nd_integral_data = None
 
     # -------------------- Simulación MC hit-or-miss --------------------
     def simular(self):
@@ -101,65 +220,117 @@ class MonteCarloSimulator:
             x = sp.Symbol('x')
             f_expr = sp.sympify(func_str)
             f = sp.lambdify(x, f_expr, "numpy")
-
-            xs_dense = np.linspace(a, b, 1000)
-            ys_dense = np.nan_to_num(f(xs_dense))
-            y_min, y_max = min(0, np.min(ys_dense)), max(0, np.max(ys_dense))
-
-            np.random.seed(0)
-            xs = np.random.uniform(a, b, N)
-            ys = np.random.uniform(y_min, y_max, N)
-            fx_vals_samples = np.nan_to_num(f(xs))
-            success_mask = ((ys >= 0) & (ys <= fx_vals_samples)) | ((ys <= 0) & (ys >= fx_vals_samples))
-            count = np.sum(success_mask)
-
-            rect_area = (b - a) * (y_max - y_min)
-            mc_estimate = count / N * rect_area
-            mc_prom = (b - a) * np.mean(fx_vals_samples)
-
-            nodes, weights = leggauss(n_gauss)
-            trans_nodes = 0.5*(nodes+1)*(b-a)+a
-            gauss_val = 0.5*(b-a)*np.sum(weights * f(trans_nodes))
-
-            self.fxs_samples = fx_vals_samples
-            self.volume = b - a  # Guardar volumen para análisis estadístico
-            self.convergencia_data = (xs, self.fxs_samples, b - a, gauss_val)
-
-            # Tabla
-            for i in self.tree.get_children():
-                self.tree.delete(i)
-            for i in range(min(N, 5000)):
-                self.tree.insert("", "end",
-                                 values=(f"{xs[i]:.6f}", f"{ys[i]:.6f}", f"{fx_vals_samples[i]:.6f}",
-                                         "✔" if success_mask[i] else "✘"))
-
-            # Gráfico
-            self.ax.clear()
-            self.ax.fill_between(xs_dense, 0, ys_dense, color='lightblue', alpha=0.3, label='Área bajo la curva')
-            self.ax.plot(xs_dense, ys_dense, label=f"f(x)={func_str}", color="blue", linewidth=2)
-            self.ax.scatter(xs[~success_mask], ys[~success_mask], s=20, alpha=0.6, color="red", label="Fallidos")
-            self.ax.scatter(xs[success_mask], ys[success_mask], s=20, alpha=0.6, color="green", label="Éxitos")
-            self.ax.axhline(0, color="black", linewidth=0.8)
-            self.ax.set_xlabel("x")
-            self.ax.set_ylabel("y=f(x)")
-            self.ax.set_title(f"MC: {mc_estimate:.6f} | MC promedio: {mc_prom:.6f} | Gauss: {gauss_val:.6f}")
-            self.ax.legend()
-            self.ax.grid(True)
-            self.ax.set_xlim(a, b)
-            self.ax.set_ylim(y_min - 0.1*abs(y_min), y_max + 0.1*abs(y_max))
-            self.canvas.draw()
-
+            semilla, generador = int(self.entry_semilla.get()), self.generador_var.get()
+            opciones_muestreo = self.opciones_muestreo()
+            opciones_adaptativo = self.opciones_adaptativo()
+            if opciones_adaptativo is not None and opciones_muestreo['muestreo'] != PSEUDOALEATORIO:
+                raise ValueError("El N adaptativo usa muestreo pseudoaleatorio")
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        # El muestreo corre en segundo plano; lanzar otra simulación descarta la anterior
+        self.ejecutor.lanzar("simular", self._calcular_simulacion, f, a, b, N, n_gauss, semilla, generador,
+                             opciones_muestreo, opciones_adaptativo,
+                             al_terminar=lambda res: self._mostrar_simulacion(res, func_str, a, b),
+                             barra=self.barra_progreso)
+
+    def _calcular_simulacion(self, f, a, b, N, n_gauss, semilla, generador, opciones_muestreo, opciones_adaptativo,
+                             control=None):
+        """Muestreo hit-or-miss (sin tocar Tk): devuelve los datos para la tabla y el gráfico"""
+        xs_dense = np.linspace(a, b, 1000)
+        ys_dense = np.nan_to_num(f(xs_dense))
+        y_min, y_max = min(0, np.min(ys_dense)), max(0, np.max(ys_dense))
+
+        # Muestreo en bloques: sólo se guardan estadísticos y un reservorio acotado
+        rng = crear_generador(semilla, generador)
+        acc_fx = AcumuladorMC(rng=rng)
+        acc_exito = AcumuladorMC(bins=2, tam_reservorio=0, rng=rng)
+        sumas_fx, sumas_exito, conteos = {}, {}, {}
+        caja = [(a, b), (y_min, y_max)]
+        rect_area = (b - a) * (y_max - y_min)
+        N_total = N if opciones_adaptativo is None else opciones_adaptativo['N_max']
+
+        def procesar(r, puntos):
+            xs, ys = puntos[:, 0], puntos[:, 1]
+            fx_vals_samples = evaluar_vectorizado(f, xs[:, None])
+            success_mask = ((ys >= 0) & (ys <= fx_vals_samples)) | ((ys <= 0) & (ys >= fx_vals_samples))
+            acc_fx.agregar(fx_vals_samples, puntos)
+            acc_exito.agregar(success_mask)
+            sumas_fx[r] = sumas_fx.get(r, 0.0) + fx_vals_samples.sum()
+            sumas_exito[r] = sumas_exito.get(r, 0) + success_mask.sum()
+            conteos[r] = conteos.get(r, 0) + len(xs)
+            if control is not None:
+                control.progreso(acc_exito.n / N_total, f"{acc_exito.n:,} muestras")
+
+        resumen = None
+        if opciones_adaptativo is None:
+            for r, puntos in muestras_uniformes(caja, N, rng, **opciones_muestreo):
+                procesar(r, puntos)
+        else:
+            def paso(m):
+                for r, puntos in muestras_uniformes(caja, m, rng):
+                    procesar(r, puntos)
+                return acc_exito
+
+            # La parada se controla con el IC del estimador hit-or-miss
+            resumen = muestreo_adaptativo(paso, rect_area, proporcion=True, **opciones_adaptativo)
+            N = acc_exito.n
+        if len(conteos) > 1:
+            acc_fx.medias_replicas = [sumas_fx[r] / conteos[r] for r in sorted(conteos)]
+            acc_exito.medias_replicas = [sumas_exito[r] / conteos[r] for r in sorted(conteos)]
+
+        nodes, weights = leggauss(n_gauss)
+        trans_nodes = 0.5*(nodes+1)*(b-a)+a
+        gauss_val = 0.5*(b-a)*np.sum(weights * f(trans_nodes))
+
+        return {'acc_fx': acc_fx, 'mc_estimate': acc_exito.media * rect_area, 'mc_prom': (b - a) * acc_fx.media,
+                'gauss_val': gauss_val, 'N': N, 'resumen': resumen, 'xs_dense': xs_dense, 'ys_dense': ys_dense,
+                'y_min': y_min, 'y_max': y_max}
+
+    def _mostrar_simulacion(self, res, func_str, a, b):
+        acc_fx, gauss_val = res['acc_fx'], res['gauss_val']
+        mc_estimate, mc_prom = res['mc_estimate'], res['mc_prom']
+        xs_dense, ys_dense, y_min, y_max = res['xs_dense'], res['ys_dense'], res['y_min'], res['y_max']
+
+        self.mc_stats = acc_fx
+        self.volume = b - a  # Guardar volumen para análisis estadístico
+        self.convergencia_data = (acc_fx, b - a, gauss_val)
+
+        # Reservorio de muestras para tabla y gráfico
+        puntos, fx_vals_samples = acc_fx.reservorio
+        xs, ys = puntos[:, 0], puntos[:, 1]
+        success_mask = ((ys >= 0) & (ys <= fx_vals_samples)) | ((ys <= 0) & (ys >= fx_vals_samples))
+
+        # Tabla (sólo se formatean las filas visibles)
+        self.tabla.cargar([xs, ys, fx_vals_samples, np.where(success_mask, "✔", "✘")],
+                          ["{:.6f}", "{:.6f}", "{:.6f}", None])
+
+        # Gráfico (muestra visual acotada del reservorio)
+        vis = muestra_visual(puntos)
+        xs_vis, ys_vis, exito_vis = xs[vis], ys[vis], success_mask[vis]
+        g = self.grafico
+        g.relleno('area', xs_dense, ys_dense, color='lightblue', alpha=0.3, label='Área bajo la curva')
+        g.linea('f', xs_dense, ys_dense, label=f"f(x)={func_str}", color="blue", linewidth=2)
+        g.puntos('fallidos', xs_vis[~exito_vis], ys_vis[~exito_vis], s=20, alpha=0.6, color="red", label="Fallidos")
+        g.puntos('exitos', xs_vis[exito_vis], ys_vis[exito_vis], s=20, alpha=0.6, color="green", label="Éxitos")
+        g.titulo(f"MC: {mc_estimate:.6f} | MC promedio: {mc_prom:.6f} | Gauss: {gauss_val:.6f}")
+        g.limites((a, b), (y_min - 0.1*abs(y_min), y_max + 0.1*abs(y_max)))
+        g.leyenda()
+        g.actualizar()
+
+        texto = f"Resultados: hit-or-miss = {mc_estimate:.6f} | promedio = {mc_prom:.6f} | N = {res['N']:,}"
+        if res['resumen'] is not None:
+            texto += " | " + self._texto_adaptativo(res['resumen'])
+        self.label_result.config(text=texto)
 
     # -------------------- Limpiar --------------------
     def limpiar(self):
-        self.ax.clear()
-        self.canvas.draw()
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+        self.ejecutor.cancelar("simular")
+        self.grafico.limpiar()
+        self.tabla.limpiar()
         self.label_result.config(text="Resultados: ")
-        self.fxs_samples = None
+        self.mc_stats = None
         self.volume = None
         self.convergencia_data = None
 
@@ -169,9 +340,14 @@ class MonteCarloSimulator:
             messagebox.showwarning("Atención", "Primero ejecute una simulación.")
             return
 
-        xs, fxs, L, gauss_val = self.convergencia_data
-        cum_avg = np.cumsum(fxs)/np.arange(1, len(fxs)+1)
-        std_accum = np.array([np.std(fxs[:i+1], ddof=1) if i>0 else 0 for i in range(len(fxs))])
+        acc, L, gauss_val = self.convergencia_data
+        # Media y varianza acumuladas sobre todas las muestras, en puntos de control logarítmicos
+        n, cum_avg, var_accum = acc.convergencia
+        # Sólo el dibujo se decima (LTTB sobre el eje logarítmico)
+        vis = decimar_linea(np.log10(n), cum_avg)
+        n, cum_avg, var_accum = n[vis], cum_avg[vis], var_accum[vis]
+        std_accum = np.sqrt(var_accum)
+        ic_inf, ic_sup = bandas_confianza(n, cum_avg, var_accum, 0.95)
 
         # Ajustar por volumen
         cum_avg_vol = cum_avg * L
@@ -180,11 +356,14 @@ class MonteCarloSimulator:
         win = tk.Toplevel(self.root)
         win.title("Convergencia Monte Carlo")
 
-        fig, ax = plt.subplots(figsize=(7,4))
-        ax.plot(cum_avg_vol, label="MC promedio acumulado")
-        ax.fill_between(range(len(cum_avg)), cum_avg_vol - std_accum_vol, cum_avg_vol + std_accum_vol,
+        fig = Figure(figsize=(7,4))
+        ax = fig.subplots()
+        ax.plot(n, cum_avg_vol, label="MC promedio acumulado")
+        ax.fill_between(n, cum_avg_vol - std_accum_vol, cum_avg_vol + std_accum_vol,
                         color='gray', alpha=0.3, label='±1 std')
+        ax.fill_between(n, ic_inf * L, ic_sup * L, color='orange', alpha=0.4, label='IC 95%')
         ax.axhline(gauss_val, color="red", linestyle="--", label="Gauss-Legendre")
+        ax.set_xscale("log")
         ax.set_xlabel("Número de muestras")
         ax.set_ylabel("Estimación")
         ax.legend()
@@ -196,19 +375,19 @@ class MonteCarloSimulator:
 
     # -------------------- Análisis Estadístico --------------------
     def ventana_estadistica(self):
-        if self.fxs_samples is None:
+        if self.mc_stats is None:
             messagebox.showwarning("Atención", "Primero ejecute una simulación.")
             return
 
-        data = self.fxs_samples
-        n = len(data)
+        acc = self.mc_stats
+        n = acc.n
         volumen = getattr(self, "volume", 1)
 
         # Ajustar por volumen
-        media = np.mean(data) * volumen
-        std = np.std(data, ddof=1) * volumen
-        varianza = np.var(data, ddof=1) * (volumen ** 2)  # Varianza ajustada por volumen²
-        stderr = std / np.sqrt(n)
+        media = acc.media * volumen
+        std = acc.desviacion * volumen
+        varianza = acc.varianza * (volumen ** 2)  # Varianza ajustada por volumen²
+        stderr = acc.error_estandar * abs(volumen)  # entre réplicas si el muestreo es QMC
 
         win = tk.Toplevel(self.root)
         win.title("Análisis Estadístico")
@@ -217,28 +396,34 @@ class MonteCarloSimulator:
         confidence_var = tk.DoubleVar(value=95)
         conf_box = ttk.Combobox(win, textvariable=confidence_var, values=[90,95,99], width=5)
         conf_box.pack(padx=5, pady=5, anchor="w")
+        ttk.Label(win, text="Intervalo graficado:").pack(padx=5, pady=5, anchor="w")
+        intervalo_var = tk.StringVar(value=INTERVALOS[0])
+        intervalo_box = ttk.Combobox(win, textvariable=intervalo_var, values=INTERVALOS, width=20, state="readonly")
+        intervalo_box.pack(padx=5, pady=5, anchor="w")
 
         lbl = tk.Label(win, justify="left", font=("Arial",12))
         lbl.pack(padx=10, pady=10)
 
-        fig, ax = plt.subplots(figsize=(5,3))
+        fig = Figure(figsize=(5,3))
+        ax = fig.subplots()
         canvas = FigureCanvasTkAgg(fig, master=win)
         canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
 
         def actualizar(event=None):
             conf = confidence_var.get()/100
-            t_val = stats.t.ppf(0.5+conf/2, n-1)
-            ic_lower = media - t_val*stderr
-            ic_upper = media + t_val*stderr
+            intervalos = self._intervalos(acc, conf, volumen)
+            elegido = intervalo_var.get() if intervalo_var.get() in intervalos else INTERVALOS[0]
+            ic_lower, ic_upper, _ = intervalos[elegido]
             lbl.config(text=f"Muestras: {n}\nMedia: {media:.6f}\nVarianza: {varianza:.6f}\nDesviación estándar: {std:.6f}\n"
-                            f"Error estándar: {stderr:.6f}\nIntervalo de confianza {int(conf*100)}%: [{ic_lower:.6f}, {ic_upper:.6f}]")
+                            f"Error estándar: {stderr:.6f}" + self._texto_intervalos(intervalos, conf, acc)
+                            + (f"\nRéplicas QMC: {len(acc.medias_replicas)}" if acc.medias_replicas else ""))
             ax.clear()
-            ax.hist(data*volumen, bins=min(30,max(5,n//5)), edgecolor='black', alpha=0.7, density=True)
-            x_vals = np.linspace(min(data)*volumen, max(data)*volumen, 200)
+            self._graficar_histograma(ax, acc, volumen)
+            x_vals = np.linspace(acc.minimo*volumen, acc.maximo*volumen, 200)
             y_norm = stats.norm.pdf(x_vals, media, std)
             ax.plot(x_vals, y_norm, color='orange', linewidth=2, label='Distribución Normal')
             ax.axvline(media, color='blue', linestyle='-', linewidth=2, label='Media')
-            ax.axvline(ic_lower, color='red', linestyle='--', linewidth=2, label=f'IC {int(conf*100)}%')
+            ax.axvline(ic_lower, color='red', linestyle='--', linewidth=2, label=f'IC {int(conf*100)}% ({elegido})')
             ax.axvline(ic_upper, color='red', linestyle='--', linewidth=2)
             ax.set_title("Distribución muestral f(x) ajustada por volumen")
             ax.set_xlabel("f(x) * (b-a)")
@@ -248,8 +433,208 @@ class MonteCarloSimulator:
             canvas.draw()
 
         conf_box.bind("<<ComboboxSelected>>", actualizar)
+        intervalo_box.bind("<<ComboboxSelected>>", actualizar)
         actualizar()
 
+    # -------------------- Selector de muestreo --------------------
+    def _selector_muestreo(self, parent, row, column):
+        """Controles de muestreo (pseudoaleatorio, Sobol, Halton), aleatorización y réplicas"""
+        ttk.Label(parent, text="Muestreo:").grid(row=row, column=column)
+        muestreo_var = tk.StringVar(value=PSEUDOALEATORIO)
+        ttk.Combobox(parent, textvariable=muestreo_var, values=METODOS_MUESTREO, width=14,
+                     state="readonly").grid(row=row, column=column+1)
+        ttk.Label(parent, text="Aleatorización:").grid(row=row, column=column+2)
+        aleatorizacion_var = tk.StringVar(value=ALEATORIZACIONES[0])
+        ttk.Combobox(parent, textvariable=aleatorizacion_var, values=ALEATORIZACIONES, width=13,
+                     state="readonly").grid(row=row, column=column+3)
+        ttk.Label(parent, text="Réplicas QMC:").grid(row=row, column=column+4)
+        entry_replicas = ttk.Entry(parent, width=5)
+        entry_replicas.insert(0, "16")
+        entry_replicas.grid(row=row, column=column+5)
+
+        def opciones():
+            return {'muestreo': muestreo_var.get(),
+                    'aleatorizacion': aleatorizacion_var.get(),
+                    'replicas': int(entry_replicas.get())}
+        return opciones
+
+    # -------------------- Reducción de varianza --------------------
+    def opciones_reduccion(self):
+        """Técnica de reducción de varianza elegida y sus parámetros"""
+        opciones = {'tecnica': self.tecnica_var.get(),
+                    'estratos': int(self.entry_estratos.get()),
+                    'grado_control': int(self.entry_grado_control.get()),
+                    'iteraciones_vegas': int(self.entry_iter_vegas.get()),
+                    'bins_vegas': int(self.entry_bins_vegas.get()),
+                    'min_biseccion': int(self.entry_min_biseccion.get())}
+        texto_densidad = self.entry_densidad.get().strip()
+        if texto_densidad:
+            opciones['densidad'] = sp.lambdify(sp.Symbol('x'), sp.sympify(texto_densidad), "numpy")
+        return opciones
+
+    def _opciones_promedio(self):
+        """Semilla, generador, reducción de varianza, N adaptativo y procesos (se leen en el hilo de Tk)"""
+        return {'semilla': int(self.entry_semilla.get()), 'generador': self.generador_var.get(),
+                'reduccion': self.opciones_reduccion(), 'adaptativo': self.opciones_adaptativo(),
+                'procesos': int(self.entry_procesos.get())}
+
+    @staticmethod
+    def _integrar_promedio(f, f_str, variables, limites, N, opciones_muestreo, opciones, almacen=None, control=None):
+        """Método promedio con la semilla maestra: devuelve (acumulador, volumen, resumen adaptativo o None).
+
+        Con N adaptativo se muestrea hasta el semiancho objetivo; si no, en varios
+        procesos cuando no hay reducción de varianza. Con `almacen` las muestras se
+        guardan también en disco. `opciones` viene de _opciones_promedio (no toca Tk).
+        """
+        semilla, generador = opciones['semilla'], opciones['generador']
+        reduccion, adaptativo = opciones['reduccion'], opciones['adaptativo']
+        f = _con_control(f, control, N if adaptativo is None else adaptativo['N_max'])
+        if adaptativo is not None:
+            if opciones_muestreo['muestreo'] != PSEUDOALEATORIO or reduccion['tecnica'] != SIN_REDUCCION:
+                raise ValueError("El N adaptativo usa muestreo pseudoaleatorio sin reducción de varianza")
+            return integrar_adaptativo(f, limites, rng=crear_generador(semilla, generador), almacen=almacen,
+                                       **adaptativo)
+        if reduccion['tecnica'] == SIN_REDUCCION:
+            acc, volumen = integrar_mc_paralelo(f_str, variables, limites, N, semilla, opciones['procesos'],
+                                                generador, almacen=almacen, control=control, **opciones_muestreo)
+        else:
+            acc, volumen = integrar_mc(f, limites, N, crear_generador(semilla, generador), almacen=almacen,
+                                       **opciones_muestreo, **reduccion)
+        return acc, volumen, None
+
+    # -------------------- Almacén de muestras en disco --------------------
+    def _nuevo_almacen(self, tipo):
+        """Almacén para una corrida nueva, o None si no se guardan muestras"""
+        if not self.guardar_muestras_var.get():
+            return None
+        base = os.path.join(self.entry_almacen.get().strip() or "muestras_mc",
+                            f"{tipo}_{time.strftime('%Y%m%d_%H%M%S')}")
+        ruta, i = base, 1
+        while os.path.exists(ruta):
+            i += 1
+            ruta = f"{base}_{i}"
+        return AlmacenMuestras(ruta)
+
+    def _guardar_corrida(self, almacen, data):
+        """Guarda la descripción de la corrida (todo menos el acumulador) y el estado del estimador"""
+        if almacen is None:
+            return
+        datos = {k: v for k, v in data.items() if k != 'acumulador'}
+        almacen.guardar_meta(datos=datos, estimador=estado_estimador(data['acumulador']))
+
+    def abrir_corrida_guardada(self):
+        """Reabre una corrida guardada y su análisis estadístico sin volver a evaluar f"""
+        try:
+            ruta = filedialog.askdirectory(initialdir=self.entry_almacen.get().strip() or ".",
+                                           title="Carpeta de la corrida")
+            if not ruta:
+                return
+            almacen = AlmacenMuestras(ruta)
+            meta = almacen.meta
+            if 'datos' not in meta:
+                raise ValueError("La carpeta no contiene una corrida guardada (falta meta.json)")
+            data = dict(meta['datos'])
+            # Los bloques se leen de a uno, mapeados en memoria
+            data['acumulador'] = almacen.reconstruir(rng=crear_generador(int(self.entry_semilla.get())))
+            self.ventana_estadistica_multiple(data, f"Análisis Estadístico - {os.path.basename(ruta)}")
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
+    # -------------------- N adaptativo --------------------
+    def opciones_adaptativo(self):
+        """Parámetros de parada por semiancho del IC, o None si el N es fijo"""
+        if not self.adaptativo_var.get():
+            return None
+        tiempo_max = self.entry_tiempo_max.get().strip()
+        return {'semiancho_objetivo': float(self.entry_semiancho.get()),
+                'relativo': self.tipo_semiancho_var.get() == "Relativo",
+                'confianza': float(self.entry_confianza.get()) / 100,
+                'N_max': int(float(self.entry_N_max.get())),
+                'tiempo_max': float(tiempo_max) if tiempo_max else None}
+
+    def _texto_adaptativo(self, resumen):
+        return (f"N adaptativo: {resumen['N_usado']:,} muestras en {resumen['tiempo']:.3f} s | "
+                f"semiancho IC {resumen['confianza']*100:g}%: {resumen['semiancho']:.3g} "
+                f"(objetivo {resumen['objetivo']:.3g}) | {resumen['motivo']}")
+
+    def _texto_reduccion(self, acc, volumen):
+        """Resumen de la técnica usada y su factor de reducción de varianza"""
+        if acc.tecnica == SIN_REDUCCION:
+            return f"Técnica: estimador promedio simple | Evaluaciones de f: {acc.evaluaciones}"
+        factor = acc.factor_reduccion
+        texto = (f"Técnica: {acc.tecnica} | Evaluaciones de f: {acc.evaluaciones} | "
+                 f"Error estándar: {acc.error_estandar*abs(volumen):.6f} | "
+                 f"Factor de reducción de varianza: {factor:.2f} "
+                 f"(≈ {factor*acc.evaluaciones:,.0f} muestras del estimador simple)")
+        if acc.chi2_gl is not None:
+            texto += f" | Iteraciones combinadas: {len(acc.estimaciones)} | chi²/gl: {acc.chi2_gl:.2f}"
+        if acc.regiones:
+            n_regiones = [r[1] for r in acc.regiones]
+            texto += (f" | Subregiones: {len(acc.regiones)} | muestras por subregión: "
+                      f"{min(n_regiones)}–{max(n_regiones)}")
+        return texto
+
+    def _intervalos(self, acc, conf, volumen):
+        """Intervalos de confianza disponibles para la integral: {nombre: (inferior, superior, error)}"""
+        def escalar(inf, sup, err):
+            inf, sup = sorted((inf * volumen, sup * volumen))
+            return inf, sup, err * abs(volumen)
+
+        stderr = acc.error_estandar
+        semiancho = stats.t.ppf(0.5+conf/2, acc.grados_libertad) * stderr
+        intervalos = {INTERVALOS[0]: escalar(acc.media - semiancho, acc.media + semiancho, stderr)}
+        # VEGAS y MISER no estiman con la media de muestras equiprobables
+        if acc.estimaciones or acc.regiones:
+            return intervalos
+        if len(acc.medias_replicas) > 1:
+            # QMC: las réplicas son las observaciones independientes
+            valores, n_total, desviacion = np.asarray(acc.medias_replicas), None, None
+        else:
+            # Submuestra uniforme del reservorio, reescalada a las N muestras
+            valores, n_total, desviacion = acc.reservorio[1], acc.n, acc.desviacion
+        if valores.size > 1:
+            for nombre, metodo in zip(INTERVALOS[1:3], ("percentil", "BCa")):
+                intervalos[nombre] = escalar(*intervalo_bootstrap(valores, conf, metodo, n_total, acc.media,
+                                                                  desviacion))
+        if acc.medias_lote.size > 1:
+            inf, sup, err, _ = intervalo_lotes(acc.medias_lote, acc.media, conf)
+            intervalos[INTERVALOS[3]] = escalar(inf, sup, err)
+        return intervalos
+
+    def _texto_intervalos(self, intervalos, conf, acc):
+        texto = ""
+        for nombre, (inf, sup, err) in intervalos.items():
+            detalle = f", {acc.medias_lote.size} lotes" if nombre == INTERVALOS[3] else ""
+            texto += f"\nIC {int(conf*100)}% {nombre}: [{inf:.6f}, {sup:.6f}] (error {err:.3g}{detalle})"
+        return texto
+
+    def _graficar_regiones(self, ax, acc):
+        """Asignación de MISER en 2D: cada subregión coloreada por muestras por unidad de área"""
+        rectangulos, densidades = [], []
+        for limites, n, _, _, _ in acc.regiones:
+            (x0, x1), (y0, y1) = limites[0], limites[1]
+            rectangulos.append(Rectangle((x0, y0), x1 - x0, y1 - y0))
+            densidades.append(n / ((x1 - x0) * (y1 - y0)))
+        coleccion = PatchCollection(rectangulos, cmap="viridis", edgecolor="white", linewidth=0.3)
+        coleccion.set_array(np.log10(densidades))
+        ax.add_collection(coleccion)
+        ax.autoscale_view()
+        ax.figure.colorbar(coleccion, ax=ax, label="log10(muestras / área)")
+        ax.set_title("Asignación de muestras (MISER)")
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+
+    # -------------------- Histograma desde el acumulador --------------------
+    def _graficar_histograma(self, ax, acc, escala, densidad=True):
+        """Dibuja el histograma de bins fijos del acumulador, escalado por volumen"""
+        alturas, bordes = acc.densidad() if densidad else (acc.conteos, acc.bordes)
+        if bordes is None:
+            return
+        if densidad:
+            alturas = alturas / abs(escala)
+        ax.bar(bordes[:-1]*escala, alturas, width=np.diff(bordes)*escala, align='edge',
+               edgecolor='black', alpha=0.7)
+
     # -------------------- Ayuda --------------------
     def mostrar_ayuda(self):
         texto = (
@@ -257,6 +642,29 @@ class MonteCarloSimulator:
             "1. Método de 'puntos de éxito' (hit-or-miss): se genera un rectángulo que contiene a la curva. Se cuentan los puntos dentro de la región bajo la curva y se estima el área.\n\n"
             "2. Método Monte Carlo promedio: se toma el promedio de f(x) evaluada en puntos aleatorios de [a,b] y se multiplica por la longitud del intervalo.\n\n"
             "3. Gauss-Legendre: método de cuadratura determinista de alta precisión que se toma como valor de referencia.\n\n"
+            "4. Muestreo cuasi-Monte Carlo (Sobol/Halton): puntos de baja discrepancia aleatorizados (Owen o desplazamiento). "
+            "El error estándar se estima con réplicas aleatorizadas independientes.\n\n"
+            "5. Reducción de varianza (método promedio e integrales múltiples): variables antitéticas, variable de control "
+            "polinómica, muestreo estratificado, muestreo por importancia (1D) y VEGAS. El factor de reducción compara la varianza "
+            "con la del estimador simple para el mismo número de evaluaciones de f.\n"
+            "VEGAS adapta en varias iteraciones una grilla de importancia por eje (útil para integrandos con picos, "
+            "como exp(-100*(x**2+y**2))) y combina las iteraciones por varianza inversa; chi²/gl cercano a 1 indica "
+            "que las iteraciones son consistentes.\n"
+            "MISER biseca recursivamente la región por el eje que más reduce la varianza y reparte las muestras según "
+            "la varianza de cada subregión; sirve para picos o bordes no alineados con los ejes.\n\n"
+            "6. N adaptativo: se muestrea en lotes crecientes hasta que el semiancho del intervalo de confianza t alcanza "
+            "el objetivo (absoluto o relativo), o hasta agotar el N máximo o el tiempo máximo.\n\n"
+            "7. Integral N-D: cualquier número de variables; los límites de cada variable pueden depender de las anteriores "
+            "y se puede agregar una restricción (p. ej. x**2+y**2<=1). Se informa la tasa de aceptación y el tamaño "
+            "efectivo de la muestra.\n\n"
+            "Los gráficos dibujan una muestra acotada y estratificada de los puntos y curvas decimadas (LTTB); "
+            "las estadísticas usan siempre todas las muestras.\n\n"
+            "8. Guardar muestras en disco: cada bloque de las integrales múltiples se escribe como .npy en una carpeta por "
+            "corrida; 'Abrir corrida guardada' reconstruye el análisis estadístico leyendo los bloques de a uno, sin "
+            "recalcular f.\n\n"
+            "9. Intervalos de confianza: además del intervalo t, bootstrap percentil y BCa (que no suponen normalidad; "
+            "con N grande se remuestrea el reservorio y se reescala a las N muestras) y medias por lotes, válido para "
+            "muestras correlacionadas.\n\n"
             "Usa los botones 'Integrales Dobles' o 'Integrales Triples' para abrir ventanas con teclado matemático avanzado y vista previa."
         )
         win = tk.Toplevel(self.root)
@@ -274,41 +682,47 @@ class MonteCarloSimulator:
             x = sp.Symbol('x')
             f_expr = sp.sympify(func_str)
             f = sp.lambdify(x, f_expr, "numpy")
+            opciones_muestreo, opciones = self.opciones_muestreo(), self._opciones_promedio()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
 
-            xs = np.random.uniform(a, b, N)
-            fx_vals = np.nan_to_num(f(xs))
-            integral_prom = (b-a)*np.mean(fx_vals)
+        # Comparte la barra (y el Cancelar) de la simulación principal
+        self.ejecutor.lanzar("promedio", self._integrar_promedio, f, func_str, "x", [(a, b)], N, opciones_muestreo,
+                             opciones, al_terminar=lambda res: self._mostrar_promedio(res, a, b),
+                             barra=self.barra_progreso)
 
-            win = tk.Toplevel(self.root)
-            win.title("Método Promedio 1D")
+    def _mostrar_promedio(self, res, a, b):
+        acc, longitud, resumen = res
+        integral_prom = longitud*acc.media
+        puntos, fx_vals = acc.reservorio
+        xs = puntos[:, 0]
 
-            tree = ttk.Treeview(win, columns=("x","f(x)"), show="headings")
-            tree.heading("x", text="x")
-            tree.heading("f(x)", text="f(x)")
-            tree.pack(side="left", fill="y")
+        win = tk.Toplevel(self.root)
+        win.title("Método Promedio 1D")
 
-            scroll = ttk.Scrollbar(win, orient="vertical", command=tree.yview)
-            tree.configure(yscrollcommand=scroll.set)
-            scroll.pack(side="left", fill="y")
+        ttk.Label(win, text=self._texto_reduccion(acc, longitud)).pack(side="top", fill="x", padx=5, pady=5)
+        if resumen is not None:
+            ttk.Label(win, text=self._texto_adaptativo(resumen)).pack(side="top", fill="x", padx=5, pady=5)
 
-            for i in range(min(N,5000)):
-                tree.insert("", "end", values=(f"{xs[i]:.6f}", f"{fx_vals[i]:.6f}"))
+        tabla = TablaVirtual(win, ("x", "f(x)"), alto=25)
+        tabla.pack(side="left", fill="y")
+        tabla.cargar([xs, fx_vals], ["{:.6f}", "{:.6f}"])
 
-            # Gráfico
-            fig, ax = plt.subplots(figsize=(6,4))
-            canvas = FigureCanvasTkAgg(fig, master=win)
-            canvas.get_tk_widget().pack(fill="both", expand=True)
+        # Gráfico
+        fig = Figure(figsize=(6,4))
+        ax = fig.subplots()
+        canvas = FigureCanvasTkAgg(fig, master=win)
+        canvas.get_tk_widget().pack(fill="both", expand=True)
 
-            ax.hist(fx_vals*(b-a), bins=min(30,max(5,N//5)), edgecolor='black', alpha=0.7)
-            ax.axhline(np.mean(fx_vals)*(b-a), color='red', linestyle='--', label='Media f(x)*(b-a)')
-            ax.set_title(f"Integral aproximada: {integral_prom:.6f}")
-            ax.set_xlabel("f(x) * (b-a)")
-            ax.set_ylabel("Frecuencia")
-            ax.grid(True)
-            ax.legend()
-            canvas.draw()
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        self._graficar_histograma(ax, acc, b-a, densidad=False)
+        ax.axhline(acc.media*(b-a), color='red', linestyle='--', label='Media f(x)*(b-a)')
+        ax.set_title(f"Integral aproximada: {integral_prom:.6f}")
+        ax.set_xlabel("f(x) * (b-a)")
+        ax.set_ylabel("Frecuencia")
+        ax.grid(True)
+        ax.legend()
+        canvas.draw()
 
     # -------------------- Integrales Dobles (con teclado avanzado) --------------------
     def ventana_integrales_dobles(self):
@@ -333,6 +747,7 @@ class MonteCarloSimulator:
 
             ttk.Label(win, text="N =").grid(row=3,column=0)
             entry_N = ttk.Entry(win, width=8); entry_N.insert(0,"500"); entry_N.grid(row=3,column=1)
+            opciones_muestreo = self._selector_muestreo(win, row=3, column=2)
 
             # -------- Teclado avanzado --------
             def agregar_texto(txt):
@@ -357,7 +772,11 @@ class MonteCarloSimulator:
                         command=lambda t=btxt: agregar_texto(t)
                     ).grid(row=i, column=j, padx=2, pady=2)
 
-            # -------- Cálculo --------
+            # -------- Cálculo (en segundo plano) --------
+            estado_grafico = {}
+            barra = BarraProgreso(win, self.ejecutor, "doble")
+            barra.grid(row=7, column=0, columnspan=8, sticky="w", padx=5)
+
             def calcular():
                 try:
                     f_str = entry_f.get()
@@ -368,36 +787,42 @@ class MonteCarloSimulator:
                     x,y = sp.symbols('x y')
                     f_expr = sp.sympify(f_str)
                     f = sp.lambdify((x,y), f_expr, "numpy")
+                    opciones = (opciones_muestreo(), self._opciones_promedio())
 
-                    xs = np.random.uniform(a,b,N)
-                    ys = np.random.uniform(c,d,N)
-                    fx_vals = np.nan_to_num(f(xs,ys))
-                    area = (b-a)*(d-c)
-                    integral = area*np.mean(fx_vals)
-
-                    # Guardar datos para análisis estadístico
-                    self.double_integral_data = {
-                        'fx_vals': fx_vals,
-                        'area': area,
-                        'integral': integral,
-                        'xs': xs,
-                        'ys': ys,
-                        'f_str': f_str,
-                        'bounds': {'a': a, 'b': b, 'c': c, 'd': d},
-                        'N': N
-                    }
-
-                    fig, ax = plt.subplots(figsize=(6,4))
-                    canvas = FigureCanvasTkAgg(fig, master=win)
-                    canvas.get_tk_widget().grid(row=8,column=0,columnspan=8)
-                    sc = ax.scatter(xs, ys, c=fx_vals, cmap='viridis', s=12)
-                    fig.colorbar(sc, ax=ax, label='f(x,y)')
-                    ax.set_title(f"Integral Doble ≈ {integral:.6f}")
-                    ax.set_xlabel("x")
-                    ax.set_ylabel("y")
-                    canvas.draw()
+                    almacen = self._nuevo_almacen("doble")
                 except Exception as e:
                     messagebox.showerror("Error", str(e))
+                    return
+                self.ejecutor.lanzar("doble", self._integrar_promedio, f, f_str, "x y", [(a,b),(c,d)], N, *opciones,
+                                     almacen, al_terminar=lambda res: mostrar(res, f_str, a, b, c, d, almacen),
+                                     barra=barra)
+
+            def mostrar(res, f_str, a, b, c, d, almacen):
+                acc, area, resumen = res
+                integral = area*acc.media
+                puntos, fx_vals = acc.reservorio
+                vis = muestra_visual(puntos)
+                xs, ys, fx_vals = puntos[vis,0], puntos[vis,1], fx_vals[vis]
+
+                # Guardar estadísticos acumulados (no las N muestras) para el análisis
+                self.double_integral_data = {
+                    'acumulador': acc,
+                    'area': area,
+                    'integral': integral,
+                    'f_str': f_str,
+                    'bounds': {'a': a, 'b': b, 'c': c, 'd': d},
+                    'N': acc.evaluaciones,
+                    'resumen_adaptativo': resumen
+                }
+                self._guardar_corrida(almacen, self.double_integral_data)
+
+                g = self._grafico_ventana(win, estado_grafico, columnas=8)
+                g.puntos('muestras', xs, ys, c=fx_vals, cmap='viridis', s=12)
+                g.colorbar('muestras', label='f(x,y)')
+                g.etiquetas("x", "y")
+                g.ajustar_a(xs, ys)
+                g.titulo(f"Integral Doble ≈ {integral:.6f}")
+                g.actualizar()
 
             # -------- Análisis Estadístico para Integral Doble --------
             def analisis_estadistico_doble():
@@ -440,6 +865,7 @@ class MonteCarloSimulator:
 
             ttk.Label(win, text="N =").grid(row=4, column=0)
             entry_N = ttk.Entry(win, width=8); entry_N.insert(0,"2000"); entry_N.grid(row=4,column=1)
+            opciones_muestreo = self._selector_muestreo(win, row=4, column=2)
 
             # -------- Teclado avanzado (mismo que en dobles) --------
             def agregar_texto(txt):
@@ -464,7 +890,11 @@ class MonteCarloSimulator:
                         command=lambda t=btxt: agregar_texto(t)
                     ).grid(row=i, column=j, padx=2, pady=2)
 
-            # -------- Cálculo triple --------
+            # -------- Cálculo triple (en segundo plano) --------
+            estado_grafico = {}
+            barra = BarraProgreso(win, self.ejecutor, "triple")
+            barra.grid(row=7, column=0, columnspan=9, sticky="w", padx=5)
+
             def calcular():
                 try:
                     f_str = entry_f.get()
@@ -476,38 +906,44 @@ class MonteCarloSimulator:
                     x,y,z = sp.symbols('x y z')
                     f_expr = sp.sympify(f_str)
                     f = sp.lambdify((x,y,z), f_expr, "numpy")
+                    opciones = (opciones_muestreo(), self._opciones_promedio())
 
-                    xs = np.random.uniform(a,b,N)
-                    ys = np.random.uniform(c,d,N)
-                    zs = np.random.uniform(e,fz,N)
-                    fx_vals = np.nan_to_num(f(xs,ys,zs))
-                    volume = (b-a)*(d-c)*(fz-e)
-                    integral = volume * np.mean(fx_vals)
-
-                    # Guardar datos para análisis estadístico
-                    self.triple_integral_data = {
-                        'fx_vals': fx_vals,
-                        'volume': volume,
-                        'integral': integral,
-                        'xs': xs,
-                        'ys': ys,
-                        'zs': zs,
-                        'f_str': f_str,
-                        'bounds': {'a': a, 'b': b, 'c': c, 'd': d, 'e': e, 'f': fz},
-                        'N': N
-                    }
-
-                    fig = plt.figure(figsize=(5,4))
-                    ax = fig.add_subplot(111, projection='3d')
-                    canvas = FigureCanvasTkAgg(fig, master=win)
-                    canvas.get_tk_widget().grid(row=8,column=0,columnspan=9)
-                    sc = ax.scatter(xs, ys, zs, c=fx_vals, cmap='viridis', s=10)
-                    fig.colorbar(sc, ax=ax, label='f(x,y,z)')
-                    ax.set_title(f"Integral Triple ≈ {integral:.6f}")
-                    ax.set_xlabel("x"); ax.set_ylabel("y"); ax.set_zlabel("z")
-                    canvas.draw()
+                    almacen = self._nuevo_almacen("triple")
                 except Exception as e:
                     messagebox.showerror("Error", str(e))
+                    return
+                limites = [(a,b),(c,d),(e,fz)]
+                self.ejecutor.lanzar("triple", self._integrar_promedio, f, f_str, "x y z", limites, N, *opciones,
+                                     almacen, al_terminar=lambda res: mostrar(res, f_str, limites, almacen),
+                                     barra=barra)
+
+            def mostrar(res, f_str, limites, almacen):
+                (a, b), (c, d), (e, fz) = limites
+                acc, volume, resumen = res
+                integral = volume * acc.media
+                puntos, fx_vals = acc.reservorio
+                vis = muestra_visual(puntos)
+                xs, ys, zs, fx_vals = puntos[vis,0], puntos[vis,1], puntos[vis,2], fx_vals[vis]
+
+                # Guardar estadísticos acumulados (no las N muestras) para el análisis
+                self.triple_integral_data = {
+                    'acumulador': acc,
+                    'volume': volume,
+                    'integral': integral,
+                    'f_str': f_str,
+                    'bounds': {'a': a, 'b': b, 'c': c, 'd': d, 'e': e, 'f': fz},
+                    'N': acc.evaluaciones,
+                    'resumen_adaptativo': resumen
+                }
+                self._guardar_corrida(almacen, self.triple_integral_data)
+
+                g = self._grafico_ventana(win, estado_grafico, columnas=9, figsize=(5,4), proyeccion='3d')
+                g.puntos('muestras', xs, ys, zs, c=fx_vals, cmap='viridis', s=10)
+                g.colorbar('muestras', label='f(x,y,z)')
+                g.etiquetas("x", "y", "z")
+                g.limites((a, b), (c, d), (e, fz))
+                g.titulo(f"Integral Triple ≈ {integral:.6f}")
+                g.actualizar()
 
             # -------- Análisis Estadístico para Integral Triple --------
             def analisis_estadistico_triple():
@@ -522,6 +958,132 @@ class MonteCarloSimulator:
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    # -------------------- Integral N-D sobre dominios no rectangulares --------------------
+    def ventana_integral_nd(self):
+        """Integral en cualquier dimensión: límites por variable (los internos pueden
+        depender de los externos) y una restricción opcional como x**2+y**2<=1."""
+        try:
+            win = tk.Toplevel(self.root)
+            win.title("Integral N-D Monte Carlo")
+
+            ttk.Label(win, text="Variables =").grid(row=0, column=0)
+            entry_vars = ttk.Entry(win, width=20)
+            entry_vars.insert(0, "x y")
+            entry_vars.grid(row=0, column=1, columnspan=2, padx=5, pady=5, sticky="w")
+
+            ttk.Label(win, text="f =").grid(row=1, column=0)
+            entry_f = ttk.Entry(win, width=50)
+            entry_f.insert(0, "x**2 + y**2")
+            entry_f.grid(row=1, column=1, columnspan=6, padx=5, pady=5)
+
+            ttk.Label(win, text="Límites (uno por línea, en el orden de las variables: inf, sup)").grid(
+                row=2, column=0, columnspan=7, sticky="w", padx=5)
+            text_limites = tk.Text(win, width=50, height=5)
+            text_limites.insert("1.0", "-1, 1\n-sqrt(1 - x**2), sqrt(1 - x**2)")
+            text_limites.grid(row=3, column=0, columnspan=7, padx=5, pady=5)
+
+            ttk.Label(win, text="Restricción (opcional) =").grid(row=4, column=0, columnspan=2)
+            entry_restriccion = ttk.Entry(win, width=35)
+            entry_restriccion.grid(row=4, column=2, columnspan=5, padx=5, pady=5, sticky="w")
+
+            ttk.Label(win, text="N =").grid(row=5, column=0)
+            entry_N = ttk.Entry(win, width=8); entry_N.insert(0, "100000"); entry_N.grid(row=5, column=1)
+            opciones_muestreo = self._selector_muestreo(win, row=5, column=2)
+
+            lbl_resultado = ttk.Label(win, text="", justify="left")
+            lbl_resultado.grid(row=7, column=0, columnspan=9, sticky="w", padx=5)
+
+            estado_grafico = {}
+            barra = BarraProgreso(win, self.ejecutor, "nd")
+            barra.grid(row=6, column=4, columnspan=5, sticky="w", padx=5)
+
+            def calcular():
+                try:
+                    f_str = entry_f.get()
+                    lineas = [l for l in text_limites.get("1.0", tk.END).splitlines() if l.strip()]
+                    limites = []
+                    for linea in lineas:
+                        # Se admite "x: inf, sup" o sólo "inf, sup"
+                        partes = separar_nivel_superior(linea.split(":", 1)[-1])
+                        if len(partes) != 2:
+                            raise ValueError(f"Límites inválidos: '{linea}' (se espera 'inf, sup')")
+                        limites.append(partes)
+                    dominio = DominioMC(entry_vars.get(), limites, entry_restriccion.get())
+                    f = sp.lambdify(dominio.simbolos, sp.sympify(f_str), "numpy")
+                    N = int(entry_N.get())
+                    rng = crear_generador(int(self.entry_semilla.get()), self.generador_var.get())
+                    muestreo = opciones_muestreo()
+
+                    almacen = self._nuevo_almacen("nd")
+                except Exception as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                self.ejecutor.lanzar("nd", calcular_dominio, f, dominio, N, rng, almacen, muestreo,
+                                     al_terminar=lambda res: mostrar(res, f_str, dominio, almacen), barra=barra)
+
+            def calcular_dominio(f, dominio, N, rng, almacen, muestreo, control=None):
+                return integrar_dominio(_con_control(f, control, N), dominio, N, rng, almacen=almacen, **muestreo)
+
+            def mostrar(res, f_str, dominio, almacen):
+                acc, resumen = res
+                integral = acc.media
+                self.nd_integral_data = {
+                    'acumulador': acc,
+                    'volumen': 1.0,
+                    'integral': integral,
+                    'f_str': f_str,
+                    'bounds': dominio.describir(),
+                    'N': acc.n,
+                    'resumen_dominio': resumen,
+                    'resumen_adaptativo': None
+                }
+                self._guardar_corrida(almacen, self.nd_integral_data)
+                lbl_resultado.config(text=f"Integral ≈ {integral:.6f} ± {acc.error_estandar:.6f} (1 error estándar)\n"
+                                          + self._texto_dominio(resumen))
+
+                puntos, valores = acc.reservorio
+                vis = muestra_visual(puntos)
+                puntos, valores = puntos[vis], valores[vis]
+                dentro = valores != 0
+                g = self._grafico_ventana(win, estado_grafico, columnas=9)
+                if dominio.dimension >= 2:
+                    x_vis, y_vis, nombre_y = puntos[dentro, 0], puntos[dentro, 1], dominio.variables[1]
+                else:
+                    x_vis, y_vis, nombre_y = puntos[dentro, 0], valores[dentro], "f · peso"
+                g.puntos('muestras', x_vis, y_vis, c=valores[dentro], cmap='viridis', s=8)
+                g.colorbar('muestras', label='f · peso')
+                g.etiquetas(dominio.variables[0], nombre_y)
+                g.ajustar_a(x_vis, y_vis)
+                g.titulo(f"Integral {dominio.dimension}-D ≈ {integral:.6f} (puntos aceptados)")
+                g.actualizar()
+
+            def analisis_estadistico_nd():
+                if self.nd_integral_data is None:
+                    messagebox.showwarning("Atención", "Primero calcule la integral N-D.")
+                    return
+                self.ventana_estadistica_multiple(self.nd_integral_data, "Análisis Estadístico - Integral N-D")
+
+            ttk.Button(win, text="Calcular", command=calcular).grid(row=6, column=0, columnspan=2, pady=10)
+            ttk.Button(win, text="Análisis Estadístico", command=analisis_estadistico_nd).grid(row=6, column=2, columnspan=2, pady=10)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
+    def _grafico_ventana(self, win, estado, columnas, figsize=(6, 4), proyeccion=None):
+        """Gráfico de una ventana de integrales: la figura y el canvas se crean en el primer
+        Calcular y se reutilizan (Figure no queda registrada en pyplot, muere con la ventana)"""
+        if 'grafico' not in estado:
+            fig = Figure(figsize=figsize)
+            ax = fig.add_subplot(111, projection=proyeccion)
+            canvas = FigureCanvasTkAgg(fig, master=win)
+            canvas.get_tk_widget().grid(row=8, column=0, columnspan=columnas)
+            estado['grafico'] = GraficoIncremental(ax, canvas)
+        return estado['grafico']
+
+    def _texto_dominio(self, resumen):
+        return (f"Medida del dominio ≈ {resumen['medida']:.6f} ± {resumen['error_medida']:.6f} | "
+                f"aceptación: {resumen['aceptacion']*100:.2f}% | "
+                f"tamaño efectivo de la muestra: {resumen['tamaño_efectivo']:,.0f} de {resumen['N']:,}")
+
     # -------------------- Teclado para entrada 1D (ventana) --------------------
     def teclado_funciones_1d(self):
         win = tk.Toplevel(self.root)
@@ -552,8 +1114,8 @@ class MonteCarloSimulator:
     # -------------------- Análisis Estadístico para Integrales Múltiples --------------------
     def ventana_estadistica_multiple(self, data, titulo):
         """Ventana de análisis estadístico especializada para integrales dobles y triples"""
-        fx_vals = data['fx_vals']
-        n = len(fx_vals)
+        acc = data['acumulador']
+        n = acc.n
         
         # Determinar si es integral doble o triple
         if 'area' in data:
@@ -561,17 +1123,22 @@ class MonteCarloSimulator:
             volumen = data['area']
             integral_estimada = data['integral']
             dimension_text = "Área"
-        else:
+        elif 'volume' in data:
             # Integral triple
             volumen = data['volume']
             integral_estimada = data['integral']
             dimension_text = "Volumen"
+        else:
+            # Integral N-D: el acumulador ya incluye el peso del dominio
+            volumen = data['volumen']
+            integral_estimada = data['integral']
+            dimension_text = "Escala"
 
         # Estadísticas ajustadas por volumen
-        media = np.mean(fx_vals) * volumen
-        std = np.std(fx_vals, ddof=1) * volumen
-        varianza = np.var(fx_vals, ddof=1) * (volumen ** 2)  # Varianza ajustada por volumen²
-        stderr = std / np.sqrt(n)
+        media = acc.media * volumen
+        std = acc.desviacion * volumen
+        varianza = acc.varianza * (volumen ** 2)  # Varianza ajustada por volumen²
+        stderr = acc.error_estandar * abs(volumen)  # entre réplicas si el muestreo es QMC
 
         win = tk.Toplevel(self.root)
         win.title(titulo)
@@ -585,6 +1152,11 @@ class MonteCarloSimulator:
         confidence_var = tk.DoubleVar(value=95)
         conf_box = ttk.Combobox(frame_controls, textvariable=confidence_var, values=[90,95,99], width=5)
         conf_box.pack(side="left", padx=5)
+        ttk.Label(frame_controls, text="Intervalo graficado:").pack(side="left", padx=5)
+        intervalo_var = tk.StringVar(value=INTERVALOS[0])
+        intervalo_box = ttk.Combobox(frame_controls, textvariable=intervalo_var, values=INTERVALOS, width=20,
+                                     state="readonly")
+        intervalo_box.pack(side="left", padx=5)
 
         # Frame para estadísticas
         frame_stats = ttk.LabelFrame(win, text="Estadísticas")
@@ -600,13 +1172,21 @@ class MonteCarloSimulator:
         info_text = f"Función: {data['f_str']}\n"
         info_text += f"Límites: "
         bounds = data['bounds']
-        if 'area' in data:
+        if isinstance(bounds, str):
+            info_text += bounds + "\n"
+        elif 'area' in data:
             info_text += f"x ∈ [{bounds['a']}, {bounds['b']}], y ∈ [{bounds['c']}, {bounds['d']}]\n"
         else:
             info_text += f"x ∈ [{bounds['a']}, {bounds['b']}], y ∈ [{bounds['c']}, {bounds['d']}], z ∈ [{bounds['e']}, {bounds['f']}]\n"
         info_text += f"Muestras: {data['N']}\n"
         info_text += f"{dimension_text}: {volumen:.6f}\n"
         info_text += f"Integral estimada: {integral_estimada:.6f}"
+        if acc.tecnica != SIN_REDUCCION:
+            info_text += "\n" + self._texto_reduccion(acc, volumen)
+        if data.get('resumen_adaptativo') is not None:
+            info_text += "\n" + self._texto_adaptativo(data['resumen_adaptativo'])
+        if data.get('resumen_dominio') is not None:
+            info_text += "\n" + self._texto_dominio(data['resumen_dominio'])
 
         lbl_info = tk.Label(frame_info, text=info_text, justify="left", font=("Arial",9))
         lbl_info.pack(padx=10, pady=5)
@@ -615,35 +1195,45 @@ class MonteCarloSimulator:
         frame_plots = ttk.LabelFrame(win, text="Distribución y Convergencia")
         frame_plots.pack(fill="both", expand=True, padx=10, pady=5)
 
-        # Crear subplots
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+        # Crear subplots (más la asignación de MISER en 2D)
+        if acc.regiones and 'area' in data:
+            fig = Figure(figsize=(16, 4))
+            ax1, ax2, ax3 = fig.subplots(1, 3)
+            self._graficar_regiones(ax3, acc)
+        else:
+            fig = Figure(figsize=(12, 4))
+            ax1, ax2 = fig.subplots(1, 2)
         canvas = FigureCanvasTkAgg(fig, master=frame_plots)
         canvas.get_tk_widget().pack(fill="both", expand=True)
 
         def actualizar(event=None):
             conf = confidence_var.get()/100
-            t_val = stats.t.ppf(0.5+conf/2, n-1)
-            ic_lower = media - t_val*stderr
-            ic_upper = media + t_val*stderr
+            intervalos = self._intervalos(acc, conf, volumen)
+            elegido = intervalo_var.get() if intervalo_var.get() in intervalos else INTERVALOS[0]
+            ic_lower, ic_upper, _ = intervalos[elegido]
             
             # Actualizar estadísticas
             stats_text = f"Muestras: {n}\n"
-            stats_text += f"Media f(x,...): {np.mean(fx_vals):.6f}\n"
+            stats_text += f"Media f(x,...): {acc.media:.6f}\n"
             stats_text += f"Media ajustada: {media:.6f}\n"
             stats_text += f"Varianza: {varianza:.6f}\n"
             stats_text += f"Desviación estándar: {std:.6f}\n"
             stats_text += f"Error estándar: {stderr:.6f}\n"
-            stats_text += f"Intervalo de confianza {int(conf*100)}%:\n[{ic_lower:.6f}, {ic_upper:.6f}]"
+            if acc.medias_replicas:
+                stats_text += f"Réplicas QMC: {len(acc.medias_replicas)}\n"
+            if acc.regiones:
+                stats_text += f"Subregiones MISER: {len(acc.regiones)}\n"
+            stats_text += self._texto_intervalos(intervalos, conf, acc).lstrip("\n")
             lbl_stats.config(text=stats_text)
             
             # Gráfico 1: Distribución
             ax1.clear()
-            ax1.hist(fx_vals*volumen, bins=min(30,max(5,n//10)), edgecolor='black', alpha=0.7, density=True)
-            x_vals = np.linspace(min(fx_vals)*volumen, max(fx_vals)*volumen, 200)
+            self._graficar_histograma(ax1, acc, volumen)
+            x_vals = np.linspace(acc.minimo*volumen, acc.maximo*volumen, 200)
             y_norm = stats.norm.pdf(x_vals, media, std)
             ax1.plot(x_vals, y_norm, color='orange', linewidth=2, label='Distribución Normal')
             ax1.axvline(media, color='blue', linestyle='-', linewidth=2, label='Media')
-            ax1.axvline(ic_lower, color='red', linestyle='--', linewidth=2, label=f'IC {int(conf*100)}%')
+            ax1.axvline(ic_lower, color='red', linestyle='--', linewidth=2, label=f'IC {int(conf*100)}% ({elegido})')
             ax1.axvline(ic_upper, color='red', linestyle='--', linewidth=2)
             ax1.set_title("Distribución de f(x,...) × Volumen")
             ax1.set_xlabel("Valor ajustado")
@@ -653,12 +1243,15 @@ class MonteCarloSimulator:
             
             # Gráfico 2: Convergencia
             ax2.clear()
-            cum_avg = np.cumsum(fx_vals)/np.arange(1, len(fx_vals)+1)
+            n_conv, cum_avg, _ = acc.convergencia
+            vis = decimar_linea(np.log10(n_conv), cum_avg)
+            n_conv, cum_avg = n_conv[vis], cum_avg[vis]
             cum_avg_vol = cum_avg * volumen
-            ax2.plot(cum_avg_vol, label="Promedio acumulado", color='blue')
+            ax2.plot(n_conv, cum_avg_vol, label="Promedio acumulado", color='blue')
             ax2.axhline(media, color="red", linestyle="--", label="Media final")
-            ax2.fill_between(range(len(cum_avg)), ic_lower, ic_upper, 
+            ax2.fill_between(n_conv, ic_lower, ic_upper, 
                            color='red', alpha=0.2, label=f'IC {int(conf*100)}%')
+            ax2.set_xscale("log")
             ax2.set_xlabel("Número de muestras")
             ax2.set_ylabel("Estimación")
             ax2.set_title("Convergencia Monte Carlo")
@@ -668,6 +1261,7 @@ class MonteCarloSimulator:
             canvas.draw()
 
         conf_box.bind("<<ComboboxSelected>>", actualizar)
+        intervalo_box.bind("<<ComboboxSelected>>", actualizar)
         actualizar()
 
 if __name__=="__main__":
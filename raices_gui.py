@@ -7,32 +7,16 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 import random
+from scipy import stats
 from numeric_methods import aitken, derivada_numerica, newton_raphson
+from mc_engine import AcumuladorMC, bloques
+from ejecutor_tareas import BarraProgreso, EjecutorTareas
+from grafico_incremental import GraficoIncremental
+from tabla_virtual import TablaVirtual
 
-# Función para calcular t crítico sin scipy
 def t_critical(alpha, df):
-    """Aproximación del valor crítico t usando la distribución normal para df grandes"""
-    if df >= 30:
-        # Para df >= 30, usar aproximación normal
-        z_values = {0.10: 1.645, 0.05: 1.96, 0.01: 2.576}
-        return z_values.get(alpha, 1.96)
-    else:
-        # Valores aproximados de t para df pequeños (95% confianza)
-        t_table = {
-            1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571,
-            6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
-            15: 2.131, 20: 2.086, 25: 2.060, 29: 2.045
-        }
-        # Buscar el valor más cercano
-        if df in t_table:
-            return t_table[df]
-        else:
-            # Interpolación simple
-            keys = sorted(t_table.keys())
-            for i, key in enumerate(keys):
-                if df <= key:
-                    return t_table[key]
-            return 2.045  # Valor por defecto para df > 29
+    """Valor crítico t con probabilidad alpha en la cola superior (cuantil exacto)"""
+    return float(stats.t.ppf(1 - alpha, df))
 try:
     from sympy import symbols, simplify, expand, lambdify, factorial, diff, log, gcd, Rational, cancel
 except ImportError:
@@ -46,6 +30,78 @@ def safe_lambda(expr):
     code = compile(expr, '<string>', 'eval')
     return lambda x: eval(code, {"__builtins__": {}}, {**allowed_names, 'x': x})
 
+PASO_CONTROL = 10_000   # evaluaciones de f entre avisos de progreso
+
+def con_control(f, control, total):
+    """f que cada PASO_CONTROL evaluaciones (escalares o en bloque) informa el avance y
+    verifica la cancelación de la tarea (ver ejecutor_tareas)"""
+    if control is None:
+        return f
+    evaluados, proximo = 0, 0
+
+    def g(x):
+        nonlocal evaluados, proximo
+        if evaluados >= proximo:
+            control.progreso(min(evaluados / total, 1.0), f"{evaluados:,} evaluaciones de f")
+            proximo = evaluados + PASO_CONTROL
+        evaluados += np.size(x)
+        return f(x)
+    return g
+
+def _log_np(x, base=None):
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+# Equivalentes NumPy de los nombres de math con la misma semántica; el resto de las
+# funciones de math (remainder, gamma, erf, ...) se vectorizan tal cual
+_NOMBRES_NUMPY = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'asinh': np.arcsinh, 'acosh': np.arccosh, 'atanh': np.arctanh,
+    'exp': np.exp, 'expm1': np.expm1, 'log': _log_np, 'log10': np.log10, 'log2': np.log2,
+    'log1p': np.log1p, 'sqrt': np.sqrt, 'fabs': np.abs, 'ceil': np.ceil, 'floor': np.floor,
+    'trunc': np.trunc, 'fmod': np.fmod, 'copysign': np.copysign, 'hypot': np.hypot,
+    'degrees': np.degrees, 'radians': np.radians,
+    'isfinite': np.isfinite, 'isinf': np.isinf, 'isnan': np.isnan,
+}
+
+def safe_lambda_np(expr):
+    """Como safe_lambda pero evalúa x como arreglo NumPy (sin bucle en Python).
+    Los nombres de math sin equivalente NumPy exacto se vectorizan con np.vectorize; si
+    la expresión no admite arreglos (p. ej. usa and/or) se evalúa punto a punto.
+    NumPy devuelve NaN/inf donde math falla (sqrt(x-1) con x < 1, 1/x en 0, ...): esos
+    puntos se reevalúan con safe_lambda y su error se propaga como ValueError.
+    """
+    escalar = safe_lambda(expr)
+    allowed_names = {}
+    for k in dir(math):
+        if k.startswith("__"):
+            continue
+        valor = getattr(math, k)
+        if k in _NOMBRES_NUMPY:
+            allowed_names[k] = _NOMBRES_NUMPY[k]
+        elif callable(valor):
+            allowed_names[k] = np.vectorize(valor, otypes=[float])
+        else:
+            allowed_names[k] = valor
+    allowed_names.update({"abs": np.abs, "pow": np.power})
+    code = compile(expr, '<string>', 'eval')
+    def f(x):
+        x = np.asarray(x, dtype=float)
+        try:
+            with np.errstate(all='ignore'):
+                valores = eval(code, {"__builtins__": {}}, {**allowed_names, 'x': x})
+            valores = np.broadcast_to(np.asarray(valores, dtype=float), x.shape)
+        except (TypeError, ValueError):
+            return np.fromiter((escalar(xi) for xi in x.ravel()), dtype=float, count=x.size).reshape(x.shape)
+        for xi in x[~np.isfinite(valores) & np.isfinite(x)]:
+            try:
+                float(escalar(float(xi)))
+            except (ArithmeticError, TypeError, ValueError) as e:
+                raise ValueError(f"{e} en x = {xi:g}") from e
+        return valores
+    return f
+
 class ModeladoSimulacionGUI:
     def __init__(self, master):
         self.master = master
@@ -54,6 +110,9 @@ class ModeladoSimulacionGUI:
         # Crear notebook para pestañas
         self.notebook = ttk.Notebook(master)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
+
+        # Integración e interpolación corren en segundo plano con progreso y cancelación
+        self.ejecutor = EjecutorTareas(master)
         
         # Pestaña de métodos de raíces
         self.raices_frame = ttk.Frame(self.notebook)
@@ -126,6 +185,8 @@ class ModeladoSimulacionGUI:
         self.fig, self.ax = plt.subplots(figsize=(5, 3))
         self.canvas = FigureCanvasTkAgg(self.fig, master=frm)
         self.canvas.get_tk_widget().grid(row=8, column=0, columnspan=6)
+        self.ax.grid(True, which='both', linestyle='--', linewidth=0.7, alpha=0.9)
+        self.grafico = GraficoIncremental(self.ax, self.canvas)
 
         self._update_fields()
     
@@ -154,6 +215,8 @@ class ModeladoSimulacionGUI:
         # Botones
         ttk.Button(frm, text="Calcular Interpolación", command=self.calcular_lagrange).grid(row=4, column=0, pady=10)
         ttk.Button(frm, text="Limpiar", command=self.limpiar_lagrange).grid(row=4, column=1, pady=10)
+        self.barra_lagrange = BarraProgreso(frm, self.ejecutor, "lagrange")
+        self.barra_lagrange.grid(row=4, column=2, columnspan=2, sticky='w')
         
         # Área de resultados
         self.resultado_text = tk.Text(frm, height=15, width=80, wrap=tk.WORD)
@@ -167,6 +230,12 @@ class ModeladoSimulacionGUI:
         self.fig_lagrange, self.ax_lagrange = plt.subplots(figsize=(8, 4))
         self.canvas_lagrange = FigureCanvasTkAgg(self.fig_lagrange, master=frm)
         self.canvas_lagrange.get_tk_widget().grid(row=6, column=0, columnspan=4, pady=10)
+        self.ax_lagrange.grid(True, alpha=0.3)
+        self.ax_lagrange.set_xlabel('x')
+        self.ax_lagrange.set_ylabel('y')
+        self.ax_lagrange.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+        self.ax_lagrange.axvline(x=0, color='k', linestyle='-', alpha=0.3)
+        self.grafico_lagrange = GraficoIncremental(self.ax_lagrange, self.canvas_lagrange)
         
         # Configurar redimensionamiento
         frm.columnconfigure(0, weight=1)
@@ -187,8 +256,7 @@ class ModeladoSimulacionGUI:
         for row in self.tree.get_children():
             self.tree.delete(row)
         self.result_var.set("Resultado: -")
-        self.ax.clear()
-        self.canvas.draw()
+        self.grafico.limpiar()
 
     def run_method(self):
         method = self.method.get()
@@ -242,15 +310,15 @@ class ModeladoSimulacionGUI:
         xmin, xmax = -2.5, 2.5
         xs = np.linspace(xmin, xmax, 2000)
         ys_fx = [fx(x) for x in xs]
-        self.ax.clear()
-        self.ax.plot(xs, ys_fx, color='red', linewidth=2)
-        self.ax.axhline(0, color='black', linestyle='-', linewidth=1)
-        self.ax.axvline(0, color='black', linestyle='-', linewidth=1)
-        self.ax.set_xlim(xmin, xmax)
-        self.ax.set_ylim(-4, 4)
-        self.ax.set_title("f(x)")
-        self.ax.grid(True, which='both', linestyle='--', linewidth=0.7, alpha=0.9)
-        self.canvas.draw()
+        g = self.grafico
+        g.ocultar_todos()
+        g.linea('newton_fx', xs, ys_fx, color='red', linewidth=2)
+        g.linea('newton_eje_x', [xmin, xmax], [0, 0], color='black', linestyle='-', linewidth=1)
+        g.linea('newton_eje_y', [0, 0], [-4, 4], color='black', linestyle='-', linewidth=1)
+        g.limites((xmin, xmax), (-4, 4))
+        g.titulo("f(x)")
+        g.leyenda()
+        g.actualizar()
 
 
     def _plot_aitken(self, history, fx, gx):
@@ -263,22 +331,22 @@ class ModeladoSimulacionGUI:
         xs = np.linspace(xmin, xmax, 800)
         ys_fx = [fx(x) for x in xs]
         ys_gx = [gx(x) for x in xs]
-        self.ax.clear()
-        self.ax.plot(xs, ys_fx, label='f(x)')
-        self.ax.plot(xs, ys_gx, label='g(x)', color='orange')
-        self.ax.axhline(0, color='gray', linestyle='--')
+        g = self.grafico
+        g.ocultar_todos()
+        g.linea('aitken_fx', xs, ys_fx, label='f(x)', color='tab:blue')
+        g.linea('aitken_gx', xs, ys_gx, label='g(x)', color='orange')
+        g.linea('aitken_cero', [xmin, xmax], [0, 0], color='gray', linestyle='--')
         # Solo marcar la última raíz (solución final)
         if history:
             r = history[-1][4]
-            self.ax.plot(r, fx(r), 'ro', label='Raíz')
-        self.ax.set_xlim(xmin, xmax)
-        self.ax.set_ylim(
+            g.linea('aitken_raiz', [r], [fx(r)], color='r', marker='o', linestyle='none', label='Raíz')
+        g.limites((xmin, xmax), (
             min(min(ys_fx), min(ys_gx)) - 1,
             max(max(ys_fx), max(ys_gx)) + 1
-        )
-        self.ax.set_title('f(x) y g(x)')
-        self.ax.legend()
-        self.canvas.draw()
+        ))
+        g.titulo('f(x) y g(x)')
+        g.leyenda()
+        g.actualizar()
     
     def parsear_puntos(self, texto):
         """Parsear texto de puntos en formato (x,y), (x,y), ..."""
@@ -458,21 +526,15 @@ class ModeladoSimulacionGUI:
         x_vals = np.linspace(x_min, x_max, 1000)
         y_vals = P_func(x_vals)
         
-        # Limpiar y graficar
-        self.ax_lagrange.clear()
-        self.ax_lagrange.plot(x_vals, y_vals, 'b-', linewidth=2, label='Polinomio de Lagrange')
-        self.ax_lagrange.plot(xs_data, ys_data, 'ro', markersize=8, label='Puntos de interpolación')
-        
-        # Configurar gráfico
-        self.ax_lagrange.grid(True, alpha=0.3)
-        self.ax_lagrange.set_xlabel('x')
-        self.ax_lagrange.set_ylabel('y')
-        self.ax_lagrange.set_title('Polinomio Interpolante de Lagrange')
-        self.ax_lagrange.legend()
-        self.ax_lagrange.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-        self.ax_lagrange.axvline(x=0, color='k', linestyle='-', alpha=0.3)
-        
-        self.canvas_lagrange.draw()
+        # Actualizar las curvas (ejes, grilla y rectas y=0, x=0 son fijos)
+        g = self.grafico_lagrange
+        g.linea('polinomio', x_vals, y_vals, color='b', linestyle='-', linewidth=2, label='Polinomio de Lagrange')
+        g.linea('puntos', xs_data, ys_data, color='r', marker='o', linestyle='none', markersize=8,
+                label='Puntos de interpolación')
+        g.titulo('Polinomio Interpolante de Lagrange')
+        g.autoescalar()
+        g.leyenda()
+        g.actualizar()
     
     def calcular_lagrange(self):
         """Función principal para calcular interpolación de Lagrange"""
@@ -487,10 +549,19 @@ class ModeladoSimulacionGUI:
             
             # Función original (opcional)
             fx_original = self.fx_original_var.get().strip() if self.fx_original_var.get().strip() else None
-            
-            # Calcular interpolación
-            P, resultado_texto = self.lagrange_interpolante(pares, fx_original)
-            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en el cálculo: {e}")
+            return
+
+        # La interpolación simbólica corre en segundo plano (sympy no verifica la
+        # cancelación: Cancelar descarta el resultado)
+        self.ejecutor.lanzar("lagrange", lambda control=None: self.lagrange_interpolante(pares, fx_original),
+                             al_terminar=lambda res: self._mostrar_lagrange(pares, *res),
+                             al_error=lambda e: messagebox.showerror("Error", f"Error en el cálculo: {e}"),
+                             barra=self.barra_lagrange)
+
+    def _mostrar_lagrange(self, pares, P, resultado_texto):
+        try:
             # Mostrar resultados
             self.resultado_text.delete(1.0, tk.END)
             self.resultado_text.insert(tk.END, resultado_texto)
@@ -504,8 +575,7 @@ class ModeladoSimulacionGUI:
     def limpiar_lagrange(self):
         """Limpiar resultados de Lagrange"""
         self.resultado_text.delete(1.0, tk.END)
-        self.ax_lagrange.clear()
-        self.canvas_lagrange.draw()
+        self.grafico_lagrange.limpiar()
     
     def init_integracion_tab(self):
         """Inicializar la pestaña de integración numérica"""
@@ -566,9 +636,15 @@ class ModeladoSimulacionGUI:
         self.iter_mc_var.trace('w', self.on_parameter_change)
         ttk.Entry(left_frame, textvariable=self.iter_mc_var, width=10).grid(row=6, column=1, sticky='w', pady=2)
         
+        # Nivel de confianza Monte Carlo
+        ttk.Label(left_frame, text="Confianza % (Monte Carlo):").grid(row=7, column=0, sticky='w', pady=2)
+        self.confianza_mc_var = tk.StringVar(value="95")
+        self.confianza_mc_var.trace('w', self.on_parameter_change)
+        ttk.Entry(left_frame, textvariable=self.confianza_mc_var, width=10).grid(row=7, column=1, sticky='w', pady=2)
+        
         # Métodos de integración
         methods_frame = ttk.LabelFrame(left_frame, text="Métodos de Integración", padding=5)
-        methods_frame.grid(row=7, column=0, columnspan=2, sticky='ew', pady=10)
+        methods_frame.grid(row=8, column=0, columnspan=2, sticky='ew', pady=10)
         
         # Botones de métodos
         ttk.Button(methods_frame, text="Rectángulo\n(Grado 0)", command=lambda: self.calcular_integracion('rectangulo')).grid(row=0, column=0, padx=2, pady=2)
@@ -583,10 +659,12 @@ class ModeladoSimulacionGUI:
         
         # Botones de control
         control_frame = ttk.Frame(left_frame)
-        control_frame.grid(row=8, column=0, columnspan=2, pady=10)
+        control_frame.grid(row=9, column=0, columnspan=2, pady=10)
         ttk.Button(control_frame, text="Limpiar Tabla", command=self.limpiar_integracion).grid(row=0, column=0, padx=5)
         ttk.Button(control_frame, text="Ver Fórmulas", command=self.mostrar_formulas).grid(row=0, column=1, padx=5)
         ttk.Button(control_frame, text="Comparar Métodos", command=self.comparar_metodos).grid(row=0, column=2, padx=5)
+        self.barra_integ = BarraProgreso(left_frame, self.ejecutor, ["integracion", "comparar"], largo=150)
+        self.barra_integ.grid(row=10, column=0, columnspan=2, sticky='w')
         
         # Panel derecho - Visualización y resultados
         right_frame = ttk.Frame(main_frame)
@@ -601,6 +679,11 @@ class ModeladoSimulacionGUI:
         self.fig_integ, self.ax_integ = plt.subplots(figsize=(8, 4))
         self.canvas_integ = FigureCanvasTkAgg(self.fig_integ, master=graph_frame)
         self.canvas_integ.get_tk_widget().pack(fill='both', expand=True)
+        self.ax_integ.set_xlabel('x')
+        self.ax_integ.set_ylabel('f(x)')
+        self.ax_integ.grid(True, alpha=0.3)
+        self.ax_integ.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+        self.grafico_integ = GraficoIncremental(self.ax_integ, self.canvas_integ)
         
         # Tabla de resultados y estadísticas
         results_frame = ttk.LabelFrame(right_frame, text="Resultados Detallados - Monte Carlo", padding=5)
@@ -617,21 +700,9 @@ class ModeladoSimulacionGUI:
         self.results_notebook.add(puntos_frame, text="Puntos Muestreados")
         
         columns = ('i', 'x_i', 'f(x_i)')
-        self.tree_integ = ttk.Treeview(puntos_frame, columns=columns, show='headings', height=10)
-        
-        self.tree_integ.heading('i', text='i')
-        self.tree_integ.heading('x_i', text='x_i')
-        self.tree_integ.heading('f(x_i)', text='f(x_i)')
-        
-        self.tree_integ.column('i', width=50, anchor='center')
-        self.tree_integ.column('x_i', width=120, anchor='center')
-        self.tree_integ.column('f(x_i)', width=120, anchor='center')
-        
-        scrollbar_integ = ttk.Scrollbar(puntos_frame, orient="vertical", command=self.tree_integ.yview)
-        self.tree_integ.configure(yscrollcommand=scrollbar_integ.set)
-        
-        self.tree_integ.pack(side='left', fill='both', expand=True)
-        scrollbar_integ.pack(side='right', fill='y')
+        self.tabla_integ = TablaVirtual(puntos_frame, columns, alto=10, ancho_columna=120)
+        self.tabla_integ.tree.column('i', width=50, anchor='center')
+        self.tabla_integ.pack(side='left', fill='both', expand=True)
         
         # Pestaña de estadísticas
         stats_frame = ttk.Frame(self.results_notebook)
@@ -715,36 +786,36 @@ class ModeladoSimulacionGUI:
         
         return (2 * h / 45) * suma
     
-    def monte_carlo(self, f, a, b, n, semilla=None):
-        """Método de Monte Carlo con análisis estadístico"""
-        if semilla:
-            random.seed(semilla)
+    def monte_carlo(self, f, a, b, n, semilla=None, nivel_confianza=0.95):
+        """Método de Monte Carlo con análisis estadístico.
+
+        f se evalúa sobre bloques de puntos (ver safe_lambda_np); media y varianza
+        salen de la misma pasada, sin guardar las n muestras.
+        """
+        if n < 2:
+            raise ValueError("Se necesitan al menos 2 muestras")
+        # Generador local: no altera el estado global de NumPy
+        rng = np.random.default_rng(semilla)
+        acc = AcumuladorMC(tam_reservorio=0, rng=rng)
         
         puntos = []
-        valores_fx = []
-        suma = 0
-        
-        for i in range(n):
-            x = random.uniform(a, b)
-            fx = f(x)
-            valores_fx.append(fx)
-            suma += fx
-            if i < 10:  # Guardar primeros 10 puntos para mostrar
-                puntos.append((i+1, x, fx))
+        for m in bloques(n):
+            xs = rng.uniform(a, b, m)
+            fxs = np.broadcast_to(np.asarray(f(xs), dtype=float), xs.shape)
+            if not puntos:  # Guardar primeros 10 puntos para mostrar
+                puntos = [(i+1, float(xs[i]), float(fxs[i])) for i in range(min(10, m))]
+            acc.agregar(fxs)
         
         # Cálculos estadísticos
-        integral_estimada = (b - a) * suma / n
-        media_fx = suma / n
+        integral_estimada = (b - a) * acc.media
         
         # Desviación estándar de f(x)
-        varianza_fx = sum((fx - media_fx)**2 for fx in valores_fx) / (n - 1)
-        desviacion_estandar = math.sqrt(varianza_fx)
+        desviacion_estandar = acc.desviacion
         
         # Error estándar de la integral
         error_estandar = (b - a) * desviacion_estandar / math.sqrt(n)
         
-        # Intervalo de confianza (95% por defecto)
-        nivel_confianza = 0.95
+        # Intervalo de confianza
         alpha = 1 - nivel_confianza
         t_critico = t_critical(alpha/2, n - 1)
         
@@ -771,37 +842,57 @@ class ModeladoSimulacionGUI:
             a = float(self.a_var.get())
             b = float(self.b_var.get())
             n = int(self.n_var.get())
-            
-            # Crear función
-            f = safe_lambda(fx_expr)
-            
-            # Calcular según método
-            if metodo == 'rectangulo':
-                resultado = self.rectangulo_simple(f, a, b, n)
-                metodo_nombre = "Rectángulo (Punto Medio)"
-            elif metodo == 'trapezoidal':
-                resultado = self.trapezoidal_simple(f, a, b, n)
-                metodo_nombre = "Trapezoidal"
-            elif metodo == 'simpson13':
-                resultado = self.simpson_13(f, a, b, n)
-                metodo_nombre = "Simpson 1/3"
-            elif metodo == 'simpson38':
-                resultado = self.simpson_38(f, a, b, n)
-                metodo_nombre = "Simpson 3/8"
-            elif metodo == 'boole':
-                resultado = self.boole(f, a, b, n)
-                metodo_nombre = "Boole"
-            elif metodo == 'montecarlo':
+            opciones_mc = None
+            if metodo == 'montecarlo':
                 semilla = int(self.semilla_var.get()) if self.semilla_var.get() else None
-                n_mc = int(self.iter_mc_var.get())
-                resultado, puntos, estadisticas = self.monte_carlo(f, a, b, n_mc, semilla)
-                metodo_nombre = "Monte Carlo"
+                opciones_mc = (semilla, int(self.iter_mc_var.get()), float(self.confianza_mc_var.get()) / 100)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en el cálculo: {e}")
+            return
+
+        # El cálculo corre en segundo plano; otro método descarta el anterior
+        self.ejecutor.lanzar("integracion", self._integrar, metodo, fx_expr, a, b, n, opciones_mc,
+                             al_terminar=lambda res: self._mostrar_integracion(res, metodo, fx_expr, a, b, n),
+                             al_error=lambda e: messagebox.showerror("Error", f"Error en el cálculo: {e}"),
+                             barra=self.barra_integ)
+
+    def _integrar(self, metodo, fx_expr, a, b, n, opciones_mc, control=None):
+        """(resultado, nombre del método, puntos y estadísticas de Monte Carlo o None) sin tocar Tk"""
+        f = con_control(safe_lambda(fx_expr), control, n + 1)
+        puntos = estadisticas = None
+        # Calcular según método
+        if metodo == 'rectangulo':
+            resultado = self.rectangulo_simple(f, a, b, n)
+            metodo_nombre = "Rectángulo (Punto Medio)"
+        elif metodo == 'trapezoidal':
+            resultado = self.trapezoidal_simple(f, a, b, n)
+            metodo_nombre = "Trapezoidal"
+        elif metodo == 'simpson13':
+            resultado = self.simpson_13(f, a, b, n)
+            metodo_nombre = "Simpson 1/3"
+        elif metodo == 'simpson38':
+            resultado = self.simpson_38(f, a, b, n)
+            metodo_nombre = "Simpson 3/8"
+        elif metodo == 'boole':
+            resultado = self.boole(f, a, b, n)
+            metodo_nombre = "Boole"
+        elif metodo == 'montecarlo':
+            semilla, n_mc, confianza = opciones_mc
+            f_np = con_control(safe_lambda_np(fx_expr), control, n_mc)
+            resultado, puntos, estadisticas = self.monte_carlo(f_np, a, b, n_mc, semilla, confianza)
+            metodo_nombre = "Monte Carlo"
+        else:
+            resultado = 0
+            metodo_nombre = "Desconocido"
+        return resultado, metodo_nombre, puntos, estadisticas
+
+    def _mostrar_integracion(self, res, metodo, fx_expr, a, b, n):
+        resultado, metodo_nombre, puntos, estadisticas = res
+        try:
+            if metodo == 'montecarlo':
                 self.mostrar_puntos_mc(puntos)
                 self.mostrar_estadisticas_mc(estadisticas, fx_expr)
-            else:
-                resultado = 0
-                metodo_nombre = "Desconocido"
-            
+
             # Mostrar resultado
             if metodo == 'montecarlo':
                 self.resultado_integ_var.set(f"∫ {fx_expr} dx = {resultado:.6f} ± {estadisticas['error_estandar']:.6f} ({metodo_nombre})")
@@ -815,20 +906,17 @@ class ModeladoSimulacionGUI:
             self.actualizar_parametros_guardados()
             
             # Graficar
-            self.graficar_integracion(f, a, b, n, metodo, fx_expr)
+            self.graficar_integracion(safe_lambda(fx_expr), a, b, n, metodo, fx_expr)
             
         except Exception as e:
             messagebox.showerror("Error", f"Error en el cálculo: {e}")
     
     def mostrar_puntos_mc(self, puntos):
         """Mostrar puntos de Monte Carlo en la tabla"""
-        # Limpiar tabla
-        for item in self.tree_integ.get_children():
-            self.tree_integ.delete(item)
-        
-        # Agregar puntos
-        for i, x, fx in puntos:
-            self.tree_integ.insert('', 'end', values=(i, f"{x:.6f}", f"{fx:.6f}"))
+        # Las celdas se formatean sólo al mostrarse
+        indices, xs, fxs = zip(*puntos) if puntos else ((), (), ())
+        self.tabla_integ.cargar([np.array(indices, dtype=int), np.array(xs), np.array(fxs)],
+                                [None, "{:.6f}", "{:.6f}"])
     
     def mostrar_estadisticas_mc(self, estadisticas, fx_expr):
         """Mostrar análisis estadístico de Monte Carlo"""
@@ -919,7 +1007,8 @@ funciones suaves.
                 'n': self.n_var.get(),
                 'tol': self.tol_integ_var.get(),
                 'semilla': self.semilla_var.get(),
-                'iter_mc': self.iter_mc_var.get()
+                'iter_mc': self.iter_mc_var.get(),
+                'confianza_mc': self.confianza_mc_var.get()
             }
         except:
             return {}
@@ -965,66 +1054,65 @@ NOTA: Los gráficos y tablas también pueden estar obsoletos.
     
     def graficar_integracion(self, f, a, b, n, metodo, fx_expr):
         """Graficar función y método de integración"""
-        self.ax_integ.clear()
+        g = self.grafico_integ
+        g.ocultar_todos()
         
         # Generar puntos para la función
         x_vals = np.linspace(a, b, 1000)
         y_vals = [f(x) for x in x_vals]
         
         # Graficar función
-        self.ax_integ.plot(x_vals, y_vals, 'b-', linewidth=2, label=f'f(x) = {fx_expr}')
+        g.linea('f', x_vals, y_vals, color='b', linestyle='-', linewidth=2, label=f'f(x) = {fx_expr}')
         
         # Área bajo la curva
-        self.ax_integ.fill_between(x_vals, y_vals, alpha=0.3, color='lightblue')
+        g.relleno('area', x_vals, y_vals, alpha=0.3, color='lightblue')
         
         # Mostrar subdivisiones para métodos determinísticos
         if metodo != 'montecarlo':
             h = (b - a) / n
-            x_points = [a + i * h for i in range(n + 1)]
+            # Solo algunas subdivisiones para no saturar
+            step = max(1, n // 20)
             
             if metodo == 'rectangulo':
-                # Mostrar rectángulos (solo algunos para no saturar)
-                step = max(1, n // 20)
+                # Rectángulos como una sola colección de polígonos
+                rectangulos = []
                 for i in range(0, n, step):
                     x_mid = a + (i + 0.5) * h
                     height = f(x_mid)
-                    self.ax_integ.bar(x_mid, height, width=h*0.8, alpha=0.5, color='red', edgecolor='darkred')
+                    x1, x2 = x_mid - 0.4 * h, x_mid + 0.4 * h
+                    rectangulos.append([(x1, 0), (x2, 0), (x2, height), (x1, height)])
+                g.poligonos('rectangulos', rectangulos, alpha=0.5, facecolor='red', edgecolor='darkred')
             
             elif metodo == 'trapezoidal':
-                # Mostrar trapezoides (solo algunos)
-                step = max(1, n // 20)
+                # Trapecios como una sola línea, separados por NaN
+                tx, ty = [], []
                 for i in range(0, n, step):
                     x1, x2 = a + i * h, a + (i + 1) * h
                     y1, y2 = f(x1), f(x2)
-                    self.ax_integ.plot([x1, x2, x2, x1, x1], [0, 0, y2, y1, 0], 'r-', alpha=0.7)
+                    tx += [x1, x2, x2, x1, x1, np.nan]
+                    ty += [0, 0, y2, y1, 0, np.nan]
+                g.linea('trapecios', tx, ty, color='r', linestyle='-', alpha=0.7)
         
         else:
             # Para Monte Carlo, mostrar algunos puntos aleatorios
-            random.seed(int(self.semilla_var.get()) if self.semilla_var.get() else None)
-            x_random = [random.uniform(a, b) for _ in range(min(50, int(self.iter_mc_var.get())))]
+            rng = random.Random(int(self.semilla_var.get()) if self.semilla_var.get() else None)
+            x_random = [rng.uniform(a, b) for _ in range(min(50, int(self.iter_mc_var.get())))]
             y_random = [f(x) for x in x_random]
-            self.ax_integ.scatter(x_random, y_random, c='red', s=10, alpha=0.6, label='Puntos Monte Carlo')
-        
-        # Configurar gráfico
-        self.ax_integ.set_xlabel('x')
-        self.ax_integ.set_ylabel('f(x)')
-        self.ax_integ.set_title(f'Integración Numérica - {metodo.title()}')
-        self.ax_integ.grid(True, alpha=0.3)
-        self.ax_integ.legend()
-        self.ax_integ.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+            g.puntos('mc', x_random, y_random, color='red', s=10, alpha=0.6, label='Puntos Monte Carlo')
         
-        self.canvas_integ.draw()
+        g.titulo(f'Integración Numérica - {metodo.title()}')
+        g.autoescalar()
+        g.leyenda()
+        g.actualizar()
     
     def limpiar_integracion(self):
         """Limpiar resultados de integración"""
-        for item in self.tree_integ.get_children():
-            self.tree_integ.delete(item)
+        self.tabla_integ.limpiar()
         self.stats_text.delete(1.0, tk.END)
         self.stats_text.insert(tk.END, "Seleccione un método de integración para ver los resultados aquí.")
         self.stats_text.config(state='disabled')
         self.resultado_integ_var.set("Resultado: -")
-        self.ax_integ.clear()
-        self.canvas_integ.draw()
+        self.grafico_integ.limpiar()
     
     def mostrar_formulas(self):
         """Mostrar fórmulas de integración"""
@@ -1066,24 +1154,39 @@ FÓRMULAS DE INTEGRACIÓN NUMÉRICA
             a = float(self.a_var.get())
             b = float(self.b_var.get())
             n = int(self.n_var.get())
-            f = safe_lambda(fx_expr)
-            
-            # Calcular con todos los métodos
-            resultados = {}
-            resultados['Rectángulo'] = self.rectangulo_simple(f, a, b, n)
-            resultados['Trapezoidal'] = self.trapezoidal_simple(f, a, b, n)
-            resultados['Simpson 1/3'] = self.simpson_13(f, a, b, n)
-            resultados['Simpson 3/8'] = self.simpson_38(f, a, b, n)
-            resultados['Boole'] = self.boole(f, a, b, n)
-            
-            # Monte Carlo (promedio de 5 ejecuciones)
-            mc_results = []
-            for _ in range(5):
-                resultado, _, _ = self.monte_carlo(f, a, b, int(self.iter_mc_var.get()))
-                mc_results.append(resultado)
-            resultados['Monte Carlo (promedio)'] = np.mean(mc_results)
-            resultados['Monte Carlo (desv. std)'] = np.std(mc_results)
-            
+            n_mc = int(self.iter_mc_var.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en la comparación: {e}")
+            return
+        self.ejecutor.lanzar("comparar", self._comparar, fx_expr, a, b, n, n_mc,
+                             al_terminar=lambda res: self._mostrar_comparacion(res, fx_expr, a, b),
+                             al_error=lambda e: messagebox.showerror("Error", f"Error en la comparación: {e}"),
+                             barra=self.barra_integ)
+
+    def _comparar(self, fx_expr, a, b, n, n_mc, control=None):
+        """{método: valor} con todos los métodos (sin tocar Tk)"""
+        f = con_control(safe_lambda(fx_expr), control, 5 * (n + 1))
+
+        # Calcular con todos los métodos
+        resultados = {}
+        resultados['Rectángulo'] = self.rectangulo_simple(f, a, b, n)
+        resultados['Trapezoidal'] = self.trapezoidal_simple(f, a, b, n)
+        resultados['Simpson 1/3'] = self.simpson_13(f, a, b, n)
+        resultados['Simpson 3/8'] = self.simpson_38(f, a, b, n)
+        resultados['Boole'] = self.boole(f, a, b, n)
+
+        # Monte Carlo (promedio de 5 ejecuciones)
+        mc_results = []
+        f_np = con_control(safe_lambda_np(fx_expr), control, 5 * n_mc)
+        for _ in range(5):
+            resultado, _, _ = self.monte_carlo(f_np, a, b, n_mc)
+            mc_results.append(resultado)
+        resultados['Monte Carlo (promedio)'] = np.mean(mc_results)
+        resultados['Monte Carlo (desv. std)'] = np.std(mc_results)
+        return resultados
+
+    def _mostrar_comparacion(self, resultados, fx_expr, a, b):
+        try:
             # Mostrar comparación
             comp_text = f"COMPARACIÓN DE MÉTODOS\nFunción: {fx_expr}\nIntervalo: [{a}, {b}]\n\n"
             for metodo, valor in resultados.items():
@@ -1108,10 +1211,11 @@ import sys
 def main():
     root = tk.Tk()
     def on_closing():
+        app.ejecutor.cerrar()
         root.destroy()
         sys.exit(0)
     root.protocol("WM_DELETE_WINDOW", on_closing)
-    ModeladoSimulacionGUI(root)
+    app = ModeladoSimulacionGUI(root)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -23,6 +23,9 @@ from typing import List, Tuple, Optional
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+from ejecutor_tareas import BarraProgreso, EjecutorTareas
+from tabla_virtual import TablaVirtual
+
 # ========================= Utilidades seguras ========================= #
 
 ALLOWED_NAMES = {
@@ -96,6 +99,7 @@ class LagrangeApp(ttk.Frame):
         super().__init__(master)
         self.pack(fill="both", expand=True)
         master.title("Simulador – Lagrange, Errores y Derivación (1D) + Gradiente (2D)")
+        self.ejecutor = EjecutorTareas(self)
         self._build_ui()
         self.last_grid = None
 
@@ -178,6 +182,8 @@ class LagrangeApp(ttk.Frame):
 
         # Acciones
         ttk.Button(left, text="Construir Lagrange y Graficar", command=self.build_and_plot).pack(fill="x", pady=6)
+        self.barra_progreso = BarraProgreso(left, self.ejecutor, "lagrange", largo=120)
+        self.barra_progreso.pack(fill="x")
         ttk.Button(left, text="Ver Tabla de Malla", command=self.show_mesh_table).pack(fill="x", pady=2)
         ttk.Button(left, text="Exportar CSV (malla)", command=self.export_csv).pack(fill="x")
 
@@ -312,21 +318,14 @@ class LagrangeApp(ttk.Frame):
         if fx_vals is not None:
             columns = ("x", "P(x)", "f(x)", "Error")
             
-        tree = ttk.Treeview(table_window, columns=columns, show="headings")
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=120, anchor="center")
-            
+        # Tabla virtualizada: la malla puede tener muchos puntos
+        tabla = TablaVirtual(table_window, columns, alto=25, ancho_columna=120)
         if fx_vals is not None:
-            for xv, pv, fv in zip(xq, yq, fx_vals):
-                error = abs(fv - pv)
-                tree.insert("", "end", values=(f"{xv:.6g}", f"{pv:.6g}", f"{fv:.6g}", f"{error:.6g}"))
+            tabla.cargar([xq, yq, fx_vals, np.abs(np.asarray(fx_vals) - np.asarray(yq))])
         else:
-            for xv, pv in zip(xq, yq):
-                tree.insert("", "end", values=(f"{xv:.6g}", f"{pv:.6g}"))
+            tabla.cargar([xq, yq])
                 
-        tree.pack(expand=True, fill="both")
+        tabla.pack(expand=True, fill="both")
 
     # ---------- Acciones principales ---------- #
     def build_and_plot(self):
@@ -337,79 +336,99 @@ class LagrangeApp(ttk.Frame):
             x_min = float(self.xmin_e.get()); x_max = float(self.xmax_e.get()); npts = int(self.npts_e.get())
             if x_max <= x_min:
                 raise ValueError("x_max debe ser mayor que x_min.")
-            xq = np.linspace(x_min, x_max, npts)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
 
-            # Polinomio simbólico
-            poly = lagrange_symbolic(xs, ys)
-            self.poly_text.delete('1.0', 'end')
-            self.poly_text.insert('end', f"Polinomio de Lagrange (grado {len(xs)-1}):\nP(x) = {sp.simplify(poly)}\n")
+        # Simplificación simbólica y evaluación en la malla en segundo plano
+        self.ejecutor.lanzar("lagrange", self._calcular_lagrange, xs, ys, x_min, x_max, npts,
+                             self.fx_entry.get().strip(), self.fx_der_entry.get().strip(),
+                             al_terminar=lambda res: self._mostrar_lagrange(res, xs, ys, npts),
+                             barra=self.barra_progreso)
 
-            # Evaluación numérica estable
-            yq = interp_eval(xs, ys, xq)
+    def _calcular_lagrange(self, xs, ys, x_min, x_max, npts, fx_expr, fx_der_expr, control=None):
+        """Polinomio, malla y errores (sin tocar Tk); los avisos se devuelven como texto"""
+        xq = np.linspace(x_min, x_max, npts)
 
-            # Posible función verdadera y derivada para errores
-            fx_expr = self.fx_entry.get().strip()
-            fx_vals = None
-            err_global_malla = None
-            err_global_teorico = None
-            
-            if fx_expr:
-                try:
-                    fx_vals = np.array([safe_eval(fx_expr, xv) for xv in xq])
-                    err_malla = fx_vals - yq
-                    err_global_malla = np.max(np.abs(err_malla))
-                    
-                    self.poly_text.insert('end', f"\nError Global (malla {npts}): {err_global_malla:.6g}\n")
-                    
-                    fx_der_expr = self.fx_der_entry.get().strip()
-                    if fx_der_expr:
-                        x = sp.Symbol('x', real=True)
-                        f_der_sym = sp.sympify(fx_der_expr)
-                        f_der_lamb = sp.lambdify(x, f_der_sym, 'numpy')
-
-                        # Calcular el término del producto de las diferencias
-                        prod_term = np.ones_like(xq)
-                        for xi in xs:
-                            prod_term *= (xq - xi)
-                        
-                        # Calcular la derivada en la malla
-                        der_vals = f_der_lamb(xq)
-                        max_der_abs = np.max(np.abs(der_vals))
-                        
-                        # Calcular el error teórico máximo
-                        n = len(xs) - 1
-                        theo_error = (max_der_abs / math.factorial(n + 1)) * np.abs(prod_term)
-                        err_global_teorico = np.max(theo_error)
-                        
-                        self.poly_text.insert('end', f"Error Global Teórico (cota): {err_global_teorico:.6g}\n")
-                        self.ax.plot(xq, theo_error, 'r--', label='Cota de Error Teórico')
-                        
-                except Exception as e:
-                    messagebox.showwarning("Aviso", f"No se pudo evaluar f(x) o su derivada: {e}")
-
-            # Graficar
-            self.ax.clear(); self.ax.grid(True, ls=':')
-            self.ax.plot(xq, yq, label='Interpolación P(x)')
-            self.ax.plot(xs, ys, 'o', label='Datos (x_i, y_i)')
-            if fx_vals is not None:
-                self.ax.plot(xq, fx_vals, '--', label='f(x) verdadera')
-            self.ax.set_xlabel('x'); self.ax.set_ylabel('y')
-            self.ax.set_title('Reconstrucción por Lagrange')
-            self.ax.legend(loc='best')
-            self.canvas.draw()
+        # Polinomio simbólico
+        if control is not None: control.progreso(None, "Polinomio simbólico...")
+        poly = sp.simplify(lagrange_symbolic(xs, ys))
 
-            # Errores locales (en los nodos de malla xq si hay f)
-            if fx_vals is not None:
-                idx_mid = np.linspace(0, len(xq)-1, min(10, len(xq)), dtype=int)
-                resumen = [f"x={xq[i]:.3g}, |err|={abs(fx_vals[i]-yq[i]):.3g}" for i in idx_mid]
-                self.err_label.config(text="Errores (muestra):\n" + "\n".join(resumen))
-            else:
-                self.err_label.config(text="Errores: (ingresá f(x) para calcular)")
+        # Evaluación numérica estable
+        yq = interp_eval(xs, ys, xq)
 
-            self.last_grid = (xq, yq, fx_vals)
+        # Posible función verdadera y derivada para errores
+        fx_vals = None
+        err_global_malla = None
+        theo_error = None
+        aviso = None
+        
+        if fx_expr:
+            try:
+                fx_vals = np.empty(npts)
+                for i, xv in enumerate(xq):
+                    fx_vals[i] = safe_eval(fx_expr, xv)
+                    if control is not None: control.progreso((i + 1) / npts, "Evaluando f(x)")
+                err_malla = fx_vals - yq
+                err_global_malla = np.max(np.abs(err_malla))
+                
+                if fx_der_expr:
+                    x = sp.Symbol('x', real=True)
+                    f_der_sym = sp.sympify(fx_der_expr)
+                    f_der_lamb = sp.lambdify(x, f_der_sym, 'numpy')
+
+                    # Calcular el término del producto de las diferencias
+                    prod_term = np.ones_like(xq)
+                    for xi in xs:
+                        prod_term *= (xq - xi)
+                    
+                    # Calcular la derivada en la malla
+                    der_vals = f_der_lamb(xq)
+                    max_der_abs = np.max(np.abs(der_vals))
+                    
+                    # Calcular el error teórico máximo
+                    n = len(xs) - 1
+                    theo_error = (max_der_abs / math.factorial(n + 1)) * np.abs(prod_term)
+                    
+            except Exception as e:
+                aviso = f"No se pudo evaluar f(x) o su derivada: {e}"
+                if fx_vals is not None and err_global_malla is None:
+                    fx_vals = None
+        return poly, xq, yq, fx_vals, err_global_malla, theo_error, aviso
+
+    def _mostrar_lagrange(self, res, xs, ys, npts):
+        poly, xq, yq, fx_vals, err_global_malla, theo_error, aviso = res
+        self.poly_text.delete('1.0', 'end')
+        self.poly_text.insert('end', f"Polinomio de Lagrange (grado {len(xs)-1}):\nP(x) = {poly}\n")
+        if err_global_malla is not None:
+            self.poly_text.insert('end', f"\nError Global (malla {npts}): {err_global_malla:.6g}\n")
+        if theo_error is not None:
+            self.poly_text.insert('end', f"Error Global Teórico (cota): {np.max(theo_error):.6g}\n")
+        if aviso is not None:
+            messagebox.showwarning("Aviso", aviso)
+
+        # Graficar
+        self.ax.clear(); self.ax.grid(True, ls=':')
+        self.ax.plot(xq, yq, label='Interpolación P(x)')
+        self.ax.plot(xs, ys, 'o', label='Datos (x_i, y_i)')
+        if fx_vals is not None:
+            self.ax.plot(xq, fx_vals, '--', label='f(x) verdadera')
+        if theo_error is not None:
+            self.ax.plot(xq, theo_error, 'r--', label='Cota de Error Teórico')
+        self.ax.set_xlabel('x'); self.ax.set_ylabel('y')
+        self.ax.set_title('Reconstrucción por Lagrange')
+        self.ax.legend(loc='best')
+        self.canvas.draw()
+
+        # Errores locales (en los nodos de malla xq si hay f)
+        if fx_vals is not None:
+            idx_mid = np.linspace(0, len(xq)-1, min(10, len(xq)), dtype=int)
+            resumen = [f"x={xq[i]:.3g}, |err|={abs(fx_vals[i]-yq[i]):.3g}" for i in idx_mid]
+            self.err_label.config(text="Errores (muestra):\n" + "\n".join(resumen))
+        else:
+            self.err_label.config(text="Errores: (ingresá f(x) para calcular)")
 
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        self.last_grid = (xq, yq, fx_vals)
 
     def export_csv(self):
         if not hasattr(self, 'last_grid'):
@@ -5,22 +5,57 @@ import numpy as np
 import sympy as sp
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
+from edo_engine import (ACCIONES_EVENTO, ESCALAR, METODOS_ADAPTATIVOS, METODOS_RK, ORDEN_SUPERIOR, REGISTRAR,
+                        SISTEMA, TERMINAR, TIPOS_PROBLEMA, integrar_adaptativo, integrar_rk, integrar_rk_fusionado,
+                        preparar_ensamble, preparar_eventos, preparar_problema)
+from edo_analitica import TIEMPO_MAX_DSOLVE, CacheSoluciones, compilar_solucion, resolver_analitica
+from edo_ensamble import integrar_ensamble_adaptativo, integrar_ensamble_rk
+from edo_estudio import estudiar_metodos
+from edo_rigidos import METODOS_IMPLICITOS, integrar_implicito
+from ejecutor_tareas import BarraProgreso, EjecutorTareas
+from grafico_incremental import GraficoIncremental
+from tabla_virtual import TablaVirtual, formato_error
 
 class RungeKuttaPro:
     def __init__(self, root):
         self.root = root
         self.root.title("Simulador Runge-Kutta Profesional")
         self.root.geometry("1500x900")
+        # Solución exacta: expresión de sympy y su versión compilada para arreglos de t
         self.solution_expr = None
+        self.solucion_exacta = None
+        self.cache_soluciones = CacheSoluciones()
+        # Última comparación de métodos: (entradas, (t, {método: y})) para graficar y tabular
+        self._comparacion_cache = None
         self.show_rk4_table = tk.BooleanVar(value=False)
 
         # Variables
         self.func_str = tk.StringVar(value="t - y")
         self.t0 = tk.DoubleVar(value=0.0)
-        self.y0 = tk.DoubleVar(value=1.0)
+        # y0 admite varios valores separados por comas (sistemas y orden superior)
+        self.y0 = tk.StringVar(value="1.0")
         self.t_end = tk.DoubleVar(value=5.0)
         self.h = tk.DoubleVar(value=0.1)
         self.method = tk.StringVar(value="RK4")
+        self.tipo = tk.StringVar(value=ESCALAR)
+        self.variables = tk.StringVar(value="y")
+        # Tolerancias de los métodos adaptativos (DP45, BS23)
+        self.rtol = tk.DoubleVar(value=1e-6)
+        self.atol = tk.DoubleVar(value=1e-9)
+        # Jacobiano de los métodos implícitos
+        self.jacobiano = tk.StringVar(value="Simbólico")
+        # Ensamble: y0 con ruido normal y un parámetro uniforme por miembro
+        self.ens_miembros = tk.IntVar(value=1000)
+        self.ens_sigma = tk.DoubleVar(value=0.1)
+        self.ens_parametro = tk.StringVar(value="")
+        self.ens_pmin = tk.DoubleVar(value=0.8)
+        self.ens_pmax = tk.DoubleVar(value=1.2)
+        self.ens_guardar = tk.BooleanVar(value=False)
+        # Eventos g(t, y) = 0 separados por ';' (vacío: sin eventos)
+        self.eventos = tk.StringVar(value="")
+        self.accion_evento = tk.StringVar(value=REGISTRAR)
+        self.direccion_evento = tk.StringVar(value="Ambas")
 
         self.create_widgets()
 
@@ -29,19 +64,20 @@ class RungeKuttaPro:
         frame_in = tk.LabelFrame(self.root, text="Parámetros de Entrada", padx=5, pady=5)
         frame_in.pack(fill="x", padx=10, pady=5)
 
-        tk.Label(frame_in, text="f(t,y)=").grid(row=0,column=0)
+        self.label_f = tk.Label(frame_in, text="f(t,y)=")
+        self.label_f.grid(row=0,column=0)
         tk.Entry(frame_in,textvariable=self.func_str,width=15).grid(row=0,column=1)
         tk.Label(frame_in, text="t0").grid(row=0,column=2)
         tk.Entry(frame_in,textvariable=self.t0,width=6).grid(row=0,column=3)
         tk.Label(frame_in, text="y0").grid(row=0,column=4)
-        tk.Entry(frame_in,textvariable=self.y0,width=6).grid(row=0,column=5)
+        tk.Entry(frame_in,textvariable=self.y0,width=10).grid(row=0,column=5)
         tk.Label(frame_in, text="t_end").grid(row=0,column=6)
         tk.Entry(frame_in,textvariable=self.t_end,width=6).grid(row=0,column=7)
         tk.Label(frame_in, text="h").grid(row=0,column=8)
         tk.Entry(frame_in,textvariable=self.h,width=6).grid(row=0,column=9)
         tk.Label(frame_in, text="Método").grid(row=0,column=10)
-        ttk.Combobox(frame_in,textvariable=self.method, values=["Euler","Heun","Midpoint","RK2","Ralston","RK4"],width=10).grid(row=0,column=11)
-        tk.Checkbutton(frame_in,text="Mostrar Pendientes RK4",variable=self.show_rk4_table).grid(row=0,column=12)
+        ttk.Combobox(frame_in,textvariable=self.method, values=self._metodos(),width=14).grid(row=0,column=11)
+        tk.Checkbutton(frame_in,text="Mostrar Pendientes",variable=self.show_rk4_table).grid(row=0,column=12)
 
         tk.Button(frame_in,text="Calcular",bg="#4CAF50",fg="white",command=self.solve).grid(row=0,column=13,padx=3)
         tk.Button(frame_in,text="Ayuda",bg="#2196F3",fg="white",command=self.show_help).grid(row=0,column=14,padx=3)
@@ -49,6 +85,46 @@ class RungeKuttaPro:
         tk.Button(frame_in,text="Calcular Solución Analítica",bg="#9C27B0",fg="white",command=self.calc_analytical).grid(row=0,column=16,padx=3)
         tk.Button(frame_in,text="Graficar Todos los Métodos",bg="#FF5722",fg="white",command=self.compare_methods).grid(row=0,column=17,padx=3)
         tk.Button(frame_in,text="Tabla Comparativa",bg="#9E9E9E",fg="white",command=self.generate_comparative_table).grid(row=0,column=18,padx=3)
+        tk.Label(frame_in, text="Tipo").grid(row=1,column=0)
+        tipo_box = ttk.Combobox(frame_in,textvariable=self.tipo,values=TIPOS_PROBLEMA,width=14,state="readonly")
+        tipo_box.grid(row=1,column=1)
+        tipo_box.bind("<<ComboboxSelected>>", self._cambiar_tipo)
+        tk.Label(frame_in, text="Variables").grid(row=1,column=2)
+        tk.Entry(frame_in,textvariable=self.variables,width=10).grid(row=1,column=3,columnspan=2)
+        tk.Label(frame_in, text="Jacobiano").grid(row=1,column=5)
+        ttk.Combobox(frame_in,textvariable=self.jacobiano,values=("Simbólico","Diferencias finitas"),width=16,
+                     state="readonly").grid(row=1,column=6,columnspan=2)
+        tk.Label(frame_in, text="rtol").grid(row=1,column=8)
+        tk.Entry(frame_in,textvariable=self.rtol,width=6).grid(row=1,column=9)
+        tk.Label(frame_in, text="atol").grid(row=1,column=10)
+        tk.Entry(frame_in,textvariable=self.atol,width=6).grid(row=1,column=11)
+        tk.Label(frame_in, text="(métodos adaptativos: h no se usa)").grid(row=1,column=12,columnspan=3,sticky="w")
+        tk.Label(frame_in, text="Ensamble: miembros").grid(row=2,column=0)
+        tk.Entry(frame_in,textvariable=self.ens_miembros,width=8).grid(row=2,column=1)
+        tk.Label(frame_in, text="σ(y0)").grid(row=2,column=2)
+        tk.Entry(frame_in,textvariable=self.ens_sigma,width=6).grid(row=2,column=3)
+        tk.Label(frame_in, text="Parámetro").grid(row=2,column=4)
+        tk.Entry(frame_in,textvariable=self.ens_parametro,width=6).grid(row=2,column=5)
+        tk.Label(frame_in, text="de").grid(row=2,column=6)
+        tk.Entry(frame_in,textvariable=self.ens_pmin,width=6).grid(row=2,column=7)
+        tk.Label(frame_in, text="a").grid(row=2,column=8)
+        tk.Entry(frame_in,textvariable=self.ens_pmax,width=6).grid(row=2,column=9)
+        tk.Checkbutton(frame_in,text="Guardar miembros",variable=self.ens_guardar).grid(row=2,column=10,columnspan=2)
+        tk.Button(frame_in,text="Simular Ensamble",bg="#607D8B",fg="white",command=self.simulate_ensemble).grid(row=2,column=12,padx=3)
+        tk.Label(frame_in, text="Eventos g=0").grid(row=3,column=0)
+        tk.Entry(frame_in,textvariable=self.eventos,width=15).grid(row=3,column=1)
+        tk.Label(frame_in, text="Al cruzar").grid(row=3,column=2)
+        ttk.Combobox(frame_in,textvariable=self.accion_evento,values=ACCIONES_EVENTO,width=10,
+                     state="readonly").grid(row=3,column=3,columnspan=2)
+        tk.Label(frame_in, text="Dirección").grid(row=3,column=5)
+        ttk.Combobox(frame_in,textvariable=self.direccion_evento,values=tuple(self.DIRECCIONES),width=10,
+                     state="readonly").grid(row=3,column=6,columnspan=2)
+        tk.Button(frame_in,text="Estudio de Convergencia",bg="#795548",fg="white",command=self.convergence_study).grid(row=2,column=13,columnspan=2,padx=3)
+
+        # Cálculo en segundo plano con progreso y cancelación
+        self.ejecutor = EjecutorTareas(self.root)
+        self.barra_progreso = BarraProgreso(self.root, self.ejecutor, ["solve", "analitica", "estudio", "comparar"])
+        self.barra_progreso.pack(fill="x", padx=10)
 
         # --- PanedWindow principal ---
         self.paned = tk.PanedWindow(self.root, orient="horizontal", sashrelief="sunken")
@@ -58,37 +134,24 @@ class RungeKuttaPro:
         self.tab_frame = ttk.Notebook(self.paned)
         self.paned.add(self.tab_frame, stretch="always")
 
+        # Tablas virtualizadas: sólo se crean y formatean las filas visibles
         # Tabla normal
         self.table_frame = tk.Frame(self.tab_frame)
         self.tab_frame.add(self.table_frame,text="Tabla Normal")
-        self.table_scroll = ttk.Scrollbar(self.table_frame, orient="horizontal")
-        self.table_scroll.pack(side="bottom",fill="x")
-        self.table = ttk.Treeview(self.table_frame, columns=("n","t","y_num","y_exact","Error"),
-                                  show="headings", height=12, xscrollcommand=self.table_scroll.set)
+        self.table = TablaVirtual(self.table_frame, ["n","t","y_num","y_exact","Error"], alto=12)
         self.table.pack(fill="both", expand=True)
-        self.table_scroll.config(command=self.table.xview)
-        headers = ["n","t","y_num","y_exact","Error"]
-        for h in headers: self.table.heading(h,text=h); self.table.column(h,width=100,anchor="center")
 
         # Tabla comparativa
         self.comp_frame = tk.Frame(self.tab_frame)
         self.tab_frame.add(self.comp_frame,text="Tabla Comparativa")
-        self.comp_scroll = ttk.Scrollbar(self.comp_frame, orient="horizontal")
-        self.comp_scroll.pack(side="bottom",fill="x")
-        self.comp_table = ttk.Treeview(self.comp_frame, show="headings", height=12, xscrollcommand=self.comp_scroll.set)
+        self.comp_table = TablaVirtual(self.comp_frame, alto=12)
         self.comp_table.pack(fill="both", expand=True)
-        self.comp_table.configure(xscrollcommand=self.comp_scroll.set)
-        self.comp_scroll.config(command=self.comp_table.xview)
 
-        # Tabla RK4 pendientes
+        # Tabla de pendientes (etapas del método)
         self.rk4_frame = tk.Frame(self.tab_frame)
-        self.tab_frame.add(self.rk4_frame,text="Pendientes RK4")
-        self.rk4_scroll = ttk.Scrollbar(self.rk4_frame, orient="horizontal")
-        self.rk4_scroll.pack(side="bottom",fill="x")
-        self.rk4_table = ttk.Treeview(self.rk4_frame, show="headings", height=12, xscrollcommand=self.rk4_scroll.set)
+        self.tab_frame.add(self.rk4_frame,text="Pendientes")
+        self.rk4_table = TablaVirtual(self.rk4_frame, alto=12)
         self.rk4_table.pack(fill="both", expand=True)
-        self.rk4_table.configure(xscrollcommand=self.rk4_scroll.set)
-        self.rk4_scroll.config(command=self.rk4_table.xview)
 
         # --- Panel Gráfica ---
         self.plot_frame = tk.Frame(self.paned)
@@ -99,6 +162,11 @@ class RungeKuttaPro:
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.plot_frame)
         self.toolbar.update()
         self.canvas._tkcanvas.pack(fill="both", expand=True)
+        # Una línea persistente por método (y la exacta): cada corrida sólo cambia sus datos
+        self.ax.set_xlabel("t")
+        self.ax.set_ylabel("y(t)")
+        self.ax.grid(True)
+        self.grafico = GraficoIncremental(self.ax, self.canvas)
 
         # --- Panel Solución Analítica con renderizado LaTeX ---
         self.analytic_frame = tk.LabelFrame(self.root, text="Solución Analítica (LaTeX)", padx=5, pady=5)
@@ -109,170 +177,481 @@ class RungeKuttaPro:
         self.canvas_analytic.get_tk_widget().pack(fill="both", expand=True)
 
     # --- Funciones ---
-    def f(self,t,y):
-        t_sym,y_sym = sp.symbols("t y")
-        expr = sp.sympify(self.func_str.get())
-        f_lamb = sp.lambdify((t_sym,y_sym),expr,"numpy")
-        return f_lamb(t,y)
+    # Ejemplos que se cargan al cambiar el tipo de problema: (f, variables, y0, rótulo)
+    EJEMPLOS = {ESCALAR: ("t - y", "y", "1.0", "f(t,y)="),
+                SISTEMA: ("x - 0.5*x*y; 0.2*x*y - 0.6*y", "x y", "4, 2", "x', y', ... ="),
+                ORDEN_SUPERIOR: ("-y - 0.2*dy", "y", "1, 0", "y^(n)=")}
+
+    # Dirección de los cruces de los eventos: g de negativo a positivo (+1) o al revés (-1)
+    DIRECCIONES = {"Ambas": 0, "Subiendo": 1, "Bajando": -1}
+
+    def _cambiar_tipo(self, event=None):
+        f_str, variables, y0, rotulo = self.EJEMPLOS[self.tipo.get()]
+        self.func_str.set(f_str)
+        self.variables.set(variables)
+        self.y0.set(y0)
+        self.label_f.config(text=rotulo)
+        self._fijar_solucion(None)
+
+    def _problema(self):
+        """(f, y0, nombres, jac): f(t, y) y su jacobiano compilados una vez por expresión.
+
+        jac es None si se eligieron diferencias finitas (los implícitos las calculan solos).
+        """
+        f, y0, nombres, jac = preparar_problema(self.tipo.get(), self.func_str.get(), self.variables.get(),
+                                                self.y0.get(), jacobiano=True)
+        return f, y0, nombres, (jac if self.jacobiano.get() == "Simbólico" else None)
+
+    @staticmethod
+    def _principal(y):
+        """Primera componente (la incógnita y en orden superior); y si es escalar"""
+        return y if y.ndim == 1 else y[:, 0]
 
     def solve(self):
-        self.table.delete(*self.table.get_children())
-        t0, y0, t_end, h = self.t0.get(), self.y0.get(), self.t_end.get(), self.h.get()
-        n_steps = int((t_end-t0)/h)
-        t_values = [t0]; y_values = [y0]
-        rk4_pendientes = []
-
-        t,y = t0,y0
-        for i in range(n_steps):
-            if self.method.get()=="Euler": y+=h*self.f(t,y)
-            elif self.method.get()=="Heun": k1=self.f(t,y); k2=self.f(t+h,y+h*k1); y+=h*(k1+k2)/2
-            elif self.method.get()=="Midpoint": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); y+=h*k2
-            elif self.method.get()=="RK2": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); y+=h*k2
-            elif self.method.get()=="Ralston": k1=self.f(t,y); k2=self.f(t+3*h/4, y+3*h*k1/4); y+=h*(k1+k2/3)
-            elif self.method.get()=="RK4":
-                k1=self.f(t,y); k2=self.f(t+h/2, y+h*k1/2)
-                k3=self.f(t+h/2, y+h*k2/2); k4=self.f(t+h, y+h*k3)
-                y_next = y + (h/6)*(k1+2*k2+2*k3+k4)
-                if self.show_rk4_table.get(): rk4_pendientes.append([i,t,y,k1,k2,k3,k4,y_next])
-                y = y_next
-            t+=h; t_values.append(t); y_values.append(y)
+        self.table.limpiar()
+        try:
+            t0, t_end, h = self.t0.get(), self.t_end.get(), self.h.get()
+            f, y0, nombres, jac = self._problema()
+            method = self.method.get()
+            eventos = self._eventos()
+            if eventos and method in METODOS_IMPLICITOS:
+                raise ValueError("Los eventos se detectan con los métodos explícitos (de paso fijo o adaptativos)")
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        # Las pendientes se muestran sólo para RK explícitos y ecuaciones escalares
+        show_rk4 = self.show_rk4_table.get() and np.ndim(y0) == 0 and method in METODOS_RK
+        tolerancias = (self.rtol.get(), self.atol.get())
+        # La integración corre en segundo plano; Calcular otra vez descarta la anterior
+        self.ejecutor.lanzar("solve", self._integrar, f, method, t0, y0, t_end, h, show_rk4, self.solucion_exacta,
+                             tolerancias, jac, eventos,
+                             al_terminar=lambda res: self._mostrar_solucion(res, method, t0, t_end, show_rk4, nombres),
+                             barra=self.barra_progreso)
 
-        # Tabla normal
-        for i,(ti,yi) in enumerate(zip(t_values,y_values)):
-            y_exact_str, err_str = "-", "-"
-            if self.solution_expr is not None:
-                try:
-                    y_exact_val = float(self.solution_expr.subs("t",ti))
-                    err_val = abs(yi-y_exact_val)
-                    y_exact_str = f"{y_exact_val:.6f}"
-                    err_str = f"{err_val:.6e}" if err_val<1e-6 else f"{err_val:.6f}"
-                except: pass
-            self.table.insert("", "end", values=(i,f"{ti:.3f}",f"{yi:.6f}",y_exact_str,err_str))
-
-        # Tabla RK4 pendientes
-        if self.show_rk4_table.get() and rk4_pendientes:
-            self.rk4_table.delete(*self.rk4_table.get_children())
-            cols = ["n","t_n","y_n","k1","k2","k3","k4","y_{n+1}"]
-            self.rk4_table["columns"] = cols
-            for c in cols:
-                self.rk4_table.heading(c,text=c)
-                self.rk4_table.column(c,width=100,anchor="center")
-            for row in rk4_pendientes:
-                self.rk4_table.insert("", "end", values=[f"{v:.6f}" if isinstance(v,float) else v for v in row])
-
-        # Gráfica
-        self.ax.clear()
-        self.ax.plot(t_values,y_values,label=self.method.get(),marker="o",markersize=3)
-        if self.solution_expr is not None:
-            t_dense = np.linspace(t0,t_end,200)
-            y_dense = [float(self.solution_expr.subs("t",tt)) for tt in t_dense]
-            self.ax.plot(t_dense, y_dense, "k--", label="Exacta")
-        self.ax.set_title("Solución Numérica vs Analítica")
-        self.ax.set_xlabel("t")
-        self.ax.set_ylabel("y(t)")
-        self.ax.grid(True)
-        self.ax.legend()
-        self.canvas.draw()
+    def _eventos(self):
+        """Eventos de la entrada actual (lista vacía si no se escribió ninguno)"""
+        if not self.eventos.get().strip():
+            return []
+        return preparar_eventos(self.tipo.get(), self.func_str.get(), self.variables.get(), self.y0.get(),
+                                self.eventos.get(), self.accion_evento.get(),
+                                self.DIRECCIONES[self.direccion_evento.get()])
+
+    def _integrar(self, f, method, t0, y0, t_end, h, show_rk4, exacta, tolerancias, jac, eventos, control=None):
+        """Pasos del método elegido y solución exacta en los nodos (sin tocar Tk)"""
+        sol = pendientes = None
+        ocurrencias = []
+        if method in METODOS_ADAPTATIVOS:
+            rtol, atol = tolerancias
+            sol = integrar_adaptativo(f, t0, y0, t_end, method, rtol, atol, denso=True, eventos=eventos,
+                                      control=control)
+            t_values, y_values, ocurrencias = sol.t, sol.y, sol.eventos
+        elif method in METODOS_IMPLICITOS:
+            sol = integrar_implicito(f, t0, y0, t_end, h, method, jac=jac, control=control)
+            t_values, y_values = sol.t, sol.y
+        else:
+            res = integrar_rk(f, t0, y0, t_end, h, method, etapas=show_rk4, eventos=eventos, control=control)
+            t_values, y_values = res[0], res[1]
+            pendientes = res[2] if show_rk4 else None
+            ocurrencias = res[-1]
+
+        # NaN = sin solución exacta en ese punto (la tabla muestra "-"); en un sistema
+        # reducido desde orden superior la exacta es la de la primera componente
+        y_exact = np.full(len(t_values), np.nan)
+        t_dense = y_dense = None
+        if exacta is not None:
+            y_exact = exacta(t_values)
+            # Hasta el último punto: un evento terminal puede cortar antes de t_end
+            t_dense = np.linspace(t0,t_values[-1],200)
+            y_dense = exacta(t_dense)
+        return t_values, y_values, y_exact, pendientes, t_dense, y_dense, sol, ocurrencias
+
+    def _mostrar_solucion(self, res, method, t0, t_end, show_rk4, nombres):
+        t_values, y_values, y_exact, pendientes, t_dense, y_dense, sol, ocurrencias = res
+        # Una columna por componente: y_values es (n_pasos,) o (n_pasos, n_variables)
+        componentes = [y_values] if y_values.ndim == 1 else list(y_values.T)
+        nombres_col = ["y_num"] if y_values.ndim == 1 else nombres
+
+        # Tabla normal (con paso adaptativo, una fila por paso aceptado)
+        self.table.configurar_columnas(["n","t"] + nombres_col + ["y_exact","Error"])
+        self.table.cargar([np.arange(len(t_values)), t_values, *componentes, y_exact,
+                           np.abs(self._principal(y_values)-y_exact)],
+                          [None, "{:.6f}" if method in METODOS_ADAPTATIVOS else "{:.3f}"] + ["{:.6f}"]*(len(componentes)+1)
+                          + [formato_error])
+
+        # Tabla de pendientes: una columna por etapa del método
+        if show_rk4 and pendientes is not None and len(pendientes):
+            etapas = pendientes.shape[1]
+            cols = ["n","t_n","y_n"] + [f"k{i+1}" for i in range(etapas)] + ["y_{n+1}"]
+            self.rk4_table.configurar_columnas(cols)
+            self.rk4_table.cargar([np.arange(len(pendientes)), t_values[:-1], y_values[:-1], *pendientes.T, y_values[1:]],
+                                  [None] + ["{:.6f}"]*(etapas+3))
+
+        # Gráfica: una curva por componente
+        self.grafico.ocultar_todos()
+        titulo = "Solución Numérica vs Analítica"
+        t_curva = np.linspace(t0, t_values[-1], 400)
+        denso = method in METODOS_ADAPTATIVOS
+        curvas = sol(t_curva) if denso else None
+        for j, y_j in enumerate(componentes):
+            clave = method if len(componentes) == 1 else f"{method}:{nombres[j]}"
+            etiqueta = method if len(componentes) == 1 else f"{nombres[j]} ({method})"
+            if not denso:
+                self.grafico.linea(clave, t_values, y_j, label=etiqueta, marker="o", markersize=3)
+            else:
+                # Curva continua de la salida densa; los marcadores son los pasos aceptados
+                curva = curvas if curvas.ndim == 1 else curvas[:, j]
+                linea = self.grafico.linea(clave, t_curva, curva, label=etiqueta)
+                self.grafico.linea(f"{clave} pasos", t_values, y_j, color=linea.get_color(), marker="o",
+                                   markersize=3, linestyle="none")
+        if denso:
+            titulo += (f"\n{method}: {sol.aceptados} pasos ({sol.rechazados} rechazados), "
+                       f"{sol.evaluaciones} evaluaciones de f")
+        elif sol is not None:
+            titulo += (f"\n{method}: {sol.aceptados} pasos, {sol.evaluaciones} evaluaciones de f, "
+                       f"{sol.jacobianos} jacobianos, {sol.factorizaciones} factorizaciones LU")
+        if t_dense is not None:
+            self.grafico.linea("Exacta", t_dense, y_dense, color="k", linestyle="--", label="Exacta")
+        # Eventos: los cruces registrados se marcan sobre la primera componente
+        resumen = []
+        for oc in ocurrencias:
+            texto = f"{oc.evento.nombre}: {oc.cantidad}"
+            if oc.cantidad and oc.t.size:
+                self.grafico.puntos(f"Evento:{oc.evento.nombre}", oc.t, self._principal(oc.y), marker="x", s=60,
+                                    zorder=5, label=f"{oc.evento.nombre} = 0")
+                texto += f" (t = {', '.join(f'{te:.4g}' for te in oc.t[:3])}{', ...' if oc.t.size > 3 else ''})"
+            resumen.append(texto)
+        if resumen:
+            terminado = any(oc.evento.accion == TERMINAR and oc.cantidad for oc in ocurrencias)
+            titulo += f"\nEventos {'; '.join(resumen)}{' (terminado)' if terminado else ''}"
+        self._actualizar_grafico(titulo)
+
+    def simulate_ensemble(self):
+        """Integra todos los miembros juntos y grafica la media y la banda de cuantiles 5%-95%"""
+        self.table.limpiar()
+        method = self.method.get()
+        try:
+            if method not in METODOS_RK and method not in METODOS_ADAPTATIVOS:
+                raise ValueError("El ensamble usa los métodos explícitos (de paso fijo o adaptativos)")
+            t0, t_end, h = self.t0.get(), self.t_end.get(), self.h.get()
+            F, y0, nombres = preparar_ensamble(self.tipo.get(), self.func_str.get(), self.variables.get(),
+                                               self.y0.get(), self.ens_parametro.get())
+            m = self.ens_miembros.get()
+            if m < 1:
+                raise ValueError("El ensamble necesita al menos un miembro")
+            rng = np.random.default_rng()
+            Y0 = y0 + self.ens_sigma.get() * rng.standard_normal((m, y0.size))
+            parametros = self.ens_parametro.get().replace(",", " ").split()
+            P = rng.uniform(self.ens_pmin.get(), self.ens_pmax.get(), (m, len(parametros))) if parametros else None
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        tolerancias = (self.rtol.get(), self.atol.get())
+        self.ejecutor.lanzar("solve", self._integrar_ensamble, F, method, t0, Y0, t_end, h, P, tolerancias,
+                             self.ens_guardar.get(),
+                             al_terminar=lambda res: self._mostrar_ensamble(res, method, nombres, m),
+                             barra=self.barra_progreso)
+
+    def _integrar_ensamble(self, F, method, t0, Y0, t_end, h, P, tolerancias, guardar, control=None):
+        if method in METODOS_ADAPTATIVOS:
+            rtol, atol = tolerancias
+            return integrar_ensamble_adaptativo(F, t0, Y0, t_end, np.linspace(t0, t_end, 201), method, rtol, atol,
+                                                P=P, guardar=guardar, control=control)
+        return integrar_ensamble_rk(F, t0, Y0, t_end, h, method, P=P, guardar=guardar, control=control)
+
+    # Miembros que se dibujan cuando se guardan (todos harían ilegible el gráfico)
+    MIEMBROS_GRAFICADOS = 20
+
+    def _mostrar_ensamble(self, res, method, nombres, m):
+        bajo, mediana, alto = (res.cuantil(q) for q in res.niveles)
+        columnas, formatos, cols = [np.arange(res.t.size), res.t], [None, "{:.4f}"], ["n", "t"]
+        self.grafico.ocultar_todos()
+        for j, nombre in enumerate(nombres):
+            if res.miembros is not None:
+                for i in range(min(m, self.MIEMBROS_GRAFICADOS)):
+                    self.grafico.linea(f"Miembro {i}:{nombre}", res.t, res.miembros[:, i, j], color="0.6",
+                                       linewidth=0.5, alpha=0.6)
+            linea = self.grafico.linea(f"Media:{nombre}", res.t, res.media[:, j], label=f"Media {nombre}", linewidth=2)
+            self.grafico.linea(f"Mediana:{nombre}", res.t, mediana[:, j], color=linea.get_color(), linestyle="--",
+                               label=f"Mediana {nombre}")
+            self.grafico.relleno(f"Banda:{nombre}", res.t, bajo[:, j], alto[:, j], color=linea.get_color(), alpha=0.25,
+                                 label=f"{res.niveles[0]:.0%}-{res.niveles[-1]:.0%} {nombre}")
+            cols += [f"media {nombre}", f"{res.niveles[0]:.0%} {nombre}", f"{res.niveles[-1]:.0%} {nombre}"]
+            columnas += [res.media[:, j], bajo[:, j], alto[:, j]]
+            formatos += ["{:.6f}"] * 3
+        self.table.configurar_columnas(cols)
+        self.table.cargar(columnas, formatos)
+        pasos = res.aceptados if np.ndim(res.aceptados) == 0 else f"{int(np.mean(res.aceptados))} (promedio)"
+        self._actualizar_grafico(f"Ensamble de {m} miembros ({method})\n"
+                                 f"{pasos} pasos por miembro, {res.evaluaciones} evaluaciones de F vectorizadas")
+
+    def _actualizar_grafico(self, titulo):
+        self.grafico.titulo(titulo)
+        self.grafico.autoescalar()
+        self.grafico.leyenda()
+        self.grafico.actualizar()
+
+    def _fijar_solucion(self, expr):
+        self.solution_expr = expr
+        self.solucion_exacta = None if expr is None else compilar_solucion(expr)
 
     def calc_analytical(self):
-        self.ax_analytic.clear()
-        t_sym = sp.symbols("t")
-        y_func = sp.Function("y")
+        """dsolve en otro proceso con límite de tiempo; las soluciones ya halladas salen del caché"""
         try:
-            ode = sp.Eq(sp.Derivative(y_func(t_sym),t_sym), sp.sympify(self.func_str.get()).subs({"y":y_func(t_sym)}))
-            sol = sp.dsolve(ode,ics={y_func(self.t0.get()):self.y0.get()})
-            self.solution_expr = sol.rhs
-            sol_latex = sp.latex(sol)
+            if self.tipo.get() == SISTEMA:
+                raise ValueError("Sólo ecuaciones escalares o de orden superior")
+            nombre = self.variables.get().split()[0]
+            datos = (self.func_str.get(), nombre, self.y0.get(), self.t0.get())
+            clave = self.cache_soluciones.clave(*datos)
+        except Exception:
+            self._mostrar_analitica(None, None)
+            return
+        if clave in self.cache_soluciones:
+            self._mostrar_analitica(nombre, self.cache_soluciones[clave])
+            return
+
+        def terminar(srepr):
+            self.cache_soluciones.guardar(clave, srepr)
+            self._mostrar_analitica(nombre, None if srepr is None else sp.sympify(srepr))
+
+        self._mostrar_analitica(None, None, "Resolviendo con dsolve...")
+        self.ejecutor.lanzar("analitica", resolver_analitica, *datos, proceso=True, limite=TIEMPO_MAX_DSOLVE,
+                             al_terminar=terminar,
+                             al_error=lambda e: self._mostrar_analitica(None, None, f"Sin solución analítica: {e}"),
+                             al_cancelar=lambda: self._mostrar_analitica(None, None, "dsolve cancelado"),
+                             barra=self.barra_progreso)
+
+    def _mostrar_analitica(self, nombre, expr, mensaje="No tiene solución analítica"):
+        self._fijar_solucion(expr)
+        self.ax_analytic.clear()
+        if expr is not None:
+            sol_latex = sp.latex(sp.Eq(sp.Function(nombre)(sp.Symbol("t")), expr))
             self.ax_analytic.text(0.01,0.5,r"$"+sol_latex+"$",fontsize=16,verticalalignment="center",horizontalalignment="left")
-        except:
-            self.solution_expr = None
-            self.ax_analytic.text(0.5,0.5,"No tiene solución analítica",fontsize=16,verticalalignment="center",horizontalalignment="center")
+        else:
+            self.ax_analytic.text(0.5,0.5,mensaje,fontsize=16,verticalalignment="center",horizontalalignment="center")
         self.ax_analytic.axis("off")
         self.canvas_analytic.draw()
 
+    def convergence_study(self):
+        """Orden observado y trabajo-precisión de todos los métodos, repartidos entre procesos"""
+        try:
+            t0, t_end, h = self.t0.get(), self.t_end.get(), self.h.get()
+            self._problema()   # errores de la entrada aquí y no en los procesos
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        problema = (self.tipo.get(), self.func_str.get(), self.variables.get(), self.y0.get(),
+                    self.jacobiano.get() == "Simbólico")
+        self.ejecutor.lanzar("estudio", estudiar_metodos, problema, t0, t_end, h, self._metodos(),
+                             self._srepr_exacta(),
+                             al_terminar=lambda res: self._mostrar_estudio(res, problema[1]),
+                             barra=self.barra_progreso)
+
+    def _srepr_exacta(self):
+        """srepr de la solución analítica de la entrada actual si ya está en el caché (o None)"""
+        if self.tipo.get() == SISTEMA:
+            return None
+        try:
+            clave = self.cache_soluciones.clave(self.func_str.get(), self.variables.get().split()[0], self.y0.get(),
+                                                self.t0.get())
+        except Exception:
+            return None
+        expr = self.cache_soluciones[clave] if clave in self.cache_soluciones else None
+        return None if expr is None else sp.srepr(expr)
+
+    def _mostrar_estudio(self, resultados, texto):
+        win = tk.Toplevel(self.root)
+        win.title(f"Estudio de Convergencia - {texto}")
+
+        fig = Figure(figsize=(10,4))
+        ax_eval, ax_tiempo = fig.subplots(1, 2)
+        for m, res in resultados.items():
+            etiqueta = f"{m} (p={res.orden_teorico}, obs. {res.orden:.2f})"
+            linea, = ax_eval.loglog(res.evaluaciones, res.errores, "o-", markersize=3, label=etiqueta)
+            ax_tiempo.loglog(res.tiempos * 1e3, res.errores, "o-", markersize=3, color=linea.get_color())
+        ax_eval.set_xlabel("Evaluaciones de f")
+        ax_tiempo.set_xlabel("Tiempo (ms)")
+        for ax in (ax_eval, ax_tiempo):
+            ax.set_ylabel("Error en t_end")
+            ax.grid(True, which="both", alpha=0.3)
+        fig.legend(*ax_eval.get_legend_handles_labels(), loc="center right", fontsize=7)
+        fig.subplots_adjust(right=0.72, wspace=0.3)
+        canvas = FigureCanvasTkAgg(fig, master=win)
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        canvas.draw()
+
+        # El método más barato (en evaluaciones de f) que alcanza el error pedido
+        frame = tk.Frame(win)
+        frame.pack(fill="x", padx=5, pady=5)
+        tk.Label(frame, text="Error objetivo").pack(side="left")
+        objetivo = tk.DoubleVar(value=1e-6)
+        tk.Entry(frame, textvariable=objetivo, width=8).pack(side="left", padx=5)
+        recomendado = tk.Label(frame, text="", justify="left")
+        recomendado.pack(side="left", padx=10)
+
+        def elegir(event=None):
+            try:
+                tolerancia = objetivo.get()
+            except tk.TclError:
+                return
+            candidatos = []
+            for m, res in resultados.items():
+                i = res.mas_barato(tolerancia)
+                if i is not None:
+                    candidatos.append((res.evaluaciones[i], m, i))
+            if not candidatos:
+                recomendado.config(text="Ningún método alcanza ese error con los pasos probados")
+                return
+            evaluaciones, m, i = min(candidatos)
+            res = resultados[m]
+            recomendado.config(text=f"Más barato: {m} con h = {res.h[i]:.4g} ({evaluaciones} evaluaciones, "
+                                    f"{res.tiempos[i] * 1e3:.2f} ms, error {res.errores[i]:.2e})")
+        tk.Button(frame, text="Elegir", command=elegir).pack(side="left")
+        elegir()
+
+        tabla = TablaVirtual(win, ["Método","Orden","Orden obs.","h","Error","Evaluaciones","Tiempo (ms)"], alto=10)
+        tabla.pack(fill="both", expand=True)
+        filas = [(m, res, i) for m, res in resultados.items() for i in range(res.h.size)]
+        tabla.cargar([[m for m, _, _ in filas], [res.orden_teorico for _, res, _ in filas],
+                      [res.orden for _, res, _ in filas], [res.h[i] for _, res, i in filas],
+                      [res.errores[i] for _, res, i in filas], [res.evaluaciones[i] for _, res, i in filas],
+                      [res.tiempos[i] * 1e3 for _, res, i in filas]],
+                     [None, None, "{:.2f}", "{:.4g}", formato_error, None, "{:.3f}"])
+
     def show_help(self):
-        help_text = """
-Métodos disponibles:
+        metodos = "\n".join(f"- {nombre}: {tabla.etapas} etapa(s), orden {tabla.orden}"
+                             for nombre, tabla in METODOS_RK.items())
+        help_text = f"""
+Métodos disponibles (Runge-Kutta explícitos definidos por su tabla de Butcher):
+
+{metodos}
+
+Cada paso: k_i = f(t_n + c_i*h, y_n + h*sum_j a_ij*k_j)
+           y_{{n+1}} = y_n + h*sum_i b_i*k_i
+Donde k1, k2, ... son las pendientes intermedias (etapas).
+
+Métodos adaptativos (el paso se elige solo, según rtol y atol; h no se usa):
+- DP45: Dormand-Prince 5(4), 7 etapas con FSAL (6 evaluaciones de f por paso)
+- BS23: Bogacki-Shampine 3(2), 4 etapas con FSAL (3 evaluaciones por paso)
+El error local de cada paso se estima con la fórmula embebida de menor orden y
+un controlador PI ajusta h. La curva entre pasos es la salida densa del método.
+
+Métodos implícitos para problemas rígidos (p. ej. -1000*(y - cos(t))), con paso h:
+- Euler implícito y BDF2 a BDF5: y_{{n+1}} depende de f(t_{{n+1}}, y_{{n+1}}) y se
+  resuelve con Newton; BDF2-BDF5 usan también los pasos anteriores.
+- Trapecio: orden 2, A-estable pero no amortigua los transitorios rápidos.
+- ROS2 (Rosenbrock-W): orden 2, sin Newton; dos sistemas lineales por paso.
+El jacobiano ∂f/∂y se deriva simbólicamente o por diferencias finitas, y su
+factorización LU se reutiliza entre pasos mientras Newton converja bien.
+Los explícitos necesitan h muy chico en estos problemas (o divergen).
+
+Tipos de problema:
+- Escalar: y' = f(t, y), con una sola expresión y un valor inicial.
+- Sistema: una expresión por variable separadas por ";" (x' = ...; y' = ...),
+  las variables en "Variables" (p. ej. "x y") y y0 separado por comas.
+- Orden superior: y^(n) = f(t, y, dy, d2y, ...); n es la cantidad de valores
+  iniciales (y(t0), y'(t0), ...). Se reduce a un sistema de primer orden.
+En sistemas se comparan y tabulan los métodos sobre la primera variable.
+
+Ensamble: integra a la vez "miembros" copias del problema, con y0 + ruido normal
+de desvío σ(y0) y, si se indica, un parámetro de f (p. ej. "a" en "a*x - x*y")
+uniforme entre los dos valores. Cada etapa evalúa f una vez para todo el
+ensamble; con DP45/BS23 cada miembro elige su propio paso. Se grafican la media,
+la mediana y la banda 5%-95% (y algunos miembros si se guardan).
 
-1. Euler: y_{n+1} = y_n + h*f(t_n,y_n)
-2. Heun: Predictor-Corrector: y_{n+1} = y_n + h*(k1+k2)/2
-3. Midpoint: y_{n+1} = y_n + h*f(t_n + h/2, y_n + h*k1/2)
-4. RK2: y_{n+1} = y_n + h*k2
-5. Ralston: y_{n+1} = y_n + h*(k1 + k2/3)
-6. RK4: y_{n+1} = y_n + h*(k1+2k2+2k3+k4)/6
+Estudio de convergencia: cada método se corre con h, h/2, ..., h/32 (los
+adaptativos con rtol = 1e-3, ..., 1e-8) en procesos paralelos, midiendo el error
+en t_end contra la solución analítica (si ya se calculó) o una referencia muy
+precisa. Muestra el orden observado (pendiente de log error vs log h) y las
+curvas de trabajo-precisión: error contra evaluaciones de f y contra tiempo.
 
-Donde k1,k2,k3,k4 son pendientes intermedias.
+Eventos: expresiones g(t, y) separadas por ';' (p. ej. "y" para y = 0, o "dy"
+con dirección Bajando para los máximos de y en orden superior). En cada paso se
+compara el signo de g y el cruce se ubica sobre la interpolación del paso.
+Registrar marca cada cruce, Contar sólo los cuenta y Terminar detiene la
+integración en el primero. Sólo con los métodos explícitos.
 """
         messagebox.showinfo("Ayuda - Métodos Runge-Kutta", help_text)
 
     def compare_methods(self):
-        methods = ["Euler","Heun","Midpoint","RK2","Ralston","RK4"]
-        t0,y0,t_end,h = self.t0.get(),self.y0.get(),self.t_end.get(),self.h.get()
-        self.ax.clear()
-        for method in methods:
-            t,y = t0,y0; t_vals=[t0]; y_vals=[y0]
-            n_steps = int((t_end-t0)/h)
-            for _ in range(n_steps):
-                if method=="Euler": y+=h*self.f(t,y)
-                elif method=="Heun": k1=self.f(t,y); k2=self.f(t+h,y+h*k1); y+=h*(k1+k2)/2
-                elif method=="Midpoint": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); y+=h*k2
-                elif method=="RK2": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); y+=h*k2
-                elif method=="Ralston": k1=self.f(t,y); k2=self.f(t+3*h/4, y+3*h*k1/4); y+=h*(k1+k2/3)
-                elif method=="RK4": k1=self.f(t,y); k2=self.f(t+h/2, y+h*k1/2); k3=self.f(t+h/2, y+h*k2/2); k4=self.f(t+h, y+h*k3); y+=h*(k1+2*k2+2*k3+k4)/6
-                t+=h; t_vals.append(t); y_vals.append(y)
-            self.ax.plot(t_vals,y_vals,label=method,marker="o",markersize=3)
-        if self.solution_expr is not None:
+        try:
+            t0, t_end = self.t0.get(), self.t_end.get()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self._comparacion(lambda *res: self._mostrar_comparacion(*res, t0, t_end))
+
+    def _mostrar_comparacion(self, t_values, results, nombres, t0, t_end):
+        self.grafico.ocultar_todos()
+        # En sistemas se compara la primera componente
+        for method, y_vals in results.items():
+            self.grafico.linea(method, t_values, self._principal(y_vals), label=method, marker="o", markersize=3)
+        if self.solucion_exacta is not None:
             t_dense = np.linspace(t0,t_end,200)
-            y_dense = [float(self.solution_expr.subs("t",tt)) for tt in t_dense]
-            self.ax.plot(t_dense,y_dense,"k--",label="Exacta")
-        self.ax.set_title("Soluciones Numéricas de Todos los Métodos")
-        self.ax.set_xlabel("t")
-        self.ax.set_ylabel("y(t)")
-        self.ax.grid(True)
-        self.ax.legend()
-        self.canvas.draw()
+            y_dense = self.solucion_exacta(t_dense)
+            self.grafico.linea("Exacta", t_dense, y_dense, color="k", linestyle="--", label="Exacta")
+        titulo = "Soluciones Numéricas de Todos los Métodos"
+        self._actualizar_grafico(titulo if len(nombres) == 1 else f"{titulo} ({nombres[0]})")
+
+    def _metodos(self):
+        return list(METODOS_RK) + list(METODOS_ADAPTATIVOS) + list(METODOS_IMPLICITOS)
+
+    def _comparacion(self, al_terminar):
+        """al_terminar(t, {método: y}, nombres) con todos los métodos en la grilla t0 + h·k.
+
+        El cálculo corre en segundo plano (_calcular_comparacion). El resultado se guarda
+        hasta que cambie alguna entrada: el gráfico y la tabla comparativa lo comparten.
+        """
+        try:
+            clave = (self.tipo.get(), self.func_str.get(), self.variables.get(), self.y0.get(), self.t0.get(),
+                     self.t_end.get(), self.h.get(), self.rtol.get(), self.atol.get(), self.jacobiano.get())
+            if self._comparacion_cache is not None and self._comparacion_cache[0] == clave:
+                al_terminar(*self._comparacion_cache[1])
+                return
+            tipo, texto, variables, valores, t0, t_end, h, rtol, atol, _ = clave
+            f, y0, nombres, jac = self._problema()
+            F = preparar_ensamble(tipo, texto, variables, valores)[0]
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        def guardar(res):
+            self._comparacion_cache = (clave, (*res, nombres))
+            al_terminar(*res, nombres)
+        self.ejecutor.lanzar("comparar", self._calcular_comparacion, f, F, y0, t0, t_end, h, rtol, atol, jac,
+                             al_terminar=guardar, barra=self.barra_progreso)
+
+    @staticmethod
+    def _calcular_comparacion(f, F, y0, t0, t_end, h, rtol, atol, jac, control=None):
+        """(t, {método: y}) de todos los métodos (sin tocar Tk).
+
+        Los RK explícitos avanzan juntos (integrar_rk_fusionado) y los adaptativos se
+        muestrean en la grilla con su salida densa.
+        """
+        t_values, Y, _ = integrar_rk_fusionado(F, t0, y0, t_end, h, list(METODOS_RK), control=control)
+        results = {m: Y[:, j, 0] if np.ndim(y0) == 0 else Y[:, j] for j, m in enumerate(METODOS_RK)}
+        for m in METODOS_ADAPTATIVOS:
+            results[m] = integrar_adaptativo(f, t0, y0, t_end, m, rtol, atol, t_eval=t_values, control=control).y_eval
+        for m in METODOS_IMPLICITOS:
+            results[m] = integrar_implicito(f, t0, y0, t_end, h, m, jac=jac, control=control).y
+        return t_values, results
 
     def generate_comparative_table(self):
-        self.comp_table.delete(*self.comp_table.get_children())
-        cols=["n","t","Euler","Error_Euler","Heun","Error_Heun","Midpoint","Error_Midpoint",
-              "RK2","Error_RK2","Ralston","Error_Ralston","RK4","Error_RK4","Exacta"]
-        self.comp_table["columns"]=cols
-        for c in cols:
-            self.comp_table.heading(c,text=c)
-            self.comp_table.column(c,width=100,anchor="center")
-
-        t0,y0,t_end,h=self.t0.get(),self.y0.get(),self.t_end.get(),self.h.get()
-        n_steps=int((t_end-t0)/h)
-        t_values=[t0 + i*h for i in range(n_steps+1)]
-        exact_values=[float(self.solution_expr.subs("t",ti)) if self.solution_expr else "-" for ti in t_values]
-        methods=["Euler","Heun","Midpoint","RK2","Ralston","RK4"]
-        results={m:[] for m in methods}
-
-        for method in methods:
-            t,y=t0,y0
-            ys=[y0]
-            for _ in range(n_steps):
-                if method=="Euler": y+=h*self.f(t,y)
-                elif method=="Heun": k1=self.f(t,y); k2=self.f(t+h,y+h*k1); y+=h*(k1+k2)/2
-                elif method=="Midpoint": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); y+=h*k2
-                elif method=="RK2": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); y+=h*k2
-                elif method=="Ralston": k1=self.f(t,y); k2=self.f(t+3*h/4, y+3*h*k1/4); y+=h*(k1+k2/3)
-                elif method=="RK4": k1=self.f(t,y); k2=self.f(t+h/2,y+h*k1/2); k3=self.f(t+h/2,y+h*k2/2); k4=self.f(t+h,y+h*k3); y+=h*(k1+2*k2+2*k3+k4)/6
-                t+=h; ys.append(y)
-            results[method]=ys
-
-        for i,ti in enumerate(t_values):
-            row=[i,f"{ti:.3f}"]
-            for m in methods:
-                yi=results[m][i]
-                row.append(f"{yi:.6f}")
-                if exact_values[i]!="-":
-                    err=abs(yi-exact_values[i])
-                    row.append(f"{err:.6e}" if err<1e-6 else f"{err:.6f}")
-                else:
-                    row.append("-")
-            row.append(f"{exact_values[i]}" if exact_values[i]!="- " else "-")
-            self.comp_table.insert("", "end", values=row)
+        self._comparacion(self._mostrar_tabla_comparativa)
+
+    def _mostrar_tabla_comparativa(self, t_values, results, nombres):
+        methods=self._metodos()
+        cols=["n","t"] + [c for m in methods for c in (m, f"Error_{m}")] + ["Exacta"]
+        self.comp_table.configurar_columnas(cols)
+
+        exact_values=self.solucion_exacta(t_values) if self.solucion_exacta else np.full(len(t_values), np.nan)
+
+        columnas=[np.arange(len(t_values)), t_values]
+        formatos=[None, "{:.3f}"]
+        for m in methods:
+            ys=self._principal(results[m])
+            columnas += [ys, np.abs(ys-exact_values)]
+            formatos += ["{:.6f}", formato_error]
+        self.comp_table.cargar(columnas + [exact_values], formatos + ["{:.6f}"])
 
 if __name__=="__main__":
     root = tk.Tk()
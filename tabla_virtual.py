@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Tabla virtualizada para Tkinter respaldada por arreglos NumPy.
+
+- El Treeview sólo contiene las filas visibles (`alto`); al desplazarse se vuelven a
+  llenar con la ventana de datos correspondiente.
+- Las celdas se formatean al mostrarse, no al cargar: mostrar 1e6 filas cuesta lo
+  mismo que mostrar 30.
+- Formato por columna: cadena tipo "{:.6f}", función, o None (formato por defecto).
+  Los NaN se muestran como "-".
+"""
+
+from tkinter import ttk
+
+import numpy as np
+
+
+def formato_por_defecto(v):
+    if isinstance(v, (float, np.floating)):
+        return "-" if np.isnan(v) else f"{v:.6g}"
+    return str(v)
+
+
+def formato_error(v):
+    """Errores chicos en notación científica, como en las tablas de Runge-Kutta"""
+    if isinstance(v, str):
+        return v
+    if np.isnan(v):
+        return "-"
+    return f"{v:.6e}" if v < 1e-6 else f"{v:.6f}"
+
+
+class TablaVirtual(ttk.Frame):
+    """Treeview con desplazamiento virtual sobre columnas NumPy"""
+
+    def __init__(self, master, columnas=(), alto=20, ancho_columna=100, **kw):
+        super().__init__(master, **kw)
+        self.alto = alto
+        self.ancho_columna = ancho_columna
+        self.tree = ttk.Treeview(self, show="headings", height=alto, selectmode="browse")
+        self.scroll_y = ttk.Scrollbar(self, orient="vertical", command=self._desplazar)
+        self.scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.scroll_x.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scroll_y.grid(row=0, column=1, sticky="ns")
+        self.scroll_x.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        # Rueda del mouse (Windows/macOS y X11)
+        self.tree.bind("<MouseWheel>", lambda e: self._desplazar("scroll", -int(np.sign(e.delta)) * 3, "units"))
+        self.tree.bind("<Button-4>", lambda e: self._desplazar("scroll", -3, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._desplazar("scroll", 3, "units"))
+
+        self._datos = []
+        self._formatos = []
+        self._n = 0
+        self.inicio = 0
+        self.configurar_columnas(columnas)
+
+    # -------------------- Datos --------------------
+    def configurar_columnas(self, columnas, ancho=None):
+        self.columnas = list(columnas)
+        self.tree["columns"] = self.columnas
+        for c in self.columnas:
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=ancho or self.ancho_columna, anchor="center")
+
+    def cargar(self, datos, formatos=None):
+        """Muestra las columnas `datos` (una secuencia por columna, todas del mismo largo)"""
+        self._datos = [np.asarray(col) for col in datos]
+        largos = {col.shape[0] for col in self._datos}
+        if len(largos) > 1:
+            raise ValueError("Todas las columnas de la tabla deben tener el mismo largo")
+        if len(self._datos) != len(self.columnas):
+            raise ValueError("El número de columnas no coincide con los encabezados")
+        self._n = largos.pop() if largos else 0
+        formatos = formatos or [None] * len(self._datos)
+        self._formatos = [self._como_funcion(fmt) for fmt in formatos]
+        self.inicio = 0
+        self._mostrar()
+
+    def limpiar(self):
+        self._datos, self._formatos, self._n, self.inicio = [], [], 0, 0
+        self._mostrar()
+
+    def __len__(self):
+        return self._n
+
+    @staticmethod
+    def _como_funcion(fmt):
+        if fmt is None:
+            return formato_por_defecto
+        if callable(fmt):
+            return fmt
+
+        def formatear(v):
+            if isinstance(v, (float, np.floating)) and np.isnan(v):
+                return "-"
+            try:
+                return fmt.format(v)
+            except (ValueError, TypeError):
+                return str(v)
+        return formatear
+
+    # -------------------- Desplazamiento --------------------
+    def ir_a(self, fila):
+        self.inicio = int(np.clip(fila, 0, max(self._n - self.alto, 0)))
+        self._mostrar()
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self.ir_a(round(float(cantidad) * self._n))
+        elif accion == "scroll":
+            paso = self.alto if unidad == "pages" else 1
+            self.ir_a(self.inicio + int(cantidad) * paso)
+
+    def _mostrar(self):
+        # Sólo existen las filas visibles: el costo no depende del tamaño de los datos
+        self.tree.delete(*self.tree.get_children())
+        fin = min(self.inicio + self.alto, self._n)
+        ventana = [col[self.inicio:fin] for col in self._datos]
+        for k in range(fin - self.inicio):
+            self.tree.insert("", "end", values=[fmt(col[k]) for fmt, col in zip(self._formatos, ventana)])
+        if self._n > 0:
+            self.scroll_y.set(self.inicio / self._n, fin / self._n)
+        else:
+            self.scroll_y.set(0.0, 1.0)
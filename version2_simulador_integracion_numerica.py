@@ -8,6 +8,7 @@ Simulador de Integración Numérica Final
 - Cálculo simbólico y error de truncamiento
 - Entrada de constantes simbólicas pi y E
 - Botón de ayuda con explicación de fórmulas
+- Cálculo en segundo plano (la integral simbólica en otro proceso) con progreso y cancelación
 """
 
 import tkinter as tk
@@ -17,6 +18,8 @@ import sympy as sp
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from ejecutor_tareas import BarraProgreso, EjecutorTareas
+
 # ---------------- FUNCIONES AUXILIARES ---------------- #
 def f_expr(expr_str):
     x = sp.symbols('x')
@@ -102,6 +105,25 @@ def error_truncamiento(expr_str, regla, a, b, n):
     elif regla=="Rectángulo Medio": return "-(b-a)/24*h²*f''(ξ)", -((b-a)/24)*h**2*M
     else: return "No disponible", None
 
+# ---------------- CÁLCULOS EN SEGUNDO PLANO ---------------- #
+METODOS={"Rectángulo Medio":(regla_rectangulo_medio,"Rectángulo Medio"),"Trapecio":(regla_trapecio,"Trapecio"),
+         "Simpson 1/3":(regla_simpson13,"Simpson 1/3"),"Simpson 3/8":(regla_simpson38,"Simpson 3/8"),
+         "Boole":(regla_boole,"Boole"),"Gauss-Legendre":(cuadratura_gauss,"Gauss")}
+
+def integral_numerica(expr_str, a, b, n, metodo, control=None):
+    if metodo not in METODOS: raise ValueError("Método no válido")
+    regla_fn,regla=METODOS[metodo]
+    I,tabla,xs=regla_fn(f_num(expr_str),a,b,n)
+    if control is not None: control.progreso(0.5,"Error de truncamiento")
+    formula,err=error_truncamiento(expr_str,regla,a,b,n)
+    return I,tabla,formula,err
+
+def integral_simbolica(expr_str, a, b, control=None):
+    # sp.integrate no puede interrumpirse: se ejecuta en otro proceso
+    if control is not None: control.progreso(None,"Integral simbólica...")
+    expr,x=f_expr(expr_str)
+    return sp.integrate(expr,(x,a,b))
+
 # ---------------- INTERFAZ ---------------- #
 class Simulador:
     def __init__(self,root):
@@ -149,6 +171,11 @@ class Simulador:
         self.simbol_label=ttk.Label(panel_right,text="Integral simbólica: "); self.simbol_label.pack(anchor="w")
         self.error_label=ttk.Label(panel_right,text="Error: "); self.error_label.pack(anchor="w")
 
+        # Cálculo en segundo plano con progreso y cancelación
+        self.ejecutor=EjecutorTareas(root)
+        self.barra_progreso=BarraProgreso(panel_right,self.ejecutor,["numerica","simbolica"])
+        self.barra_progreso.pack(anchor="w")
+
         # Tabla compacta y fija
         self.tree=ttk.Treeview(panel_right,columns=("i","x","f(x)","w"),show="headings",height=12)
         for c,t in zip(("i","x","f(x)","w"),("i","x","f(x)","Peso w_i")):
@@ -181,35 +208,39 @@ class Simulador:
 
     def calcular(self):
         try:
-            f=f_num(self.funcion_entry.get())
+            expr_str=self.funcion_entry.get()
+            f_expr(expr_str)
             a=valor_entry(self.a_entry.get())
             b=valor_entry(self.b_entry.get())
             n=int(self.n_entry.get())
             metodo=self.metodo_combo.get()
-
-            if metodo=="Rectángulo Medio": I,tabla,xs=regla_rectangulo_medio(f,a,b,n); regla="Rectángulo Medio"
-            elif metodo=="Trapecio": I,tabla,xs=regla_trapecio(f,a,b,n); regla="Trapecio"
-            elif metodo=="Simpson 1/3": I,tabla,xs=regla_simpson13(f,a,b,n); regla="Simpson 1/3"
-            elif metodo=="Simpson 3/8": I,tabla,xs=regla_simpson38(f,a,b,n); regla="Simpson 3/8"
-            elif metodo=="Boole": I,tabla,xs=regla_boole(f,a,b,n); regla="Boole"
-            elif metodo=="Gauss-Legendre": I,tabla,xs=cuadratura_gauss(f,a,b,n); regla="Gauss"
-            else: raise ValueError("Método no válido")
-
-            expr,_=f_expr(self.funcion_entry.get())
-            integral_simbol=sp.integrate(expr,(sp.symbols('x'),a,b))
-            self.simbol_label.config(text=f"Integral simbólica: {integral_simbol}")
-
-            formula,err=error_truncamiento(self.funcion_entry.get(),regla,a,b,n)
-            self.result_label.config(text=f"Resultado numérico: {I:.6f}")
-            if err is not None: self.error_label.config(text=f"Error: {formula}, Valor ≈ {err:.6e}")
-            else: self.error_label.config(text="Error: No disponible")
-
-            for row in self.tree.get_children(): self.tree.delete(row)
-            for t in tabla: 
-                self.tree.insert("", "end", values=(t[0], f"{t[1]:.6f}", f"{t[2]:.6f}", f"{t[3]}" if t[3]!="" else ""))
-
+            if metodo not in METODOS: raise ValueError("Método no válido")
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        # Primero la regla numérica (hilo) y luego la integral simbólica (proceso aparte)
+        self.ejecutor.cancelar("simbolica")
+        self.simbol_label.config(text="Integral simbólica: ")
+        self.ejecutor.lanzar("numerica",integral_numerica,expr_str,a,b,n,metodo,
+                             al_terminar=lambda res:self._mostrar_numerica(res,expr_str,a,b),
+                             barra=self.barra_progreso)
+
+    def _mostrar_numerica(self,res,expr_str,a,b):
+        I,tabla,formula,err=res
+        self.result_label.config(text=f"Resultado numérico: {I:.6f}")
+        if err is not None: self.error_label.config(text=f"Error: {formula}, Valor ≈ {err:.6e}")
+        else: self.error_label.config(text="Error: No disponible")
+
+        for row in self.tree.get_children(): self.tree.delete(row)
+        for t in tabla: 
+            self.tree.insert("", "end", values=(t[0], f"{t[1]:.6f}", f"{t[2]:.6f}", f"{t[3]}" if t[3]!="" else ""))
+
+        self.simbol_label.config(text="Integral simbólica: calculando...")
+        self.ejecutor.lanzar("simbolica",integral_simbolica,expr_str,a,b,proceso=True,
+                             al_terminar=lambda integral_simbol:self.simbol_label.config(text=f"Integral simbólica: {integral_simbol}"),
+                             al_cancelar=lambda:self.simbol_label.config(text="Integral simbólica: cancelada"),
+                             barra=self.barra_progreso)
 
     def graficar(self):
         try: